@@ -143,3 +143,129 @@ class RunConfiguration(TOMLConfigurationFile):
 
         """
         return self._dict.get("runner_logo", None)
+
+    @property
+    def parallel_execution(self) -> bool:
+        """
+        Returns:
+            flag whether independent branches of the calibration graph are executed concurrently.
+
+        """
+        return self._dict.get("parallel_execution", False)
+
+    @property
+    def compilation_cache(self) -> bool:
+        """
+        Returns:
+            flag whether compiled schedules are cached on disk and reused when their inputs did not change.
+
+        """
+        return self._dict.get("compilation_cache", False)
+
+    @property
+    def compilation_cache_size(self) -> float:
+        """
+        Returns:
+            Maximum size of the compilation cache in MB, the least recently used schedules are evicted first.
+
+        """
+        return self._dict.get("compilation_cache_size", 2048)
+
+    @property
+    def speculative_compilation(self) -> bool:
+        """
+        Returns:
+            flag whether the next node is compiled in a worker process while the current node is measuring.
+
+        """
+        return self._dict.get("speculative_compilation", False)
+
+    @property
+    def outer_prefetch_depth(self) -> int:
+        """
+        Returns:
+            Number of outer points that are compiled ahead while the current point is measured, 0 disables it.
+
+        """
+        return self._dict.get("outer_prefetch_depth", 0)
+
+    @property
+    def streaming_analysis(self) -> bool:
+        """
+        Returns:
+            Whether the points of outer and external samplespaces are handed to the node analysis while measuring.
+
+        """
+        return self._dict.get("streaming_analysis", False)
+
+    @property
+    def early_termination(self) -> bool:
+        """
+        Returns:
+            Whether sweeps over an external samplespace stop as soon as the node analysis reports convergence.
+
+        """
+        return self._dict.get("early_termination", False)
+
+    @property
+    def adaptive_spectroscopy(self) -> bool:
+        """
+        Returns:
+            Whether the qubit and resonator spectroscopies refine a coarse sweep around the fitted peak.
+
+        """
+        return self._dict.get("adaptive_spectroscopy", False)
+
+    @property
+    def analysis_workers(self) -> int:
+        """
+        Returns:
+            Number of processes analysing the qubits of a node in parallel, 0 analyses them in the main process.
+
+        """
+        return self._dict.get("analysis_workers", 0)
+
+    @property
+    def dataset_storage(self) -> str:
+        """
+        Returns:
+            Format of the saved datasets, "netcdf" or "compressed" for chunked and compressed complex data.
+
+        """
+        return self._dict.get("dataset_storage", "netcdf")
+
+    @property
+    def artifact_queue_size(self) -> int:
+        """
+        Returns:
+            Number of node artifacts waiting to be saved in the background, 0 saves them before the next node starts.
+
+        """
+        return self._dict.get("artifact_queue_size", 0)
+
+    @property
+    def full_resolution_figures(self) -> bool:
+        """
+        Returns:
+            Whether the figures are also saved at 400 dpi, otherwise only the previews shown by the browser are saved.
+
+        """
+        return self._dict.get("full_resolution_figures", True)
+
+    @property
+    def figure_workers(self) -> int:
+        """
+        Returns:
+            Number of processes saving the figures of a node in parallel, 0 saves them in the main process.
+
+        """
+        return self._dict.get("figure_workers", 0)
+
+    @property
+    def run_archive(self) -> bool:
+        """
+        Returns:
+            Whether the datasets, devices and QOIs of all nodes are also collected in one archive file of the run.
+
+        """
+        return self._dict.get("run_archive", False)
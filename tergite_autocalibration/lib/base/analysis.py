@@ -14,8 +14,11 @@
 # that they have been altered from the originals.
 
 import collections
+import multiprocessing
+import traceback
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
 
 # TODO: we should have a conditional import depending on a feature flag here
 import numpy as np
@@ -27,6 +30,10 @@ from tergite_autocalibration.lib.base.utils.figure_utils import (
     create_figure_with_top_band,
 )
 from tergite_autocalibration.utils.dto.qoi import QOI
+from tergite_autocalibration.utils.io.artifact_writer import (
+    can_fork,
+    paused_artifact_writers,
+)
 from tergite_autocalibration.utils.logging import logger
 
 
@@ -65,6 +72,18 @@ class BaseAnalysis(ABC):
         """
 
 
+# The node analysis whose elements are analysed by the forked workers.
+# It is inherited by the workers on fork, so the dataset does not have to be pickled.
+_parallel_analysis: Optional["BaseNodeAnalysis"] = None
+
+
+def _analyze_element_in_worker(element) -> Tuple[Optional[tuple], Optional[str]]:
+    try:
+        return _parallel_analysis._analyze_element(element), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
 class BaseNodeAnalysis(ABC):
     """
     Base class for the analysis
@@ -101,6 +120,111 @@ class BaseNodeAnalysis(ABC):
 
         """
 
+    def analyze_iteration(
+        self, dataset: xr.Dataset, outer_values: dict, iteration: Tuple[int, int]
+    ) -> None:
+        """
+        Optional hook to analyse the points of an outer or external samplespace while the
+        following points are still measured, e.g. to fit early points.
+        It is only called if `streaming_analysis` is enabled in the run configuration and runs
+        in a background thread. Raising an exception aborts the measurement.
+        The hook must not use pyplot, which is not thread-safe, the figures are still drawn
+        by `analyze_node`.
+
+        Args:
+            dataset: The configured dataset of the point, without the outer dimensions.
+            outer_values: The value of every outer settable at the point.
+            iteration: Tuple of (current_iteration, total_iterations).
+        """
+
+    def should_stop(
+        self,
+        dataset: xr.Dataset,
+        outer_values: dict,
+        partial_dataset: Callable[[], xr.Dataset],
+    ) -> bool:
+        """
+        Optional convergence check for nodes with an external samplespace.
+        It is only called if `early_termination` is enabled in the run configuration,
+        after every measured point except the last one. The check is on the critical path
+        of the measurement, so it should only analyse the newest point where possible.
+
+        Args:
+            dataset: The configured dataset of the newest point.
+            outer_values: The value of every outer settable at the newest point.
+            partial_dataset: Builds the dataset of all points measured so far,
+                only call it if the check needs all points.
+
+        Returns:
+            True if the quantities of interest are determined and the remaining points can be skipped.
+        """
+        return False
+
+    def _analyze_element(self, element) -> tuple:
+        """
+        Analyse a single element of the node, used by the parallel analysis.
+        """
+        raise NotImplementedError
+
+    def _parallel_workers(self, number_of_elements: int) -> int:
+        """
+        Returns:
+            Number of worker processes for the elements of the node, 0 for a sequential analysis.
+        """
+        workers = min(CONFIG.run.analysis_workers, number_of_elements)
+        if workers < 2:
+            return 0
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Parallel analysis is not supported on this platform.")
+            return 0
+        if not can_fork():
+            # Forking while other threads run can copy the locks they hold
+            logger.info(
+                "Elements are analysed sequentially while other threads are running"
+            )
+            return 0
+        return workers
+
+    def _analyze_elements_in_parallel(
+        self, elements: list, workers: int
+    ) -> List[Tuple[Optional[tuple], Optional[str]]]:
+        """
+        Run `_analyze_element` for every element in forked worker processes.
+        The outcomes keep the order of the elements, an element whose analysis raises returns
+        no result and the formatted exception, without affecting the other elements.
+        """
+        global _parallel_analysis
+
+        # file handles of a lazily opened dataset cannot be shared by the forked workers
+        self.dataset = self.dataset.load(scheduler="synchronous")
+        _parallel_analysis = self
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                # the workers are forked by the submissions
+                with paused_artifact_writers():
+                    futures = [
+                        pool.submit(_analyze_element_in_worker, element)
+                        for element in elements
+                    ]
+                outcomes = []
+                for element, future in zip(elements, futures):
+                    try:
+                        outcomes.append(future.result())
+                    except Exception:
+                        # e.g. the analysis object cannot be pickled, it is rerun here
+                        logger.info(
+                            f"Analysing {element} of {self.name} in the main process"
+                        )
+                        try:
+                            outcomes.append((self._analyze_element(element), None))
+                        except Exception:
+                            outcomes.append((None, traceback.format_exc()))
+        finally:
+            _parallel_analysis = None
+        return outcomes
+
     def _manage_plots(self, column_grid: int, plots_per_qubit: int):
         n_vars = len(self.data_vars)
         nrows = int(np.ceil(n_vars / column_grid)) * plots_per_qubit
@@ -126,6 +250,8 @@ class BaseAllQubitsAnalysis(BaseNodeAnalysis, ABC):
         self.coords = None
 
         self.qubit_analyses: List[BaseQubitAnalysis] = []
+        # the position of every qubit analysis in the plot grid
+        self._plot_indices: List[int] = []
 
         self.column_grid = 5
         self.plots_per_qubit = 1
@@ -156,20 +282,58 @@ class BaseAllQubitsAnalysis(BaseNodeAnalysis, ABC):
             qubits.sort(
                 key=lambda x: int(x[1:])
             )  # TODO: move this to configure_dataset
-        for this_qubit in qubits:
-            # TODO: this object is created for every single qubit
-            qubit_analysis: BaseQubitAnalysis = self.single_qubit_analysis_obj(
-                self.name, self.redis_fields
-            )
 
-            partial_ds = filter_ds_by_element(self.dataset, this_qubit)
-            analysis_results[this_qubit] = qubit_analysis.process_qubit(partial_ds)
+        workers = self._parallel_workers(len(qubits))
+        if workers:
+            outcomes = self._analyze_elements_in_parallel(qubits, workers)
+        else:
+            outcomes = [
+                (self._analyze_element(this_qubit), None) for this_qubit in qubits
+            ]
+
+        for plot_index, (this_qubit, (result, error)) in enumerate(
+            zip(qubits, outcomes)
+        ):
+            if result is None:
+                # reported as failed, the other qubits are still calibrated
+                logger.error(
+                    f"Analysis of {this_qubit} in {self.name} failed:\n{error}"
+                )
+                analysis_results[this_qubit] = QOI({}, False)
+                continue
+            qubit_analysis, analysis_results[this_qubit] = result
             self.qubit_analyses.append(qubit_analysis)
+            self._plot_indices.append(plot_index)
 
         return analysis_results
 
+    def _qubit_analysis(self, this_qubit: str) -> "BaseQubitAnalysis":
+        """
+        Create the analysis of a single qubit, nodes can override it to hand over
+        results that are already known, e.g. from the streaming analysis.
+        """
+        # TODO: this object is created for every single qubit
+        return self.single_qubit_analysis_obj(self.name, self.redis_fields)
+
+    def _analyze_element(self, this_qubit: str) -> Tuple["BaseQubitAnalysis", QOI]:
+        qubit_analysis = self._qubit_analysis(this_qubit)
+        # only the variables of the qubit are read from a lazily opened dataset,
+        # without the dask thread pool, whose idle threads would prevent forking workers
+        partial_ds = filter_ds_by_element(self.dataset, this_qubit).load(
+            scheduler="synchronous"
+        )
+        return qubit_analysis, qubit_analysis.process_qubit(partial_ds)
+
+    def _indexed_qubit_analyses(self) -> List[Tuple[int, "BaseQubitAnalysis"]]:
+        """
+        Returns:
+            The qubit analyses with their position in the plot grid,
+            the position of a qubit whose analysis failed stays empty.
+        """
+        return list(zip(self._plot_indices, self.qubit_analyses))
+
     def _fill_plots(self):
-        for index, analysis in enumerate(self.qubit_analyses):
+        for index, analysis in self._indexed_qubit_analyses():
             primary_plot_row = self.plots_per_qubit * (index // self.column_grid)
             primary_axis = self.axs[primary_plot_row, index % self.column_grid]
             analysis.plot(primary_axis)
@@ -351,27 +515,46 @@ class BaseAllCouplersAnalysis(BaseNodeAnalysis, ABC):
         coupler_data_dict = self._group_by_coupler()
         if len(coupler_data_dict) == 0:
             logger.error("Dataset does not have valid coordinates")
-        for this_coupler, coupler_data_vars in coupler_data_dict.items():
-            ds = xr.merge([self.dataset[var] for var in coupler_data_vars])
-            ds.attrs["coupler"] = this_coupler
-            ds.attrs["node"] = self.name
-            coupler_analysis_keywords = self.analysis_keywords.get(this_coupler, {})
-
-            coupler_analysis = self.single_coupler_analysis_obj(
-                self.name, self.redis_fields, **coupler_analysis_keywords
-            )
-            coupler_analysis.data_path = self.data_path
-            qoi = coupler_analysis.process_coupler(ds, this_coupler)
-            if hasattr(coupler_analysis, "processed_dataset"):
-                processed_coupler_dataset = coupler_analysis.processed_dataset
-                self.processed_dataset = xr.merge(
-                    [self.processed_dataset, processed_coupler_dataset]
+        couplers = list(coupler_data_dict.items())
+
+        workers = self._parallel_workers(len(couplers))
+        if workers:
+            outcomes = self._analyze_elements_in_parallel(couplers, workers)
+        else:
+            outcomes = [(self._analyze_element(coupler), None) for coupler in couplers]
+
+        processed_datasets = [self.processed_dataset]
+        for (this_coupler, _), (result, error) in zip(couplers, outcomes):
+            if result is None:
+                # nothing is written back for a failed coupler
+                logger.error(
+                    f"Analysis of {this_coupler} in {self.name} failed:\n{error}"
                 )
+                continue
+            coupler_analysis, qoi = result
+            if hasattr(coupler_analysis, "processed_dataset"):
+                processed_datasets.append(coupler_analysis.processed_dataset)
             coupler_analysis.plotter(figures_dictionary=self.figures_dictionary)
             analysis_results[this_coupler] = qoi
+        self.processed_dataset = xr.merge(processed_datasets)
 
         return analysis_results
 
+    def _analyze_element(self, coupler: tuple) -> Tuple["BaseCouplerAnalysis", QOI]:
+        this_coupler, coupler_data_vars = coupler
+        ds = xr.merge([self.dataset[var] for var in coupler_data_vars]).load(
+            scheduler="synchronous"
+        )
+        ds.attrs["coupler"] = this_coupler
+        ds.attrs["node"] = self.name
+        coupler_analysis_keywords = self.analysis_keywords.get(this_coupler, {})
+
+        coupler_analysis = self.single_coupler_analysis_obj(
+            self.name, self.redis_fields, **coupler_analysis_keywords
+        )
+        coupler_analysis.data_path = self.data_path
+        return coupler_analysis, coupler_analysis.process_coupler(ds, this_coupler)
+
     def _group_by_coupler(self):
         coupler_data_dict = collections.defaultdict(set)
         for var in self.dataset.data_vars:
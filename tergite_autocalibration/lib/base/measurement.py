@@ -39,6 +39,18 @@ class BaseMeasurement:
 
 
 class MeasurementType(ABC):
+    node: "BaseNode"
+
     @abstractmethod
     def measure_node(self, measurement_mode, node: "BaseNode") -> xarray.Dataset:
         pass
+
+    def schedule_samplespaces(self) -> list[dict]:
+        """
+        The samplespaces of all schedules that `measure_node` compiles,
+        used to compile the schedules ahead of the measurement.
+
+        Returns:
+            List of samplespaces to pass to `precompile`.
+        """
+        return [self.node.schedule_samplespace]
@@ -16,24 +16,39 @@
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
 from pathlib import Path
-from typing import TYPE_CHECKING, Literal, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Literal, Tuple
 
 import matplotlib
 import numpy as np
 import xarray
 
-from tergite_autocalibration.config.globals import PLOTTING_BACKEND, REDIS_CONNECTION
+from tergite_autocalibration.config.globals import (
+    CONFIG,
+    PLOTTING_BACKEND,
+    REDIS_CONNECTION,
+)
 from tergite_autocalibration.lib.base.analysis import BaseNodeAnalysis
 from tergite_autocalibration.lib.base.measurement import (
     BaseMeasurement,
     MeasurementType,
 )
+from tergite_autocalibration.lib.utils.compilation_cache import (
+    compilation_key,
+    get_compilation_cache,
+)
+from tergite_autocalibration.lib.utils.compilation_passes import (
+    with_conditional_playback_check,
+)
 from tergite_autocalibration.lib.utils.device import (
     close_device_resources,
     configure_device,
-    save_serial_device,
+    serialize_device_elements,
+    write_serial_device,
+)
+from tergite_autocalibration.lib.utils.redis import (
+    RedisDeviceSnapshot,
+    update_redis_trusted_values,
 )
-from tergite_autocalibration.lib.utils.redis import update_redis_trusted_values
 from tergite_autocalibration.lib.utils.schedule_execution import (
     execute_schedule,
     get_compiler,
@@ -44,6 +59,8 @@ from tergite_autocalibration.utils.dto.enums import (
 )
 from tergite_autocalibration.utils.hardware.spi import SpiDAC
 from tergite_autocalibration.utils.io.dataset import (
+    archive_measurement,
+    archive_qoi,
     open_dataset,
     save_dataset,
     save_figures,
@@ -63,6 +80,9 @@ if TYPE_CHECKING:
         InstrumentCoordinator,
     )
 
+    from tergite_autocalibration.lib.utils.device import DeviceRegistry
+    from tergite_autocalibration.utils.io.artifact_writer import ArtifactWriter
+
 matplotlib.use(PLOTTING_BACKEND)
 
 
@@ -94,6 +114,9 @@ class BaseNode(ABC):
         self.samplespace = self.schedule_samplespace | self.external_samplespace
 
         self.device: "QuantumDevice"
+        self.device_registry: "DeviceRegistry | None" = None
+        self.artifact_writer: "ArtifactWriter | None" = None
+        self._node_analysis: "BaseNodeAnalysis | None" = None
 
     @abstractmethod
     def precompile(self, samplespace):
@@ -101,6 +124,56 @@ class BaseNode(ABC):
 
         self.data_path: Path
 
+    def compile_schedule(
+        self, measurement_class: "BaseMeasurement", schedule_samplespace: dict
+    ) -> "CompiledSchedule":
+        """
+        Build and compile the schedule of the measurement.
+        If the compilation cache is enabled, the schedule is only built and compiled
+        when the inputs of the compilation changed since the last time.
+
+        Args:
+            measurement_class: The measurement object to build the schedule with.
+            schedule_samplespace: The samplespace passed to the schedule function.
+
+        Returns:
+            The compiled schedule.
+        """
+        compilation_config = with_conditional_playback_check(
+            self.device.generate_compilation_config()
+        )
+
+        cache = get_compilation_cache()
+        if cache is not None:
+            key = compilation_key(
+                self.name,
+                schedule_samplespace,
+                self.schedule_keywords,
+                compilation_config,
+                measurement_name=type(measurement_class).__qualname__,
+                device_elements=serialize_device_elements(self.device),
+            )
+            compiled_schedule = cache.get(key)
+            if compiled_schedule is not None:
+                logger.info("Using cached compiled schedule")
+                return compiled_schedule
+
+        schedule = measurement_class.schedule_function(
+            **schedule_samplespace, **self.schedule_keywords
+        )
+
+        compiler = get_compiler(prefix=self.name)
+
+        logger.info("Starting Compiling")
+        compiled_schedule = compiler.compile(
+            schedule=schedule, config=compilation_config
+        )
+
+        if cache is not None:
+            cache.put(key, compiled_schedule)
+
+        return compiled_schedule
+
     def update_data_path(self, data_path: Path):
         """
         Used by the calibration supervisor
@@ -117,22 +190,106 @@ class BaseNode(ABC):
         return dataset
 
     def calibrate(self, measurement_mode):
+        result_dataset = self.run_measurement(measurement_mode)
+        self.run_analysis(result_dataset)
+
+    def run_measurement(self, measurement_mode) -> xarray.Dataset:
+        """
+        First phase of the calibration: measure the node and free the device resources.
+        This is the only phase that needs access to the hardware.
+
+        Args:
+            measurement_mode: The status of the measurement mode.
+
+        Returns:
+            xarray.Dataset: The dataset containing the measurement results.
+        """
         # explicitly create the folder for the measurement.
         # contains the hdf5 dataset, the QOI json and the png figures
         self.data_path.mkdir(parents=True, exist_ok=True)
 
-        result_dataset = self.measure_node(measurement_mode)
-        # it's better to save the measured dataset before post-processing
-        save_dataset(result_dataset, self.name, self.data_path)
-        save_serial_device(self.device, self.data_path)
+        try:
+            result_dataset = self.measure_node(measurement_mode)
+            # it's better to save the measured dataset before post-processing
+            # the copy keeps the attributes of the saved dataset apart from the analysis
+            saved_dataset = result_dataset.copy(deep=False)
+            self._save_artifact(save_dataset, saved_dataset, self.name, self.data_path)
+            # the device is serialized before its elements are reconfigured by the next node
+            serial_device = serialize_device_elements(self.device)
+            self._save_artifact(
+                write_serial_device, self.device.name, serial_device, self.data_path
+            )
+            if CONFIG.run.run_archive:
+                self._save_artifact(
+                    archive_measurement,
+                    saved_dataset,
+                    self.name,
+                    self.data_path,
+                    serial_device,
+                )
+        finally:
+            # After the measurement free the device resources, the analysis does not need them.
+            # This also happens if the measurement failed, so the next node can use them.
+            self.release_device()
+        return result_dataset
 
-        QOI_dict = self.post_process(result_dataset)
-        save_qoi(QOI_dict, self.name, self.data_path)
+    def configure_device(self) -> "QuantumDevice":
+        """
+        Create the quantum device of the node, from the device registry if the node has one.
+
+        Returns:
+            The configured quantum device.
+        """
+        if self.device_registry is not None:
+            return self.device_registry.configure_device(
+                self.name,
+                qubits=self.all_qubits,
+                couplers=self.couplers,
+                snapshot=self.redis_snapshot,
+            )
+        return configure_device(
+            self.name,
+            qubits=self.all_qubits,
+            couplers=self.couplers,
+            snapshot=self.redis_snapshot,
+        )
+
+    def release_device(self):
+        """
+        Free the device resources of the node.
+        The elements of a device from the device registry stay open for the next node.
+        """
+        if self.device_registry is not None:
+            self.device_registry.release_device(self.device)
+        else:
+            close_device_resources(self.device)
 
-        # After the measurement free the device resources:
-        close_device_resources(self.device)
+    def run_analysis(self, result_dataset: xarray.Dataset):
+        """
+        Second phase of the calibration: analyse the dataset and update redis.
+
+        Args:
+            result_dataset: The dataset returned by `run_measurement`.
+        """
+        QOI_dict = self.post_process(result_dataset)
+        self._save_artifact(save_qoi, QOI_dict, self.name, self.data_path)
+        if CONFIG.run.run_archive:
+            self._save_artifact(archive_qoi, QOI_dict, self.data_path)
         logger.info("analysis completed")
 
+    def _save_artifact(self, save: Callable, *args: Any) -> None:
+        """
+        Save an artifact of the node, in the background if the node has an artifact writer.
+
+        Args:
+            save: The save function, e.g. `save_dataset`.
+            *args: The arguments of the save function.
+        """
+        if self.artifact_writer is not None:
+            self.artifact_writer.submit(save, *args)
+        else:
+            save(*args)
+
     def measure_compiled_schedule(
         self,
         compiled_schedule: "CompiledSchedule",
@@ -177,20 +334,67 @@ class BaseNode(ABC):
             duration *= self.node_dictionary["loop_repetitions"]
         return duration
 
-    def post_process(self, dataset: xarray.Dataset):
-        analysis_kwargs = getattr(self, "analysis_keywords", dict())
-        node_analysis: BaseNodeAnalysis = self.analysis_obj(
-            self.name, self.redis_fields, **analysis_kwargs
+    def get_node_analysis(self) -> "BaseNodeAnalysis":
+        """
+        The analysis of the node. It is kept until the next post processing, so the analysis
+        that processed the points of a streaming measurement also analyses the full dataset.
+
+        Returns:
+            The analysis object of the node.
+        """
+        if self._node_analysis is None:
+            analysis_kwargs = getattr(self, "analysis_keywords", dict())
+            self._node_analysis = self.analysis_obj(
+                self.name, self.redis_fields, **analysis_kwargs
+            )
+        return self._node_analysis
+
+    def should_stop(
+        self,
+        dataset: xarray.Dataset,
+        outer_values: dict,
+        partial_dataset: Callable[[], xarray.Dataset],
+    ) -> bool:
+        """
+        Whether the measurement of the external samplespace can stop early.
+
+        Args:
+            dataset: The configured dataset of the newest point.
+            outer_values: The value of every outer settable at the newest point.
+            partial_dataset: Builds the dataset of all points measured so far.
+
+        Returns:
+            The convergence check of the node analysis, see `BaseNodeAnalysis.should_stop`.
+        """
+        return self.get_node_analysis().should_stop(
+            dataset, outer_values, partial_dataset
         )
+
+    def post_process(self, dataset: xarray.Dataset):
+        node_analysis = self.get_node_analysis()
+        # a rerun of the analysis starts from a new analysis object
+        self._node_analysis = None
         QOI_dict = node_analysis.analyze_node(dataset)
 
         figures = node_analysis.figures
-        save_figures(figures, self.name, self.data_path)
-
-        for element_id_, qois_ in QOI_dict.items():
-            update_redis_trusted_values(
-                self.name, element_id_, qoi=qois_, redis_fields=self.redis_fields
-            )
+        if CONFIG.run.figure_workers > 1:
+            # the figure workers are forked from the node, not from the artifact writer thread
+            save_figures(figures, self.name, self.data_path)
+        else:
+            self._save_artifact(save_figures, figures, self.name, self.data_path)
+
+        # all values of the node are written in one transaction, either all elements
+        # are updated or none of them
+        with REDIS_CONNECTION.pipeline(transaction=True) as pipeline:
+            for element_id_, qois_ in QOI_dict.items():
+                update_redis_trusted_values(
+                    self.name,
+                    element_id_,
+                    qoi=qois_,
+                    redis_fields=self.redis_fields,
+                    pipeline=pipeline,
+                )
+            pipeline.execute()
         return QOI_dict
 
     def configure_dataset(
@@ -201,78 +405,32 @@ class BaseNode(ABC):
         The dataset retrieved from the instrument coordinator is
         too bare-bones. Here the dims, coords and data_vars are configured
         """
-        dataset = xarray.Dataset(attrs={"elements": []})
-
-        raw_ds_keys = raw_ds.data_vars.keys()
         measurement_qubits = self.all_qubits
 
-        sweep_quantities = self.schedule_samplespace.keys()
+        # the dimensions and the padded samplespace are the same for all measured qubits
+        dimensions = samplespace_dimensions(
+            self.schedule_samplespace, self.loops, self.samplespace_structure
+        )
+        samplespace = pad_samplespace(
+            self.schedule_samplespace,
+            dimensions,
+            self.loops,
+            self.samplespace_structure,
+        )
 
-        for key in raw_ds_keys:
-            coords_dict = {}
+        coords = {}
+        data_vars = {}
+        elements = []
+        for key in raw_ds.data_vars.keys():
             measured_qubit = measurement_qubits[key]
-            dimensions = samplespace_dimensions(
-                self.schedule_samplespace, self.loops, self.samplespace_structure
-            )
-
-            samplespace = pad_samplespace(
-                self.schedule_samplespace,
-                dimensions,
-                self.loops,
-                self.samplespace_structure,
-            )
-
-            for quantity in sweep_quantities:
-                # eg settable_elements -> ['q1','q2',...] or ['q1_q2','q3_q4',...] :
-                settable_elements = samplespace[quantity].keys()
-
-                # distinguish if the settable is on a qubit or a coupler:
-                if measured_qubit in settable_elements:
-                    element = measured_qubit
-                    element_type = "qubit"
-                else:
-                    matching = [s for s in settable_elements if measured_qubit in s]
-                    # TODO: len(matching) == 1 implies that we operate on only 1 coupler.
-                    # To be changed in future
-                    if len(matching) == 1 and "_" in matching[0]:
-                        element = matching[0]
-                        element_type = "coupler"
-                    else:
-                        raise ValueError
-
-                coord_key = quantity + element
-
-                settable_values = samplespace[quantity][element]
-                coord_attrs = {
-                    "element_type": element_type,  # 'element_type' is ether 'qubit' or 'coupler'
-                    element_type: element,
-                    "measured_qubit": measured_qubit,
-                    "long_name": f"{coord_key}",
-                    "units": "NA",
-                }
-
-                # This is for measurements of type OuterScheduleNode:
-                if not isinstance(settable_values, Iterable):
-                    settable_values = np.array([settable_values])
-
-                coord_dim = coord_key
-                if self.samplespace_structure == SamplespaceStructure.PARALLEL:
-                    coord_dim = "common_dimension" + measured_qubit
-
-                coords_dict[coord_key] = (coord_dim, settable_values, coord_attrs)
-
-            if self.loops is not None:
-                coords_dict["loops"] = (
-                    "loops",
-                    np.arange(self.loops),
-                    {"element_type": "NA"},
-                )
-
-            partial_ds = xarray.Dataset(coords=coords_dict)
-
-            data_values = raw_ds[key].values
+            coords_dict = self._measured_qubit_coords(samplespace, measured_qubit)
+            for coord_key, coord in coords_dict.items():
+                # coupler coordinates are shared by the qubits of the coupler,
+                # the first measured qubit sets their attributes
+                coords.setdefault(coord_key, coord)
 
-            data_values = data_values.reshape(*dimensions, order="F")
+            # reshaping the flat acquisition returns a view, so no data is copied
+            data_values = raw_ds[key].values.reshape(*dimensions, order="F")
 
             # the element under examination ...
             # ... in single qubit nodes the element is just the measured_qubit
@@ -295,26 +453,84 @@ class BaseNode(ABC):
             if self.samplespace_structure == SamplespaceStructure.PARALLEL:
                 dimension_names = "common_dimension" + measured_qubit
 
-            partial_ds[f"y{measured_qubit}"] = (
+            data_vars[f"y{measured_qubit}"] = (
                 dimension_names,
                 data_values,
                 attributes,
             )
+            elements.append(element)
 
-            dataset = xarray.merge([dataset, partial_ds])
-            dataset.attrs["elements"].append(element)
         # take the set of elements because couplers appear duplicated
-        dataset.attrs["elements"] = list(set(dataset.attrs["elements"]))
+        return xarray.Dataset(
+            data_vars, coords=coords, attrs={"elements": list(set(elements))}
+        )
 
-        return dataset
+    def _measured_qubit_coords(self, samplespace: dict, measured_qubit: str) -> dict:
+        """
+        The coordinates of the data of one measured qubit, in the order of its dimensions.
+        """
+        coords_dict = {}
+        for quantity in samplespace.keys():
+            # eg settable_elements -> ['q1','q2',...] or ['q1_q2','q3_q4',...] :
+            settable_elements = samplespace[quantity].keys()
+
+            # distinguish if the settable is on a qubit or a coupler:
+            if measured_qubit in settable_elements:
+                element = measured_qubit
+                element_type = "qubit"
+            else:
+                matching = [s for s in settable_elements if measured_qubit in s]
+                # TODO: len(matching) == 1 implies that we operate on only 1 coupler.
+                # To be changed in future
+                if len(matching) == 1 and "_" in matching[0]:
+                    element = matching[0]
+                    element_type = "coupler"
+                else:
+                    raise ValueError
+
+            coord_key = quantity + element
+
+            settable_values = samplespace[quantity][element]
+            coord_attrs = {
+                "element_type": element_type,  # 'element_type' is ether 'qubit' or 'coupler'
+                element_type: element,
+                "measured_qubit": measured_qubit,
+                "long_name": f"{coord_key}",
+                "units": "NA",
+            }
+
+            # This is for measurements of type OuterScheduleNode:
+            if not isinstance(settable_values, Iterable):
+                settable_values = np.array([settable_values])
+
+            coord_dim = coord_key
+            if self.samplespace_structure == SamplespaceStructure.PARALLEL:
+                coord_dim = "common_dimension" + measured_qubit
+
+            coords_dict[coord_key] = (coord_dim, settable_values, coord_attrs)
+
+        if self.loops is not None:
+            coords_dict["loops"] = (
+                "loops",
+                np.arange(self.loops),
+                {"element_type": "NA"},
+            )
+        return coords_dict
 
 
 class QubitNode(BaseNode):
     name: str
     qubit_qois: list[str] | None = None
 
-    def __init__(self, all_qubits: list[str], couplers: list[str], **node_keywords):
+    def __init__(
+        self,
+        all_qubits: list[str],
+        couplers: list[str],
+        device_registry: "DeviceRegistry | None" = None,
+        **node_keywords,
+    ):
         super().__init__(**node_keywords)
+        self.device_registry = device_registry
         self.all_qubits = all_qubits
         self.couplers = couplers
         self.qubit_state = 0  # can be 0 or 1 or 2
@@ -322,9 +538,10 @@ class QubitNode(BaseNode):
         if self.qubit_qois is not None:
             self.redis_fields = self.qubit_qois
 
-        self.device = configure_device(
-            self.name, qubits=self.all_qubits, couplers=self.couplers
+        self.redis_snapshot = RedisDeviceSnapshot(
+            qubits=self.all_qubits, couplers=self.couplers
         )
+        self.device = self.configure_device()
 
     def precompile(self, schedule_samplespace: dict) -> "CompiledSchedule":
         import quantify_scheduler.backends.qblox.constants as constants
@@ -335,19 +552,7 @@ class QubitNode(BaseNode):
             qubit: self.device.get_element(qubit) for qubit in self.all_qubits
         }
         measurement_class = self.measurement_obj(transmons_dict)
-        schedule = measurement_class.schedule_function(
-            **schedule_samplespace, **self.schedule_keywords
-        )
-
-        compiler = get_compiler(prefix=self.name)
-
-        compilation_config = self.device.generate_compilation_config()
-        logger.info("Starting Compiling")
-        compiled_schedule = compiler.compile(
-            schedule=schedule, config=compilation_config
-        )
-
-        return compiled_schedule
+        return self.compile_schedule(measurement_class, schedule_samplespace)
 
     def __str__(self):
         return f"Node representation for {self.name} on qubits {self.all_qubits}"
@@ -363,8 +568,14 @@ class CouplerNode(BaseNode):
     name: str
     coupler_qois: list[str]
 
-    def __init__(self, couplers: list[str], **node_keywords):
+    def __init__(
+        self,
+        couplers: list[str],
+        device_registry: "DeviceRegistry | None" = None,
+        **node_keywords,
+    ):
         super().__init__(**node_keywords)
+        self.device_registry = device_registry
         self.couplers = couplers
         self.edges = couplers
         self.all_qubits = sorted(set(self.get_coupled_qubits()))
@@ -372,9 +583,10 @@ class CouplerNode(BaseNode):
         if self.coupler_qois is not None:
             self.redis_fields = self.coupler_qois
 
-        self.device = configure_device(
-            self.name, qubits=self.all_qubits, couplers=self.couplers
+        self.redis_snapshot = RedisDeviceSnapshot(
+            qubits=self.all_qubits, couplers=self.couplers
         )
+        self.device = self.configure_device()
 
     def measure_node(self, cluster_status) -> xarray.Dataset:
         """
@@ -398,10 +610,12 @@ class CouplerNode(BaseNode):
         This method fetches the redis value and sets the update DC current
         to the appropriate SPI dacs.
         """
+        # the parking current can change after the node was created
+        snapshot = RedisDeviceSnapshot(couplers=self.couplers)
         currents_dict = {}
         for coupler in self.couplers:
             parking_current = float(
-                REDIS_CONNECTION.hget(f"couplers:{coupler}", "initial_parking_current")
+                snapshot.hget(f"couplers:{coupler}", "initial_parking_current")
             )
             if np.isnan(parking_current):
                 logger.warning(f"nan current for coupler {coupler}")
@@ -421,10 +635,12 @@ class CouplerNode(BaseNode):
     def gate_qubit_types_dict(self) -> dict[str, dict]:
         qubit_types_dict = {}
         for coupler in self.couplers:
-            control_qubit = REDIS_CONNECTION.hget(
+            control_qubit = self.redis_snapshot.hget(
                 f"couplers:{coupler}", "control_qubit"
             )
-            target_qubit = REDIS_CONNECTION.hget(f"couplers:{coupler}", "target_qubit")
+            target_qubit = self.redis_snapshot.hget(
+                f"couplers:{coupler}", "target_qubit"
+            )
             qubit_types_dict[coupler] = {
                 "control_qubit": control_qubit,
                 "target_qubit": target_qubit,
@@ -445,10 +661,12 @@ class CouplerNode(BaseNode):
         qubit_roles = self.gate_qubit_types_dict()[coupler]
         c_qubit = qubit_roles["control_qubit"]
         t_qubit = qubit_roles["target_qubit"]
-        c_f01 = float(REDIS_CONNECTION.hget(f"transmons:{c_qubit}", "clock_freqs:f01"))
-        t_f01 = float(REDIS_CONNECTION.hget(f"transmons:{t_qubit}", "clock_freqs:f01"))
-        c_f12 = float(REDIS_CONNECTION.hget(f"transmons:{c_qubit}", "clock_freqs:f12"))
-        t_f12 = float(REDIS_CONNECTION.hget(f"transmons:{t_qubit}", "clock_freqs:f12"))
+        c_transmon = self.redis_snapshot.hgetall(f"transmons:{c_qubit}")
+        t_transmon = self.redis_snapshot.hgetall(f"transmons:{t_qubit}")
+        c_f01 = float(c_transmon["clock_freqs:f01"])
+        t_f01 = float(t_transmon["clock_freqs:f01"])
+        c_f12 = float(c_transmon["clock_freqs:f12"])
+        t_f12 = float(t_transmon["clock_freqs:f12"])
 
         if phase_path == "via_20":
             ac_frequency = np.abs(c_f01 + t_f01 - (c_f01 + c_f12))
@@ -474,19 +692,7 @@ class CouplerNode(BaseNode):
             coupler: self.device.get_edge(coupler) for coupler in self.couplers
         }
         measurement_class = self.measurement_obj(transmons_dict, edges_dict)
-        schedule = measurement_class.schedule_function(
-            **schedule_samplespace, **self.schedule_keywords
-        )
-
-        compiler = get_compiler(prefix=self.name)
-
-        compilation_config = self.device.generate_compilation_config()
-        logger.info("Starting Compiling")
-        compiled_schedule = compiler.compile(
-            schedule=schedule, config=compilation_config
-        )
-
-        return compiled_schedule
+        return self.compile_schedule(measurement_class, schedule_samplespace)
 
     def __str__(self):
         return f"Node representation for {self.name} on couplers {self.couplers}"
@@ -10,8 +10,11 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import numpy as np
+import xarray
 
 from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.base.node import BaseNode
 from tergite_autocalibration.lib.nodes.characterization.randomized_benchmarking.node import (
     RandomizedBenchmarkingNode,
 )
@@ -27,6 +30,7 @@ from tergite_autocalibration.lib.nodes.readout.resonator_spectroscopy.node impor
 from tergite_autocalibration.tests.utils.decorators import with_redis
 from tergite_autocalibration.tests.utils.fixtures import get_fixture_path
 from tergite_autocalibration.utils.dto.extended_transmon_element import ExtendedTransmon
+from tergite_autocalibration.utils.measurement_utils import samplespace_dimensions
 
 redis_mock = get_fixture_path("redis", "standard_redis_mock.json")
 
@@ -152,3 +156,83 @@ def test_configure_dataset_qubits_with_3state_discrimination():
         configured_ds.coords["cz_pulse_amplitudesq00_q01"].attrs["element_type"]
         == "coupler"
     )
+
+
+class _ManyQubitsNode(BaseNode):
+    """
+    Node with the samplespace of a single shots readout optimization on many qubits
+    """
+
+    name = "many_qubits"
+
+    def __init__(self, number_of_qubits: int, loops: int):
+        super().__init__()
+        self.all_qubits = [f"q{index:02d}" for index in range(number_of_qubits)]
+        self.loops = loops
+        self.schedule_samplespace = {
+            "ro_amplitudes": {
+                qubit: np.linspace(0.01, 0.1, 5) for qubit in self.all_qubits
+            },
+            "qubit_states": {qubit: np.array([0, 1, 2]) for qubit in self.all_qubits},
+        }
+
+    def precompile(self, samplespace):
+        pass
+
+
+def _configure_dataset_with_merge(node: BaseNode, raw_ds: xarray.Dataset):
+    """
+    Reference implementation that merges the dataset of every measured qubit
+    """
+    dataset = xarray.Dataset(attrs={"elements": []})
+    dimensions = samplespace_dimensions(node.schedule_samplespace, node.loops)
+    for key in raw_ds.data_vars.keys():
+        measured_qubit = node.all_qubits[key]
+        coords_dict = {}
+        for quantity in node.schedule_samplespace:
+            coord_key = quantity + measured_qubit
+            coords_dict[coord_key] = (
+                coord_key,
+                node.schedule_samplespace[quantity][measured_qubit],
+                {
+                    "element_type": "qubit",
+                    "qubit": measured_qubit,
+                    "measured_qubit": measured_qubit,
+                    "long_name": coord_key,
+                    "units": "NA",
+                },
+            )
+        coords_dict["loops"] = ("loops", np.arange(node.loops), {"element_type": "NA"})
+        partial_ds = xarray.Dataset(coords=coords_dict)
+        partial_ds[f"y{measured_qubit}"] = (
+            tuple(coords_dict.keys()),
+            raw_ds[key].values.reshape(*dimensions, order="F"),
+            {
+                "qubit": measured_qubit,
+                "element": measured_qubit,
+                "long_name": f"y{measured_qubit}",
+                "units": "NA",
+            },
+        )
+        dataset = xarray.merge([dataset, partial_ds])
+        dataset.attrs["elements"].append(measured_qubit)
+    dataset.attrs["elements"] = list(set(dataset.attrs["elements"]))
+    return dataset
+
+
+def test_configure_dataset_many_qubits():
+    node = _ManyQubitsNode(number_of_qubits=24, loops=2000)
+    size = 5 * 3 * node.loops
+    raw_ds = xarray.Dataset(
+        {
+            channel: ("acq_index", np.arange(size) * (channel + 1j))
+            for channel in range(len(node.all_qubits))
+        }
+    )
+
+    configured_ds = node.configure_dataset(raw_ds)
+
+    merged_ds = _configure_dataset_with_merge(node, raw_ds)
+    xarray.testing.assert_identical(configured_ds, merged_ds)
+    assert sorted(configured_ds.attrs["elements"]) == node.all_qubits
+    assert configured_ds["yq23"].shape == (5, 3, node.loops)
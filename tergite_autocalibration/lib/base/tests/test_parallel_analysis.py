@@ -0,0 +1,161 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.base.analysis import (
+    BaseAllCouplersAnalysis,
+    BaseAllQubitsAnalysis,
+    BaseCouplerAnalysis,
+    BaseQubitAnalysis,
+)
+from tergite_autocalibration.utils.dto.qoi import QOI
+
+_QUBITS = ["q10", "q02", "q01", "q05"]
+
+
+class _MeanQubitAnalysis(BaseQubitAnalysis):
+    """
+    Reports the mean of the data and the process it was analysed in
+    """
+
+    def analyse_qubit(self):
+        if self.qubit == "q05":
+            raise ValueError("bad data")
+        self.process_id = os.getpid()
+        mean = float(self.magnitudes[self.data_var].mean())
+        return QOI({"mean": {"value": mean, "error": 0}}, True)
+
+    def plotter(self, ax):
+        ax.plot([0, 1], [0, 1])
+        self.plotted_in = os.getpid()
+        self.plotted_on = ax
+
+
+class _MeanNodeAnalysis(BaseAllQubitsAnalysis):
+    single_qubit_analysis_obj = _MeanQubitAnalysis
+
+
+def _dataset() -> xr.Dataset:
+    data_vars = {}
+    for index, qubit in enumerate(_QUBITS):
+        coord = f"delays{qubit}"
+        data_vars[f"y{qubit}"] = xr.DataArray(
+            np.full(8, index + 1.0),
+            dims=coord,
+            coords={coord: (coord, np.arange(8), {"qubit": qubit})},
+            attrs={"qubit": qubit, "element": qubit},
+        )
+    return xr.Dataset(data_vars, attrs={"elements": list(_QUBITS)})
+
+
+def test_parallel_analysis_matches_sequential(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "analysis_workers", 3)
+    analysis = _MeanNodeAnalysis("mean_node", ["mean"])
+    results = analysis.analyze_node(_dataset())
+
+    # ordered by qubit, the failing qubit does not affect the others
+    assert list(results) == ["q01", "q02", "q05", "q10"]
+    assert results["q01"].analysis_result["mean"]["value"] == 3.0
+    assert results["q02"].analysis_result["mean"]["value"] == 2.0
+    assert results["q10"].analysis_result["mean"]["value"] == 1.0
+    assert results["q05"] == QOI({}, False)
+
+    # the qubits are analysed in workers and plotted in the parent
+    assert [a.qubit for a in analysis.qubit_analyses] == ["q01", "q02", "q10"]
+    for qubit_analysis in analysis.qubit_analyses:
+        assert qubit_analysis.process_id != os.getpid()
+        assert qubit_analysis.plotted_in == os.getpid()
+
+
+def test_failed_qubit_keeps_its_plot(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "analysis_workers", 3)
+    analysis = _MeanNodeAnalysis("mean_node", ["mean"])
+    analysis.analyze_node(_dataset())
+
+    # q05 between q02 and q10 failed, q10 is still plotted in the last column
+    plotted_on = {a.qubit: a.plotted_on for a in analysis.qubit_analyses}
+    assert plotted_on["q01"] is analysis.axs[0, 0]
+    assert plotted_on["q02"] is analysis.axs[0, 1]
+    assert plotted_on["q10"] is analysis.axs[0, 3]
+
+
+def test_sequential_analysis_raises(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "analysis_workers", 0)
+    analysis = _MeanNodeAnalysis("mean_node", ["mean"])
+
+    with pytest.raises(ValueError, match="bad data"):
+        analysis.analyze_node(_dataset())
+
+
+class _SumCouplerAnalysis(BaseCouplerAnalysis):
+    """
+    Reports the sum of the data of both qubits of the coupler
+    """
+
+    def analyze_coupler(self):
+        if self.coupler == "q06_q07":
+            raise ValueError("bad data")
+        total = float(
+            self.control_qubit_data_var.sum() + self.target_qubit_data_var.sum()
+        )
+        self.processed_dataset = xr.Dataset({f"sum{self.coupler}": total})
+        return QOI({"sum": {"value": total, "error": 0}}, True)
+
+    def plotter(self, figures_dictionary):
+        figures_dictionary[self.coupler] = []
+
+
+class _SumNodeAnalysis(BaseAllCouplersAnalysis):
+    single_coupler_analysis_obj = _SumCouplerAnalysis
+
+    def __init__(self, name, redis_fields, **kwargs):
+        super().__init__(name, redis_fields, **kwargs)
+        self.coupler_analyses = []
+
+    def _analyze_element(self, coupler):
+        coupler_analysis, qoi = super()._analyze_element(coupler)
+        self.coupler_analyses.append(coupler_analysis)
+        return coupler_analysis, qoi
+
+
+def _coupler_dataset() -> xr.Dataset:
+    data_vars = {}
+    for coupler in ["q06_q07", "q00_q01"]:
+        for qubit in coupler.split("_"):
+            coord = f"currents{coupler}"
+            data_vars[f"y{qubit}"] = xr.DataArray(
+                np.full(4, 1.0),
+                dims=coord,
+                coords={coord: np.arange(4)},
+                attrs={"qubit": qubit, "element": coupler},
+            )
+    return xr.Dataset(data_vars)
+
+
+def test_parallel_coupler_analysis(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "analysis_workers", 2)
+    analysis = _SumNodeAnalysis("sum_node", ["sum"])
+    results = analysis.analyze_node(_coupler_dataset())
+
+    # the failing coupler is left out, the other coupler is analysed in a worker
+    assert list(results) == ["q00_q01"]
+    assert results["q00_q01"].analysis_result["sum"]["value"] == 8.0
+    assert analysis.processed_dataset["sumq00_q01"] == 8.0
+    assert list(analysis.figures_dictionary) == ["q00_q01"]
+    # the analyses ran in the workers, the main process did not analyse any coupler
+    assert analysis.coupler_analyses == []
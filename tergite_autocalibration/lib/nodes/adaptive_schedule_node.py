@@ -0,0 +1,188 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+import xarray
+
+from tergite_autocalibration.lib.base.measurement import MeasurementType
+from tergite_autocalibration.utils.logging import logger
+
+
+class AdaptiveScheduleNode(MeasurementType):
+    """
+    Measures a sweep in rounds: a coarse sweep over the range of the samplespace, followed by
+    narrow refinement sweeps around the fitted center of every qubit until the uncertainty of
+    all centers is below the tolerance of the node.
+
+    The node defines:
+        adaptive_settable: The settable of the schedule samplespace that is refined.
+        adaptive_coarse_points: Number of points of the coarse sweep.
+        adaptive_refinement_points: Number of points of every refinement sweep.
+        adaptive_zoom: Factor by which the sweep range shrinks with every refinement.
+        adaptive_max_refinements: Maximum number of refinement sweeps.
+        adaptive_tolerance: Uncertainty of the center below which a qubit has converged.
+        refinement_center(data_array, coord): Fit returning the center within the measured
+            range and its uncertainty. The uncertainty is None if the fit failed.
+    """
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self._validate_settings()
+
+    def _validate_settings(self) -> None:
+        """
+        Raises:
+            ValueError: If the adaptive settings of the node cannot produce a sweep.
+        """
+        # the step of a sweep is needed to combine the rounds
+        for attribute in ["adaptive_coarse_points", "adaptive_refinement_points"]:
+            if getattr(self.node, attribute) < 2:
+                raise ValueError(
+                    f"{attribute} of {self.node.name} must be at least 2, "
+                    f"got {getattr(self.node, attribute)}"
+                )
+        if self.node.adaptive_zoom <= 1:
+            raise ValueError(
+                f"adaptive_zoom of {self.node.name} must be larger than 1, "
+                f"got {self.node.adaptive_zoom}"
+            )
+        if self.node.adaptive_max_refinements < 0:
+            raise ValueError(
+                f"adaptive_max_refinements of {self.node.name} must not be negative, "
+                f"got {self.node.adaptive_max_refinements}"
+            )
+
+    def measure_node(self, measurement_mode) -> xarray.Dataset:
+        settable = self.node.adaptive_settable
+        full_samplespace = self.node.schedule_samplespace
+        sweeps = self._coarse_sweeps()
+
+        all_rounds = self.node.adaptive_max_refinements + 1
+        datasets = []
+        try:
+            for this_round in range(all_rounds):
+                # configure_dataset takes the coordinates from the schedule samplespace
+                self.node.schedule_samplespace = full_samplespace | {settable: sweeps}
+                compiled_schedule = self.node.precompile(self.node.schedule_samplespace)
+                # the number of rounds is not known before the sweep converged
+                logger.info(
+                    f"Adaptive sweep round {this_round + 1} of at most {all_rounds}"
+                )
+                datasets.append(
+                    self.node.measure_compiled_schedule(
+                        compiled_schedule, measurement_mode=measurement_mode
+                    )
+                )
+                result_dataset = self._combine_sweeps(datasets)
+
+                if this_round == all_rounds - 1:
+                    break
+                sweeps, converged = self._refined_sweeps(result_dataset, sweeps)
+                if converged:
+                    break
+        finally:
+            self.node.schedule_samplespace = full_samplespace
+
+        number_of_points = sum(
+            len(result_dataset[coord]) for coord in self._sweep_coords(result_dataset)
+        )
+        logger.info(
+            f"Adaptive sweep finished after {len(datasets)} rounds "
+            f"with {number_of_points} points"
+        )
+        return result_dataset
+
+    def schedule_samplespaces(self) -> list[dict]:
+        # only the coarse sweep is known before the measurement
+        return [
+            self.node.schedule_samplespace
+            | {self.node.adaptive_settable: self._coarse_sweeps()}
+        ]
+
+    def _coarse_sweeps(self) -> dict:
+        return {
+            element: np.linspace(
+                np.min(values), np.max(values), self.node.adaptive_coarse_points
+            )
+            for element, values in self.node.schedule_samplespace[
+                self.node.adaptive_settable
+            ].items()
+        }
+
+    def _refined_sweeps(
+        self, result_dataset: xarray.Dataset, sweeps: dict
+    ) -> tuple[dict, bool]:
+        """
+        The sweeps of the next round, centered on the fitted center of every element.
+        All elements are measured in the same schedule, so a converged element repeats its
+        last sweep, which replaces its earlier points instead of adding new ones.
+        The centers are rounded to the step of the refined sweep, so the same samplespace
+        and thus the compiled schedule in the compilation cache is reused if the centers
+        did not change, e.g. in the next calibration.
+        """
+        refined_sweeps = {}
+        converged = True
+        for data_var, coord in self._sweep_coords(result_dataset).items():
+            element = result_dataset[coord].attrs[
+                result_dataset[coord].attrs["element_type"]
+            ]
+            center, uncertainty = self.node.refinement_center(
+                result_dataset[data_var], coord
+            )
+            if uncertainty is not None and uncertainty <= self.node.adaptive_tolerance:
+                refined_sweeps[element] = sweeps[element]
+                continue
+            converged = False
+
+            span = np.ptp(sweeps[element]) / self.node.adaptive_zoom
+            step = span / (self.node.adaptive_refinement_points - 1)
+            center = np.round(center / step) * step
+            refined_sweeps[element] = np.linspace(
+                center - span / 2,
+                center + span / 2,
+                self.node.adaptive_refinement_points,
+            )
+        return refined_sweeps, converged
+
+    def _combine_sweeps(self, datasets: list[xarray.Dataset]) -> xarray.Dataset:
+        """
+        Concatenate the sweeps of every variable along its own sweep coordinate.
+        Points of an earlier round closer than half a step to a point of a later round are
+        replaced by the later one, the fit models guess the quality factor from the smallest
+        spacing between the frequencies.
+        """
+        data_vars = {}
+        for data_var in datasets[-1].data_vars:
+            coord = self._sweep_coords(datasets[-1])[data_var]
+            data_array = datasets[-1][data_var]
+            for dataset in reversed(datasets[:-1]):
+                kept_values = data_array[coord].values
+                earlier_values = dataset[coord].values
+                half_step = np.diff(np.sort(kept_values)).min() / 2
+                distances = np.abs(np.subtract.outer(earlier_values, kept_values))
+                earlier_array = dataset[data_var].isel(
+                    {coord: distances.min(axis=1) >= half_step}
+                )
+                data_array = xarray.concat([data_array, earlier_array], dim=coord)
+            data_vars[data_var] = data_array.sortby(coord)
+        return xarray.Dataset(data_vars, attrs=datasets[-1].attrs)
+
+    def _sweep_coords(self, dataset: xarray.Dataset) -> dict[str, str]:
+        # the coordinates are named after the settable and the element
+        return {
+            data_var: next(
+                str(dim)
+                for dim in dataset[data_var].dims
+                if str(dim).startswith(self.node.adaptive_settable)
+            )
+            for data_var in dataset.data_vars
+        }
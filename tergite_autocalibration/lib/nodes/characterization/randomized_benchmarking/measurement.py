@@ -107,10 +107,10 @@ class RandomizedBenchmarkingMeasurement(BaseMeasurement):
                     interleaving_gate
                 ]
 
-            # The inner for loop iterates over the random clifford sequence lengths
-            for acq_index, this_number_of_cliffords in enumerate(
-                clifford_sequence_lengths
-            ):
+            # The random sequences are drawn for all lengths first, so that
+            # the recovery gates are computed together from the product table
+            clifford_sequences = []
+            for this_number_of_cliffords in clifford_sequence_lengths:
                 clifford_sequence = rng.integers(
                     all_cliffords, size=this_number_of_cliffords
                 )  # for example if this_number_of_cliffords=4, a random_sequence could be [5, 14, 19, 23]
@@ -121,8 +121,15 @@ class RandomizedBenchmarkingMeasurement(BaseMeasurement):
                     interleaved_sequence[0::2] = clifford_sequence
                     interleaved_sequence[1::2] = interleaving_clifford_id
                     clifford_sequence = interleaved_sequence
+                clifford_sequences.append(clifford_sequence)
+            recovery_indices = cliffords.recovery_clifford_indices(clifford_sequences)
+
+            # The inner for loop iterates over the random clifford sequence lengths
+            for acq_index, (clifford_sequence, recovery_index) in enumerate(
+                zip(clifford_sequences, recovery_indices)
+            ):
                 self.single_qubit_rb_shot(
-                    shot, clifford_sequence, this_qubit, acq_index
+                    shot, clifford_sequence, this_qubit, acq_index, recovery_index
                 )
 
         return shot
@@ -133,6 +140,7 @@ class RandomizedBenchmarkingMeasurement(BaseMeasurement):
         clifford_sequence: np.ndarray,
         this_qubit: str,
         acq_index: int,
+        recovery_index: int | None = None,
     ) -> None:
 
         for sequence_index in clifford_sequence:
@@ -142,7 +150,9 @@ class RandomizedBenchmarkingMeasurement(BaseMeasurement):
                 phi = gate_angles["phi"]
                 shot.add(Rxy(qubit=this_qubit, theta=theta, phi=phi))
 
-        _, recovery_XY_operations = cliffords.reversing_XY_matrix(clifford_sequence)
+        if recovery_index is None:
+            recovery_index, _ = cliffords.reversing_XY_matrix(clifford_sequence)
+        recovery_XY_operations = cliffords.XY_decompositions[recovery_index]
 
         for gate_angles in recovery_XY_operations.values():
             theta = gate_angles["theta"]
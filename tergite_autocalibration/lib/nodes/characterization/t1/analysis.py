@@ -17,15 +17,56 @@
 Module containing a class that fits and plots data from a T1 experiment.
 """
 
+import threading
+from typing import Callable
+
 from matplotlib.axes import Axes
 import numpy as np
+import xarray as xr
 from quantify_core.analysis.fitting_models import ExpDecayModel
 
 from tergite_autocalibration.lib.base.analysis import (
     BaseAllQubitsAnalysis,
     BaseQubitAnalysis,
 )
+from tergite_autocalibration.lib.base.utils.analysis_utils import filter_ds_by_element
 from tergite_autocalibration.utils.dto.qoi import QOI
+from tergite_autocalibration.utils.logging import logger
+
+
+def _t1_coords(data_array: xr.DataArray) -> tuple[str, str]:
+    """
+    Returns:
+        The names of the repetitions coordinate and of the delays coordinate of a T1 measurement.
+    """
+    repetitions_coord = None
+    delays_coord = None
+    for coord in data_array.coords:
+        if "T1_repetition" in coord:
+            repetitions_coord = coord
+        elif "delays" in coord:
+            delays_coord = coord
+    return repetitions_coord, delays_coord
+
+
+def _fit_repetition(delays: np.ndarray, magnitudes: np.ndarray) -> dict[str, float]:
+    """
+    Fit the exponential decay of a single T1 repetition.
+
+    Args:
+        delays: The delays in μs.
+        magnitudes: The magnitudes of the signal, scaled like the delays.
+
+    Returns:
+        The fitted `tau`, `offset` and `amplitude`.
+    """
+    model = ExpDecayModel()
+    # Gives an initial guess for the model parameters and then fits the model to the data.
+    guess = model.guess(data=magnitudes, delay=delays)
+    fit_result = model.fit(magnitudes, params=guess, t=delays)
+    return {
+        name: fit_result.params[name].value for name in ("tau", "offset", "amplitude")
+    }
 
 
 class T1QubitAnalysis(BaseQubitAnalysis):
@@ -36,6 +77,8 @@ class T1QubitAnalysis(BaseQubitAnalysis):
 
     def __init__(self, name, redis_fields):
         super().__init__(name, redis_fields)
+        # the fits of the repetitions that are already known, by repetition
+        self.repetition_fits: dict = {}
         self.t1_times = []
         self.offset_times = []
         self.amplitude_times = []
@@ -58,11 +101,9 @@ class T1QubitAnalysis(BaseQubitAnalysis):
             QOI: A QOI object containing the analysis results.
         """
 
-        for coord in self.dataset[self.data_var].coords:
-            if "T1_repetition" in coord:
-                self.repetitions_coord = coord
-            elif "delays" in coord:
-                self.delays_coord = coord
+        self.repetitions_coord, self.delays_coord = _t1_coords(
+            self.dataset[self.data_var]
+        )
 
         self.delays = (
             self.dataset[self.delays_coord].values * 1e6
@@ -74,22 +115,25 @@ class T1QubitAnalysis(BaseQubitAnalysis):
             self.delays[0], self.delays[-1], 400
         )  # x-values for plotting
 
-        fit_result = None
-
-        for indx in range(len(self.dataset.coords[self.repetitions_coord])):
-            magnitudes = self.magnitudes[self.data_var].isel(
-                {self.repetitions_coord: indx}
-            )
-            magnitudes_flat = (
-                magnitudes.values.flatten() * 1e6
-            )  # Convert to microseconds
-
-            # Gives an initial guess for the model parameters and then fits the model to the data.
-            guess = model.guess(data=magnitudes_flat, delay=self.delays)
-            fit_result = model.fit(magnitudes_flat, params=guess, t=self.delays)
-            self.t1_times.append(fit_result.params["tau"].value)
-            self.offset_times.append(fit_result.params["offset"].value)
-            self.amplitude_times.append(fit_result.params["amplitude"].value)
+        for indx, repetition in enumerate(
+            self.dataset[self.repetitions_coord].values.tolist()
+        ):
+            if repetition not in self.repetition_fits:
+                magnitudes = self.magnitudes[self.data_var].isel(
+                    {self.repetitions_coord: indx}
+                )
+                magnitudes_flat = (
+                    magnitudes.values.flatten() * 1e6
+                )  # Convert to microseconds
+                self.repetition_fits[repetition] = _fit_repetition(
+                    self.delays, magnitudes_flat
+                )
+            repetition_fit = self.repetition_fits[repetition]
+            if repetition_fit is None:
+                raise ValueError(f"T1 of repetition {repetition} can not be fitted")
+            self.t1_times.append(repetition_fit["tau"])
+            self.offset_times.append(repetition_fit["offset"])
+            self.amplitude_times.append(repetition_fit["amplitude"])
 
         self.average_t1 = np.mean(self.t1_times)
         self.average_offset = np.mean(self.offset_times)
@@ -97,10 +141,11 @@ class T1QubitAnalysis(BaseQubitAnalysis):
         self.error = np.std(self.t1_times)
 
         # Prepare base params object for evaluating mean fit
-        average_params = fit_result.params.copy()
-        average_params["tau"].value = self.average_t1
-        average_params["offset"].value = self.average_offset
-        average_params["amplitude"].value = self.average_amplitude
+        average_params = model.make_params(
+            tau=self.average_t1,
+            offset=self.average_offset,
+            amplitude=self.average_amplitude,
+        )
 
         # Evaluate mean T1 fit
         self.average_t1_y = model.eval(params=average_params, t=self.fit_delays)
@@ -172,5 +217,150 @@ class T1NodeAnalysis(BaseAllQubitsAnalysis):
 
     single_qubit_analysis_obj = T1QubitAnalysis
 
+    # the repetitions stop once the spread of the fitted T1 times is below this fraction of their mean
+    relative_t1_tolerance = 0.05
+    minimum_repetitions = 3
+    # a repetition shows no decay if its T1 is longer than this multiple of the longest delay
+    no_decay_delay_factor = 10
+
     def __init__(self, name, redis_fields):
         super().__init__(name, redis_fields)
+        # the fits of the repetitions measured so far by qubit and repetition, None if the fit failed
+        self.t1_repetition_fits: dict[str, dict] = {}
+        # the streaming analysis and the convergence check fit the repetitions in different threads
+        self._fits_lock = threading.Lock()
+
+    def _fit_new_repetitions(self, dataset: xr.Dataset) -> dict[str, dict]:
+        """
+        Fit the repetitions of every qubit that are not fitted yet and keep the fits.
+
+        Args:
+            dataset: A dataset with the repetitions dimension.
+
+        Returns:
+            The fits of the repetitions in the dataset, by qubit and repetition.
+        """
+        dataset_fits = {}
+        with self._fits_lock:
+            for this_qubit in dataset.elements:
+                qubit_dataset = filter_ds_by_element(dataset, this_qubit)
+                data_var = list(qubit_dataset.data_vars)[0]
+                repetitions_coord, delays_coord = _t1_coords(qubit_dataset[data_var])
+                delays = qubit_dataset[delays_coord].values * 1e6
+                qubit_fits = self.t1_repetition_fits.setdefault(this_qubit, {})
+                dataset_fits[this_qubit] = {}
+                for indx, repetition in enumerate(
+                    qubit_dataset[repetitions_coord].values.tolist()
+                ):
+                    if repetition not in qubit_fits:
+                        magnitudes = np.abs(
+                            qubit_dataset[data_var]
+                            .isel({repetitions_coord: indx})
+                            .values
+                        )
+                        try:
+                            qubit_fits[repetition] = _fit_repetition(
+                                delays, magnitudes.flatten() * 1e6
+                            )
+                        except Exception as exception:
+                            logger.info(
+                                f"T1 of {this_qubit} can not be fitted for repetition "
+                                f"{repetition}: {exception}"
+                            )
+                            qubit_fits[repetition] = None
+                    dataset_fits[this_qubit][repetition] = qubit_fits[repetition]
+        return dataset_fits
+
+    def _qubit_analysis(self, this_qubit: str) -> T1QubitAnalysis:
+        qubit_analysis = super()._qubit_analysis(this_qubit)
+        # the repetitions fitted during the measurement are not fitted again
+        with self._fits_lock:
+            qubit_analysis.repetition_fits = dict(
+                self.t1_repetition_fits.get(this_qubit, {})
+            )
+        return qubit_analysis
+
+    def should_stop(
+        self,
+        dataset: xr.Dataset,
+        outer_values: dict,
+        partial_dataset: Callable[[], xr.Dataset],
+    ) -> bool:
+        """
+        Stop the T1 repetitions once the T1 of every qubit is stable.
+        Only the newest repetition is fitted, the fits of the earlier repetitions are kept.
+
+        Args:
+            dataset: The dataset of the newest repetition.
+            outer_values: The index of the newest repetition.
+            partial_dataset: Not used, the earlier repetitions are already fitted.
+
+        Returns:
+            True if, for every qubit, all repetitions could be fitted and the standard deviation
+            of the fitted T1 times is below `relative_t1_tolerance` of their mean.
+        """
+        self._fit_new_repetitions(
+            dataset.expand_dims(
+                {settable: [value] for settable, value in outer_values.items()}
+            )
+        )
+        for this_qubit in dataset.elements:
+            with self._fits_lock:
+                qubit_fits = list(self.t1_repetition_fits[this_qubit].values())
+            if len(qubit_fits) < self.minimum_repetitions or None in qubit_fits:
+                return False
+            t1_times = [qubit_fit["tau"] for qubit_fit in qubit_fits]
+            if not np.std(t1_times) < self.relative_t1_tolerance * abs(
+                np.mean(t1_times)
+            ):
+                return False
+        return True
+
+    def analyze_iteration(
+        self, dataset: xr.Dataset, outer_values: dict, iteration: tuple[int, int]
+    ) -> None:
+        """
+        Fit the T1 of every qubit as soon as a repetition is measured and log it,
+        while the following repetitions are still measured.
+        The fits are kept for the convergence check and the analysis of the node.
+
+        Args:
+            dataset: The dataset of the repetition.
+            outer_values: The index of the repetition.
+            iteration: Tuple of (current_iteration, total_iterations).
+
+        Raises:
+            ValueError: If the repetition shows no decay for any qubit, which aborts the measurement.
+        """
+        this_iteration, all_iterations = iteration
+        repetition_fits = self._fit_new_repetitions(
+            dataset.expand_dims(
+                {settable: [value] for settable, value in outer_values.items()}
+            )
+        )
+        qubits_without_decay = []
+        for this_qubit in dataset.elements:
+            (repetition_fit,) = repetition_fits[this_qubit].values()
+            qubit_dataset = filter_ds_by_element(dataset, this_qubit)
+            _, delays_coord = _t1_coords(
+                qubit_dataset[list(qubit_dataset.data_vars)[0]]
+            )
+            longest_delay = qubit_dataset[delays_coord].values.max() * 1e6
+            # a fitted T1 far beyond the longest delay is a flat signal
+            if repetition_fit is None or not (
+                0 < repetition_fit["tau"] < self.no_decay_delay_factor * longest_delay
+            ):
+                logger.info(
+                    f"T1 of {this_qubit} shows no decay in repetition {this_iteration + 1}"
+                )
+                qubits_without_decay.append(this_qubit)
+                continue
+            logger.info(
+                f"T1 of {this_qubit} in repetition {this_iteration + 1} of "
+                f"{all_iterations}: {repetition_fit['tau']:.1f} μs"
+            )
+        if qubits_without_decay and len(qubits_without_decay) == len(dataset.elements):
+            raise ValueError(
+                f"No qubit of {self.name} shows a T1 decay in repetition "
+                f"{this_iteration + 1} of {all_iterations}"
+            )
@@ -0,0 +1,148 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from tergite_autocalibration.lib.nodes.characterization.t1 import (
+    analysis as t1_analysis,
+)
+from tergite_autocalibration.lib.nodes.characterization.t1.analysis import (
+    T1NodeAnalysis,
+)
+
+
+def _t1_dataset(t1_times: list[float]) -> xr.Dataset:
+    """
+    Dataset of T1 repetitions as measured by the T1 node, one decay per T1 time
+    """
+    delays = 8e-9 + np.linspace(0, 300e-6, 40)
+    decays = np.array([np.exp(-delays / t1) for t1 in t1_times])
+    attributes = {"qubit": "q00", "element": "q00", "long_name": "yq00"}
+    return xr.Dataset(
+        {
+            "yq00": (
+                ("T1_repetitions", "delaysq00"),
+                1e-3 * (0.2 + decays) * np.exp(0.3j),
+                attributes,
+            )
+        },
+        coords={
+            "T1_repetitions": np.arange(len(t1_times)),
+            "delaysq00": ("delaysq00", delays, {"qubit": "q00", "element": "q00"}),
+        },
+        attrs={"elements": ["q00"]},
+    )
+
+
+def _should_stop_after_each_repetition(
+    analysis: T1NodeAnalysis, dataset: xr.Dataset
+) -> list[bool]:
+    """
+    Ask the analysis after each repetition, as the external parameter node does
+    """
+    stops = []
+    for repetition in dataset["T1_repetitions"].values.tolist():
+        stops.append(
+            analysis.should_stop(
+                dataset.isel(T1_repetitions=repetition, drop=True),
+                {"T1_repetitions": repetition},
+                lambda: dataset.isel(T1_repetitions=slice(0, repetition + 1)),
+            )
+        )
+    return stops
+
+
+def _counting_fits(monkeypatch) -> list:
+    """
+    Count the fits of single repetitions
+    """
+    fitted_repetitions = []
+    fit_repetition = t1_analysis._fit_repetition
+
+    def _counting_fit_repetition(delays, magnitudes):
+        fitted_repetitions.append(magnitudes)
+        return fit_repetition(delays, magnitudes)
+
+    monkeypatch.setattr(t1_analysis, "_fit_repetition", _counting_fit_repetition)
+    return fitted_repetitions
+
+
+def _analyze_each_repetition(analysis: T1NodeAnalysis, dataset: xr.Dataset):
+    repetitions = dataset["T1_repetitions"].values.tolist()
+    for repetition in repetitions:
+        analysis.analyze_iteration(
+            dataset.isel(T1_repetitions=repetition, drop=True),
+            {"T1_repetitions": repetition},
+            (repetition, len(repetitions)),
+        )
+
+
+def test_t1_should_stop_once_stable():
+    analysis = T1NodeAnalysis("T1", ["t1_time"])
+    dataset = _t1_dataset([50e-6, 51e-6, 49.5e-6])
+
+    assert _should_stop_after_each_repetition(analysis, dataset) == [
+        False,
+        False,
+        True,
+    ]
+    # nothing is stored for the analysis of the full dataset
+    assert analysis.qubit_analyses == []
+
+
+def test_t1_should_not_stop_while_spread():
+    analysis = T1NodeAnalysis("T1", ["t1_time"])
+    dataset = _t1_dataset([30e-6, 60e-6, 90e-6])
+
+    assert not any(_should_stop_after_each_repetition(analysis, dataset))
+
+
+def test_t1_should_stop_fits_each_repetition_once(monkeypatch):
+    fitted_repetitions = _counting_fits(monkeypatch)
+    analysis = T1NodeAnalysis("T1", ["t1_time"])
+    dataset = _t1_dataset([50e-6, 51e-6, 49.5e-6, 50.5e-6])
+
+    _should_stop_after_each_repetition(analysis, dataset)
+
+    assert len(fitted_repetitions) == 4
+    np.testing.assert_allclose(
+        [fit["tau"] for fit in analysis.t1_repetition_fits["q00"].values()],
+        [50.0, 51.0, 49.5, 50.5],
+        rtol=1e-3,
+    )
+
+
+def test_t1_analyze_node_reuses_the_streamed_fits(monkeypatch):
+    fitted_repetitions = _counting_fits(monkeypatch)
+    analysis = T1NodeAnalysis("T1", ["t1_time"])
+    dataset = _t1_dataset([50e-6, 60e-6])
+
+    _analyze_each_repetition(analysis, dataset)
+    qois = analysis.analyze_node(dataset)
+
+    assert len(fitted_repetitions) == 2
+    np.testing.assert_allclose(
+        analysis.qubit_analyses[0].t1_times, [50.0, 60.0], rtol=1e-3
+    )
+    assert qois["q00"].analysis_result["t1_time"]["value"] == pytest.approx(
+        55.0, rel=1e-3
+    )
+
+
+def test_t1_analyze_iteration_raises_without_decay():
+    analysis = T1NodeAnalysis("T1", ["t1_time"])
+    dataset = _t1_dataset([50e-6, 1.0])
+
+    with pytest.raises(ValueError, match="No qubit of T1 shows a T1 decay"):
+        _analyze_each_repetition(analysis, dataset)
@@ -18,7 +18,6 @@ import ast
 import numpy as np
 import xarray as xr
 
-from tergite_autocalibration.config.globals import REDIS_CONNECTION
 from tergite_autocalibration.lib.base.node import CouplerNode
 from tergite_autocalibration.lib.nodes.coupler.cz_calibration.analysis import (
     CZCalibrationNodeAnalysis,
@@ -64,14 +63,14 @@ class CZCalibrationNode(CouplerNode):
         }
 
     def working_frequencies(self, coupler: str):
-        frequency_list_string_representation = REDIS_CONNECTION.hget(
+        frequency_list_string_representation = self.redis_snapshot.hget(
             f"couplers:{coupler}", "cz_working_frequencies"
         )
         frequency_list = ast.literal_eval(frequency_list_string_representation)
         return np.array(frequency_list)
 
     def working_durations_in_ns(self, coupler: str):
-        duration_in_ns_string_representation = REDIS_CONNECTION.hget(
+        duration_in_ns_string_representation = self.redis_snapshot.hget(
             f"couplers:{coupler}", "cz_working_durations_in_ns"
         )
         duration_in_ns_list = ast.literal_eval(duration_in_ns_string_representation)
@@ -18,7 +18,6 @@ from typing import Literal
 import numpy as np
 import xarray as xr
 
-from tergite_autocalibration.config.globals import REDIS_CONNECTION
 from tergite_autocalibration.lib.base.node import CouplerNode
 from tergite_autocalibration.lib.nodes.coupler.cz_chevron.analysis import (
     CZChevronAnalysis,
@@ -73,13 +72,13 @@ class CZChevronNode(CouplerNode):
 
     def known_cz_frequency(self, coupler: str):
         known_cz_frequency = float(
-            REDIS_CONNECTION.hget(f"couplers:{coupler}", "cz_pulse_frequency")
+            self.redis_snapshot.hget(f"couplers:{coupler}", "cz_pulse_frequency")
         )
         return known_cz_frequency
 
     def max_duration(self, coupler: str):
         half_duration = float(
-            REDIS_CONNECTION.hget(f"couplers:{coupler}", "cz_half_duration")
+            self.redis_snapshot.hget(f"couplers:{coupler}", "cz_half_duration")
         )
         max_duration = 2 * half_duration
         max_duration_in_ns = round(max_duration / 1e-9)
@@ -90,7 +89,7 @@ class CZChevronNode(CouplerNode):
     def all_phase_paths(self) -> dict[str, Literal["via_02", "via_20"]]:
         phase_paths = {}
         for coupler in self.couplers:
-            path = REDIS_CONNECTION.hget(f"couplers:{coupler}", "cz_phase_path")
+            path = self.redis_snapshot.hget(f"couplers:{coupler}", "cz_phase_path")
             phase_paths[coupler] = path
         return phase_paths
 
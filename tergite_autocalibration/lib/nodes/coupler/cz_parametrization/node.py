@@ -19,7 +19,6 @@ import numpy as np
 import xarray as xr
 from scipy.stats import multivariate_normal
 
-from tergite_autocalibration.config.globals import REDIS_CONNECTION
 from tergite_autocalibration.lib.base.node import CouplerNode
 from tergite_autocalibration.lib.nodes.coupler.cz_parametrization.analysis import (
     CZParametrizationNodeAnalysis,
@@ -40,8 +39,8 @@ class CZParametrizationNode(CouplerNode):
     measurement_type = ExternalParameterNode
     coupler_qois = ["cz_pulse_frequency", "cz_pulse_amplitude", "parking_current"]
 
-    def __init__(self, all_qubits: list[str], couplers: list[str]):
-        super().__init__(couplers)
+    def __init__(self, all_qubits: list[str], couplers: list[str], **schedule_keywords):
+        super().__init__(couplers, **schedule_keywords)
         self.couplers = couplers
 
         self.coupled_qubits = self.get_coupled_qubits()
@@ -84,13 +83,13 @@ class CZParametrizationNode(CouplerNode):
 
     def parking_current(self, coupler: str):
         return float(
-            REDIS_CONNECTION.hget(f"couplers:{coupler}", "initial_parking_current")
+            self.redis_snapshot.hget(f"couplers:{coupler}", "initial_parking_current")
         )
 
     def all_phase_paths(self) -> dict[str, Literal["via_02", "via_20"]]:
         phase_paths = {}
         for coupler in self.couplers:
-            path = REDIS_CONNECTION.hget(f"couplers:{coupler}", "cz_phase_path")
+            path = self.redis_snapshot.hget(f"couplers:{coupler}", "cz_phase_path")
             phase_paths[coupler] = path
         return phase_paths
 
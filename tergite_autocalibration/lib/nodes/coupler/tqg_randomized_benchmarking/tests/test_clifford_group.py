@@ -4,6 +4,8 @@
 # Copyright (C) Chalmers Next Labs 2025
 
 import unittest
+from unittest import mock
+
 import numpy as np
 from tergite_autocalibration.lib.nodes.coupler.tqg_randomized_benchmarking.utils.clifford_group import (
     SingleQubitClifford,
@@ -14,6 +16,11 @@ from tergite_autocalibration.lib.nodes.coupler.tqg_randomized_benchmarking.utils
 class TestClifford(unittest.TestCase):
 
     def setUp(self):
+        # Compute the Clifford tables in memory instead of caching them in the data directory
+        patcher = mock.patch.object(TwoQubitClifford, "CACHE_TABLES_ON_DISK", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
         # Clear caches before tests
         SingleQubitClifford.CLIFFORD_HASH_TABLE.clear()
         TwoQubitClifford.CLIFFORD_HASH_TABLE.clear()
@@ -109,6 +116,33 @@ class TestClifford(unittest.TestCase):
                 # Assert that the index in the hash table matches the original index
                 self.assertEqual(CliffordClass.CLIFFORD_HASH_TABLE[hash_value], idx)
 
+    def test_multiplication_table_matches_pauli_transfer_matrices(self):
+        rng = np.random.default_rng(11)
+        for CliffordClass in self.test_cases:
+            with self.subTest(CliffordClass=CliffordClass.__name__):
+                table = CliffordClass.multiplication_table()
+                self.assertEqual(
+                    table.shape, (CliffordClass.GROUP_SIZE, CliffordClass.GROUP_SIZE)
+                )
+                pairs = rng.integers(CliffordClass.GROUP_SIZE, size=(200, 2))
+                for idx_a, idx_b in pairs:
+                    ptm = np.dot(
+                        CliffordClass(idx_a).pauli_transfer_matrix,
+                        CliffordClass(idx_b).pauli_transfer_matrix,
+                    )
+                    self.assertEqual(
+                        table[idx_a, idx_b], CliffordClass.find_clifford_index(ptm)
+                    )
+
+    def test_inverse_table(self):
+        for CliffordClass in self.test_cases:
+            with self.subTest(CliffordClass=CliffordClass.__name__):
+                table = CliffordClass.multiplication_table()
+                inverse_table = CliffordClass.inverse_table()
+                indices = np.arange(CliffordClass.GROUP_SIZE)
+                self.assertTrue(np.all(table[inverse_table, indices] == 0))
+                self.assertTrue(np.all(table[indices, inverse_table] == 0))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@
 # Copyright (C) Chalmers Next Labs 2025
 
 import unittest
+from unittest import mock
 
 import numpy as np
 
@@ -26,6 +27,11 @@ from tergite_autocalibration.lib.nodes.coupler.tqg_randomized_benchmarking.utils
 class TestRandomizedBenchmarkingSequence(unittest.TestCase):
 
     def setUp(self) -> None:
+        # Compute the Clifford tables in memory instead of caching them in the data directory
+        patcher = mock.patch.object(TwoQubitClifford, "CACHE_TABLES_ON_DISK", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
         # CliffordClass, clifford_group, interleaved_clifford_idx
         self.test_cases = [(SingleQubitClifford, 1, 20), (TwoQubitClifford, 2, 10_4368)]
 
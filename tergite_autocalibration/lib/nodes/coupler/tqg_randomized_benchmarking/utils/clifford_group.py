@@ -27,9 +27,20 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
+from pathlib import Path
+from typing import ClassVar, Dict, List, Optional, Tuple
+from uuid import uuid4
+
 import numpy as np
+
+from tergite_autocalibration.config.globals import DATA_DIR
+from tergite_autocalibration.utils.logging import logger
 from .pauli_transfer_matrices import I, X, Y, Z, S, S2, H, CZ
-from typing import List, Tuple, Dict, ClassVar
+
+# Increase when the decomposition of the Clifford groups changes, to
+# invalidate the multiplication tables cached on disk
+CLIFFORD_TABLES_VERSION = 1
 
 # The decomposition of the single qubit clifford group as per
 # Epstein et al. Phys. Rev. A 89, 062321 (2014)
@@ -111,10 +122,14 @@ class Clifford:
         idx (int): Index of the Clifford operation
         GROUP_SIZE (ClassVar[int]): Size of the Clifford group
         CLIFFORD_HASH_TABLE (CLassVar[Dict[int, int]]): Hash table for fast lookup of Clifford indices
+        CACHE_TABLES_ON_DISK (ClassVar[bool]): Whether the multiplication table is cached in the data directory
     """
 
     CLIFFORD_HASH_TABLE: ClassVar[Dict[int, int]]
     GROUP_SIZE: ClassVar[int]
+    CACHE_TABLES_ON_DISK: ClassVar[bool] = False
+    _MULTIPLICATION_TABLE: ClassVar[Optional[np.ndarray]] = None
+    _INVERSE_TABLE: ClassVar[Optional[np.ndarray]] = None
 
     def __init__(self, idx: int) -> None:
         """Initialize the Clifford object with a given index
@@ -151,9 +166,8 @@ class Clifford:
                 f"Cannot multiply {self.__class__.__name__} with {other.__class__.__name__}"
             )
 
-        net_op = np.dot(self.pauli_transfer_matrix, other.pauli_transfer_matrix)
-        idx = self.find_clifford_index(net_op)
-        return self.__class__(idx)
+        idx = self.multiplication_table()[self.idx, other.idx]
+        return self.__class__(int(idx))
 
     def __eq__(self, other: "Clifford") -> bool:
         """Check if two Clifford operations are equal.
@@ -174,9 +188,8 @@ class Clifford:
         Returns:
             Clifford: The inverse operation
         """
-        inverse_ptm = np.linalg.inv(self.pauli_transfer_matrix).astype(int)
-        idx = self.find_clifford_index(inverse_ptm)
-        return self.__class__(idx)
+        idx = self.inverse_table()[self.idx]
+        return self.__class__(int(idx))
 
     @property
     def pauli_transfer_matrix(self) -> np.ndarray:
@@ -224,6 +237,132 @@ class Clifford:
 
         raise ValueError("Clifford index not found.")
 
+    @classmethod
+    def multiplication_table(cls) -> np.ndarray:
+        """Table with the indices of the products of two Clifford operations
+
+        The entry [a, b] is the index of the Clifford with the Pauli transfer matrix
+        PTM(a) @ PTM(b), i.e. the Clifford b is applied first.
+
+        Returns:
+            np.ndarray: GROUP_SIZE x GROUP_SIZE table of Clifford indices
+        """
+        if cls._MULTIPLICATION_TABLE is None:
+            cls._MULTIPLICATION_TABLE, cls._INVERSE_TABLE = cls._load_tables()
+        return cls._MULTIPLICATION_TABLE
+
+    @classmethod
+    def inverse_table(cls) -> np.ndarray:
+        """Indices of the inverse of every Clifford operation
+
+        Returns:
+            np.ndarray: Vector with the index of the inverse of each Clifford
+        """
+        if cls._INVERSE_TABLE is None:
+            cls._MULTIPLICATION_TABLE, cls._INVERSE_TABLE = cls._load_tables()
+        return cls._INVERSE_TABLE
+
+    @classmethod
+    def _load_tables(cls) -> Tuple[np.ndarray, np.ndarray]:
+        """Computes the multiplication and inverse tables or loads them from the disk cache
+
+        The multiplication table of the two qubit Clifford group has 11520 x 11520
+        entries, it is stored as .npy file and memory-mapped instead of being read.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The multiplication table and the inverse table
+        """
+        if not cls.CACHE_TABLES_ON_DISK:
+            multiplication_table = np.empty(
+                (cls.GROUP_SIZE, cls.GROUP_SIZE), dtype=np.uint16
+            )
+            inverse_table = cls._compute_tables(multiplication_table)
+            return multiplication_table, inverse_table
+
+        table_dir = Path(DATA_DIR) / "clifford_tables"
+        table_name = f"{cls.__name__}_v{CLIFFORD_TABLES_VERSION}"
+        multiplication_path = table_dir / f"{table_name}_multiplication.npy"
+        inverse_path = table_dir / f"{table_name}_inverse.npy"
+
+        if not (multiplication_path.exists() and inverse_path.exists()):
+            logger.info(f"Generating the multiplication table of {cls.__name__}")
+            table_dir.mkdir(parents=True, exist_ok=True)
+            # Concurrent runs write to their own files, the last rename wins
+            temporary_suffix = f".{uuid4().hex}.tmp.npy"
+            temporary_multiplication_path = multiplication_path.with_suffix(
+                temporary_suffix
+            )
+            temporary_inverse_path = inverse_path.with_suffix(temporary_suffix)
+            multiplication_table = np.lib.format.open_memmap(
+                temporary_multiplication_path,
+                mode="w+",
+                dtype=np.uint16,
+                shape=(cls.GROUP_SIZE, cls.GROUP_SIZE),
+            )
+            inverse_table = cls._compute_tables(multiplication_table)
+            multiplication_table.flush()
+            del multiplication_table
+            np.save(temporary_inverse_path, inverse_table)
+            os.replace(temporary_inverse_path, inverse_path)
+            os.replace(temporary_multiplication_path, multiplication_path)
+
+        return np.load(multiplication_path, mmap_mode="r"), np.load(inverse_path)
+
+    @classmethod
+    def _compute_tables(cls, multiplication_table: np.ndarray) -> np.ndarray:
+        """Fills the multiplication table and returns the inverse table
+
+        The Pauli transfer matrices of Cliffords are signed permutations of the Pauli
+        operators. A Clifford is identified by the signed images of the X and Z operators
+        of every qubit, the images of a product are composed without multiplying matrices.
+
+        Args:
+            multiplication_table (np.ndarray): GROUP_SIZE x GROUP_SIZE array to fill
+
+        Returns:
+            np.ndarray: Vector with the index of the inverse of each Clifford
+        """
+        ptms = np.array(
+            [cls(idx=idx).pauli_transfer_matrix for idx in range(cls.GROUP_SIZE)]
+        )
+        ptms = ptms.round().astype(np.int8)
+        # The image of the Pauli operator j is sign[j] * P[permutation[j]]
+        permutations = np.abs(ptms).argmax(axis=1)
+        signs = np.take_along_axis(ptms, permutations[:, None, :], axis=1)[:, 0, :]
+
+        # Pauli operators are ordered I, X, Y, Z and the first qubit is the fastest index
+        number_of_qubits = int(np.log(ptms.shape[1]) / np.log(4) + 0.5)
+        generators = [
+            4**qubit * pauli for qubit in range(number_of_qubits) for pauli in (1, 3)
+        ]
+        bits_per_generator = int(2 * ptms.shape[1] - 1).bit_length()
+
+        def generator_keys(images: np.ndarray, image_signs: np.ndarray) -> np.ndarray:
+            codes = 2 * images.astype(np.int64) + (image_signs < 0)
+            shifts = bits_per_generator * np.arange(len(generators))
+            return np.sum(codes << shifts, axis=-1)
+
+        keys = generator_keys(permutations[:, generators], signs[:, generators])
+        if len(np.unique(keys)) != cls.GROUP_SIZE:
+            raise ValueError("The Cliffords are not identified by their generators.")
+        key_to_index = np.zeros(1 << (bits_per_generator * len(generators)), np.uint16)
+        key_to_index[keys] = np.arange(cls.GROUP_SIZE)
+
+        first_images = permutations[:, generators]
+        first_signs = signs[:, generators]
+        inverse_table = np.empty(cls.GROUP_SIZE, dtype=np.uint16)
+        block_size = 64
+        for start in range(0, cls.GROUP_SIZE, block_size):
+            stop = min(start + block_size, cls.GROUP_SIZE)
+            rows = np.arange(start, stop)[:, None, None]
+            product_images = permutations[rows, first_images]
+            product_signs = signs[rows, first_images] * first_signs
+            block = key_to_index[generator_keys(product_images, product_signs)]
+            multiplication_table[start:stop] = block
+            inverse_rows, inverse_columns = np.nonzero(block == 0)
+            inverse_table[inverse_columns] = inverse_rows + start
+        return inverse_table
+
     @staticmethod
     def _hash_matrix(matrix: np.ndarray) -> int:
         """Create a hash value for a matrix using NumPy's internal representation.
@@ -324,6 +463,7 @@ class TwoQubitClifford(Clifford):
 
     # Class Variables
     CLIFFORD_HASH_TABLE = {}
+    CACHE_TABLES_ON_DISK = True
     _PTM_CACHE = {}  # Initialize the cache for PTMs
     _GATE_DECOMP_CACHE = {}  # Initialize the cache for gate decompositions
 
@@ -53,16 +53,15 @@ def calculate_net_clifford(
         the reverse of what it would be in a chained dot product.
     """
 
-    # Calculate the net clifford
-    net_clifford = CliffordClass(0)  # assumes element 0 is the Identity
-    for idx in clifford_indices:
-        clifford = CliffordClass(idx % 100_000)
-
+    # Calculate the net clifford by walking through the multiplication table
+    multiplication_table = CliffordClass.multiplication_table()
+    net_clifford_idx = 0  # assumes element 0 is the Identity
+    for idx in np.asarray(clifford_indices, dtype=np.int64) % 100_000:
         # order of operators applied in is right to left, therefore
         # the new operator is applied on the left side.
-        net_clifford = clifford * net_clifford
+        net_clifford_idx = multiplication_table[idx, net_clifford_idx]
 
-    return net_clifford
+    return CliffordClass(int(net_clifford_idx))
 
 
 def add_interleaved_clifford(
@@ -102,8 +101,8 @@ def add_inverse_clifford(
     # Calculate the net Clifford
     net_clifford = calculate_net_clifford(clifford_sequence, CliffordClass)
     # Get the inverse of the net clifford to find the Clifford that inverts the sequence
-    inverse_clifford = CliffordClass(net_clifford.idx).get_inverse()
-    return np.append(clifford_sequence, inverse_clifford.idx)
+    inverse_clifford_idx = CliffordClass.inverse_table()[net_clifford.idx]
+    return np.append(clifford_sequence, inverse_clifford_idx)
 
 
 def randomized_benchmarking_sequence(
@@ -16,14 +16,18 @@
 import math
 from itertools import product
 
-import numpy as np
 import xarray
 
+from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.base.analysis import BaseNodeAnalysis
 from tergite_autocalibration.lib.base.measurement import MeasurementType
+from tergite_autocalibration.lib.utils.result_buffer import OuterResultBuffer
+from tergite_autocalibration.lib.utils.streaming_analysis import StreamingAnalysis
 from tergite_autocalibration.utils.measurement_utils import (
     reduce_samplespace,
     samplespace_dimensions,
 )
+from tergite_autocalibration.utils.logging import logger
 
 
 class ExternalParameterNode(MeasurementType):
@@ -49,46 +53,84 @@ class ExternalParameterNode(MeasurementType):
         # this implementation supports only 1 external parameter
         iterations = product(*(range(n) for n in external_dimensions))
         all_iterations = math.prod(external_dimensions)
-        external_dim = list(self.node.external_samplespace.keys())[0]
-        external_settables = self.node.external_samplespace.keys()
-
-        result_dataset = xarray.Dataset()
+        external_settables = list(self.node.external_samplespace.keys())
+
+        # NOTE: this assumes the external values are the same for all elements.
+        # Expanding the dimensions one by one puts the last settable first.
+        result_buffer = OuterResultBuffer(
+            {
+                external_dim: list(
+                    self.node.external_samplespace[external_dim].values()
+                )[0]
+                for external_dim in reversed(external_settables)
+            }
+        )
 
         compiled_schedule = self.node.precompile(self.node.schedule_samplespace)
 
         self.node.initial_operation()
+        streaming_analysis = StreamingAnalysis.for_node(self.node)
+        early_termination = (
+            CONFIG.run.early_termination
+            and self.node.analysis_obj.should_stop is not BaseNodeAnalysis.should_stop
+        )
 
-        for this_interation_index, this_iteration in enumerate(iterations):
-            self.node.reduced_external_samplespace = reduce_samplespace(
-                this_iteration, self.node.external_samplespace
-            )
-            element_dict = list(self.node.reduced_external_samplespace.values())[0]
-
-            # current_value = list(element_dict.values())[0]
+        try:
+            for this_interation_index, this_iteration in enumerate(iterations):
+                self.node.reduced_external_samplespace = reduce_samplespace(
+                    this_iteration, self.node.external_samplespace
+                )
+                element_dict = list(self.node.reduced_external_samplespace.values())[0]
 
-            self.node.pre_measurement_operation(
-                reduced_ext_space=self.node.reduced_external_samplespace
-            )
+                # current_value = list(element_dict.values())[0]
 
-            ds = self.node.measure_compiled_schedule(
-                compiled_schedule,
-                measurement_mode,
-                measurement=(this_interation_index, all_iterations),
-            )
+                self.node.pre_measurement_operation(
+                    reduced_ext_space=self.node.reduced_external_samplespace
+                )
 
-            # ds = ds.expand_dims({external_dim: np.array([current_value])})
-            for external_dim in self.node.reduced_external_samplespace:
-                # NOTE: this assumes the external values are the same for all elements
-                ext_value = list(
-                    self.node.reduced_external_samplespace[external_dim].values()
-                )[0]
-                ds = ds.expand_dims({external_dim: np.array([ext_value])})
-            # we explicitly set join='outer' because we want the union of the old coordinates with the new
-            result_dataset = xarray.merge(
-                [ds, result_dataset], join="outer", compat="no_conflicts"
-            )
+                ds = self.node.measure_compiled_schedule(
+                    compiled_schedule,
+                    measurement_mode,
+                    measurement=(this_interation_index, all_iterations),
+                )
 
-        # example of final Operation is ramping the current back to 0 in coupler spectroscopy
-        self.node.final_operation()
+                result_buffer.add(dict(zip(external_settables, this_iteration)), ds)
 
-        return result_dataset
+                # NOTE: this assumes the external values are the same for all elements
+                external_values = {
+                    external_dim: list(element_values.values())[0]
+                    for external_dim, element_values in self.node.reduced_external_samplespace.items()
+                }
+
+                if streaming_analysis is not None:
+                    streaming_analysis.submit(
+                        ds,
+                        external_values,
+                        (this_interation_index, all_iterations),
+                    )
+
+                is_last_iteration = this_interation_index == all_iterations - 1
+                if (
+                    early_termination
+                    and not is_last_iteration
+                    # the partial dataset is only built if the analysis asks for it
+                    and self.node.should_stop(
+                        ds, external_values, result_buffer.to_dataset
+                    )
+                ):
+                    logger.info(
+                        f"{self.node.name} converged after {this_interation_index + 1} "
+                        f"of {all_iterations} iterations"
+                    )
+                    break
+
+            if streaming_analysis is not None:
+                streaming_analysis.join()
+        finally:
+            if streaming_analysis is not None:
+                streaming_analysis.shutdown()
+            # example of final Operation is ramping the current back to 0 in coupler spectroscopy,
+            # it also has to happen if the measurement failed
+            self.node.final_operation()
+
+        return result_buffer.to_dataset()
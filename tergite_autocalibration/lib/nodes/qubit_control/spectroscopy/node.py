@@ -17,6 +17,9 @@ from lmfit.models import LorentzianModel
 
 from tergite_autocalibration.config.globals import CONFIG
 from tergite_autocalibration.lib.base.node import QubitNode
+from tergite_autocalibration.lib.nodes.adaptive_schedule_node import (
+    AdaptiveScheduleNode,
+)
 from tergite_autocalibration.lib.nodes.qubit_control.spectroscopy.analysis import (
     QubitSpectroscopy12NodeAnalysis,
     QubitSpectroscopyNodeAnalysis,
@@ -35,9 +38,50 @@ peak = LorentzianModel()
 
 
 class QubitSpectroscopyBase(QubitNode):
+    # refinement of the spectroscopy if adaptive_spectroscopy is enabled in the run configuration
+    adaptive_settable = "spec_frequencies"
+    adaptive_coarse_points = 17
+    adaptive_refinement_points = 5
+    adaptive_zoom = 4
+    adaptive_max_refinements = 2
+    adaptive_tolerance = 20e3
 
     def __init__(self, all_qubits: list[str], couplers: list[str], **schedule_keywords):
         super().__init__(all_qubits, couplers, **schedule_keywords)
+        if CONFIG.run.adaptive_spectroscopy:
+            self.measurement_type = AdaptiveScheduleNode
+
+    @staticmethod
+    def refinement_center(
+        data_array: xarray.DataArray, frequency_coord: str
+    ) -> tuple[float, float | None]:
+        """
+        Fit a Lorentzian to the spectroscopy at the spec amplitude with the largest response.
+
+        Args:
+            data_array: The spectroscopy of one qubit.
+            frequency_coord: Name of the frequency coordinate.
+
+        Returns:
+            The center of the peak and its uncertainty, None if the fit failed.
+        """
+        frequencies = data_array[frequency_coord].values
+        magnitudes = np.abs(data_array.transpose(..., frequency_coord).values)
+        magnitudes = magnitudes.reshape(-1, len(frequencies))
+        magnitudes = magnitudes[magnitudes.max(axis=1).argmax()]
+        magnitudes = magnitudes - np.median(magnitudes)
+
+        maximum_frequency = frequencies[magnitudes.argmax()]
+        model = LorentzianModel()
+        try:
+            guess = model.guess(magnitudes, x=frequencies)
+            fit_result = model.fit(magnitudes, params=guess, x=frequencies)
+        except Exception:
+            return maximum_frequency, None
+        center = fit_result.params["center"].value
+        if not frequencies.min() <= center <= frequencies.max():
+            return maximum_frequency, None
+        return center, fit_result.params["center"].stderr
 
     def generate_dummy_dataset(self):
         dataset = xarray.Dataset()
@@ -47,10 +91,9 @@ class QubitSpectroscopyBase(QubitNode):
         )
         for index, qubit in enumerate(self.all_qubits):
             qubit_freq = CONFIG.device.qubits[qubit]["VNA_f01_frequency"]
-            samples = qubit_samples(qubit)
             if self.name == "qubit_12_spectroscopy":
                 qubit_freq = CONFIG.device.qubits[qubit]["VNA_f12_frequency"]
-                samples = qubit_samples(qubit, transition="12")
+            samples = self.schedule_samplespace["spec_frequencies"][qubit]
             true_params = peak.make_params(
                 amplitude=0.2, center=qubit_freq, sigma=0.1e6
             )
@@ -11,7 +11,12 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import pytest
+
 from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.nodes.adaptive_schedule_node import (
+    AdaptiveScheduleNode,
+)
 from tergite_autocalibration.lib.nodes.qubit_control.spectroscopy.node import (
     Qubit01SpectroscopyAmplitudeNode,
     Qubit01SpectroscopyNode,
@@ -36,6 +41,30 @@ def test_measurement_12_type():
     assert issubclass(node_12.measurement_type, ScheduleNode)
 
 
+def test_measurement_01_adaptive_type(monkeypatch):
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    monkeypatch.setitem(CONFIG.run._dict, "adaptive_spectroscopy", True)
+    node_01 = Qubit01SpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    assert issubclass(node_01.measurement_type, AdaptiveScheduleNode)
+    # only the coarse sweep is known before the measurement
+    first_qubit = CONFIG.run.qubits[0]
+    (samplespace,) = node_01.measurement_type(node_01).schedule_samplespaces()
+    assert len(samplespace["spec_frequencies"][first_qubit]) == 17
+
+
+@pytest.mark.parametrize(
+    "attribute, value",
+    [("adaptive_refinement_points", 1), ("adaptive_coarse_points", 0)],
+)
+def test_adaptive_settings_are_validated(monkeypatch, attribute, value):
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    monkeypatch.setitem(CONFIG.run._dict, "adaptive_spectroscopy", True)
+    node_01 = Qubit01SpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    setattr(node_01, attribute, value)
+    with pytest.raises(ValueError, match=attribute):
+        node_01.measurement_type(node_01)
+
+
 def test_measurement_bring_up_type():
     ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
     node_bring_up = Qubit01SpectroscopyAmplitudeNode(
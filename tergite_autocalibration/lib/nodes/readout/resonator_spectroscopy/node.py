@@ -17,6 +17,9 @@ from quantify_core.analysis import fitting_models as fm
 
 from tergite_autocalibration.config.globals import CONFIG
 from tergite_autocalibration.lib.base.node import QubitNode
+from tergite_autocalibration.lib.nodes.adaptive_schedule_node import (
+    AdaptiveScheduleNode,
+)
 from tergite_autocalibration.lib.nodes.readout.resonator_spectroscopy.analysis import (
     ResonatorSpectroscopy1NodeAnalysis,
     ResonatorSpectroscopy2NodeAnalysis,
@@ -32,9 +35,47 @@ resonator = fm.ResonatorModel()
 
 
 class ResonatorSpectroscopyBase(QubitNode):
+    # refinement of the spectroscopy if adaptive_spectroscopy is enabled in the run configuration
+    adaptive_settable = "ro_frequencies"
+    adaptive_coarse_points = 20
+    adaptive_refinement_points = 5
+    adaptive_zoom = 4
+    adaptive_max_refinements = 2
+    adaptive_tolerance = 10e3
 
     def __init__(self, all_qubits: list[str], couplers: list[str], **schedule_keywords):
         super().__init__(all_qubits, couplers=couplers, **schedule_keywords)
+        if CONFIG.run.adaptive_spectroscopy:
+            self.measurement_type = AdaptiveScheduleNode
+
+    @staticmethod
+    def refinement_center(
+        data_array: xarray.DataArray, frequency_coord: str
+    ) -> tuple[float, float | None]:
+        """
+        Fit the resonator model to the spectroscopy.
+
+        Args:
+            data_array: The spectroscopy of one qubit.
+            frequency_coord: Name of the frequency coordinate.
+
+        Returns:
+            The resonance frequency and its uncertainty, None if the fit failed.
+        """
+        frequencies = data_array[frequency_coord].values
+        s21_values = data_array.values
+        minimum_frequency = frequencies[np.abs(s21_values).argmin()]
+        # the guess sets parameter hints, a separate model keeps the dummy data unbounded
+        model = fm.ResonatorModel()
+        try:
+            guess = model.guess(s21_values, f=frequencies)
+            fit_result = model.fit(s21_values, params=guess, f=frequencies)
+        except Exception:
+            return minimum_frequency, None
+        center = fit_result.params["fr"].value
+        if not frequencies.min() <= center <= frequencies.max():
+            return minimum_frequency, None
+        return center, fit_result.params["fr"].stderr
 
     def generate_dummy_dataset(self, noise=False):
         dataset = xarray.Dataset()
@@ -61,7 +102,7 @@ class ResonatorSpectroscopyBase(QubitNode):
                 # f_0=ro_freq, Q=10000, Q_e_real=9000, Q_e_imag=-9000
             )
             np.random.seed(123)
-            samples = resonator_samples(qubit)
+            samples = self.schedule_samplespace["ro_frequencies"][qubit]
             number_of_samples = len(samples)
             frequncies = np.linspace(samples[0], samples[-1], number_of_samples)
             true_s21 = resonator.eval(params=true_params, f=frequncies)
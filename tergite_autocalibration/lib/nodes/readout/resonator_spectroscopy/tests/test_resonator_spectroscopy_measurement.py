@@ -11,13 +11,19 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import numpy as np
+
 from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.nodes.adaptive_schedule_node import (
+    AdaptiveScheduleNode,
+)
 from tergite_autocalibration.lib.nodes.readout.resonator_spectroscopy.node import (
     ResonatorSpectroscopy1Node,
     ResonatorSpectroscopy2Node,
     ResonatorSpectroscopyNode,
 )
 from tergite_autocalibration.lib.nodes.schedule_node import ScheduleNode
+from tergite_autocalibration.utils.dto.enums import MeasurementMode
 from tergite_autocalibration.utils.dto.extended_transmon_element import ExtendedTransmon
 
 
@@ -73,3 +79,40 @@ def test_dummy_2_generation():
     )
     assert len(dummy_dataset_2.data_vars) == len(CONFIG.run.qubits)
     assert dummy_dataset_2.data_vars[0].size == number_of_frequencies
+
+
+def _dummy_readout_frequencies(node) -> dict:
+    """
+    Measure the node on dummy data, without compiling the schedules
+    """
+    node.precompile = lambda samplespace: None
+    node.measure_compiled_schedule = (
+        lambda compiled_schedule, measurement_mode, measurement=(0, 1): (
+            node.configure_dataset(node.generate_dummy_dataset())
+        )
+    )
+    dataset = node.measure_node(MeasurementMode.dummy)
+    analysis = node.analysis_obj(node.name, node.redis_fields)
+    qois = analysis.analyze_node(dataset)
+    number_of_points = dataset[f"y{CONFIG.run.qubits[0]}"].size
+    return number_of_points, {
+        qubit: qoi.analysis_result["clock_freqs:readout"]["value"]
+        for qubit, qoi in qois.items()
+    }
+
+
+def test_adaptive_measurement(monkeypatch):
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    node = ResonatorSpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    dense_points, dense_frequencies = _dummy_readout_frequencies(node)
+
+    ExtendedTransmon.close_all()
+    monkeypatch.setitem(CONFIG.run._dict, "adaptive_spectroscopy", True)
+    node = ResonatorSpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    assert issubclass(node.measurement_type, AdaptiveScheduleNode)
+    adaptive_points, adaptive_frequencies = _dummy_readout_frequencies(node)
+    ExtendedTransmon.close_all()
+
+    assert adaptive_points < dense_points
+    for qubit, frequency in dense_frequencies.items():
+        assert np.isclose(adaptive_frequencies[qubit], frequency, rtol=0, atol=1e3)
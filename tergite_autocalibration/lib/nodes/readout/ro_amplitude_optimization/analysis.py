@@ -17,7 +17,7 @@ import numpy as np
 import xarray as xr
 from numpy.linalg import inv
 from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
-from sklearn.metrics import ConfusionMatrixDisplay, confusion_matrix
+from sklearn.metrics import ConfusionMatrixDisplay
 
 from tergite_autocalibration.config.globals import REDIS_CONNECTION
 from tergite_autocalibration.lib.base.analysis import (
@@ -26,6 +26,9 @@ from tergite_autocalibration.lib.base.analysis import (
 )
 from tergite_autocalibration.lib.nodes.readout.ro_amplitude_optimization.utils import (
     align_on_y_axis,
+    lda_classify_amplitudes,
+    normalized_confusion_matrices,
+    split_true_positives,
 )
 from tergite_autocalibration.lib.utils.analysis_models import (
     ThreeClassBoundary,
@@ -71,84 +74,75 @@ class OptimalROAmplitudeQubitAnalysis(BaseQubitAnalysis):
         Q = IQ_complex.imag.values
         return np.array([I, Q]).T
 
+    def all_IQ(self) -> np.ndarray:
+        """Extracts I/Q components for all amplitudes, with shape (amplitudes, shots, 2)."""
+
+        IQ_complex = (
+            self.S21_stacked[self.data_var]
+            .transpose(self.amplitude_coord, "shots")
+            .values
+        )
+        return np.stack([IQ_complex.real, IQ_complex.imag], axis=-1)
+
+    def classify_all_amplitudes(
+        self, iq: np.ndarray, states_sent: np.ndarray
+    ) -> np.ndarray:
+        """
+        Classify the iq points of all amplitudes at once and select the amplitude
+        with the highest assignment fidelity.
+        """
+        classified_states = lda_classify_amplitudes(iq, states_sent)
+        self.cms = normalized_confusion_matrices(states_sent, classified_states)
+        self.fidelities = np.trace(self.cms, axis1=1, axis2=2) / len(
+            self.unique_qubit_states
+        )
+        self.optimal_index = np.argmax(self.fidelities)
+        self.optimal_amplitude = self.amplitudes.values[self.optimal_index]
+        return classified_states
+
+    def classified_shots(
+        self,
+        iq: np.ndarray,
+        states_sent: np.ndarray,
+        classified_states: np.ndarray,
+        state,
+    ) -> tuple[xr.DataArray, xr.DataArray]:
+        """
+        The true positive and false positive iq points of all amplitudes when sending state.
+        """
+        sent = states_sent == state
+        true_positives = classified_states[:, sent] == state
+        return tuple(
+            xr.DataArray(
+                shots,
+                coords={
+                    self.amplitude_coord: self.amplitudes.values,
+                    "shots": np.arange(shots.shape[1]),
+                    "re_im": ["re", "im"],
+                },
+                dims=(self.amplitude_coord, "shots", "re_im"),
+            )
+            for shots in split_true_positives(iq[:, sent], true_positives)
+        )
+
     def run_initial_fitting(self):
         """
         Classify all iq points for all amplitudes and store them in
         corresponding dataArrays.
         """
-        # TODO: replace the amplitude for loop with a dataset mask
-        self.fidelities = []
-        self.cms = []
-
         states_sent = self.qubit_states
 
         self.lda = LinearDiscriminantAnalysis(solver="svd", store_covariance=True)
 
-        array_iq0_tp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        array_iq0_fp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        array_iq1_tp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        array_iq1_fp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        for index, ro_amplitude in enumerate(self.amplitudes):
-            iq = self.IQ(index)
-            classified_states = self.lda.fit(iq, states_sent).predict(iq)
-
-            true_positives = states_sent == classified_states
-            tp0 = true_positives[states_sent == 0]
-            tp1 = true_positives[states_sent == 1]
-            IQ0 = iq[states_sent == 0]  # IQ when sending 0
-            IQ1 = iq[states_sent == 1]  # IQ when sending 1
-
-            IQ0_tp = xr.DataArray(
-                IQ0[tp0],
-                name="IQ0_tp",
-                coords={"shots": np.arange(len(IQ0[tp0])), "re_im": ["re", "im"]},
-            ).expand_dims(
-                {self.amplitude_coord: [ro_amplitude]}
-            )  # True Positive when sending 0
-
-            IQ0_fp = xr.DataArray(
-                IQ0[~tp0],
-                name="IQ0_fp",
-                coords={"shots": np.arange(len(IQ0[~tp0])), "re_im": ["re", "im"]},
-            ).expand_dims({self.amplitude_coord: [ro_amplitude]})
-
-            IQ1_tp = xr.DataArray(
-                IQ1[tp1],
-                name="IQ1_tp",
-                coords={"shots": np.arange(len(IQ1[tp1])), "re_im": ["re", "im"]},
-            ).expand_dims(
-                {self.amplitude_coord: [ro_amplitude]}
-            )  # True Positive when sending 1
-
-            IQ1_fp = xr.DataArray(
-                IQ1[~tp1],
-                name="IQ1_fp",
-                coords={"shots": np.arange(len(IQ1[~tp1])), "re_im": ["re", "im"]},
-            ).expand_dims({self.amplitude_coord: [ro_amplitude]})
-            array_iq0_tp = xr.concat(
-                [IQ0_tp, array_iq0_tp], dim=self.amplitude_coord, join="outer"
-            )
-            array_iq0_fp = xr.concat(
-                [IQ0_fp, array_iq0_fp], dim=self.amplitude_coord, join="outer"
-            )
-            array_iq1_tp = xr.concat(
-                [IQ1_tp, array_iq1_tp], dim=self.amplitude_coord, join="outer"
-            )
-            array_iq1_fp = xr.concat(
-                [IQ1_fp, array_iq1_fp], dim=self.amplitude_coord, join="outer"
-            )
-
-            cm_norm = confusion_matrix(states_sent, classified_states, normalize="true")
-            assignment = np.trace(cm_norm) / len(self.unique_qubit_states)
-            self.fidelities.append(assignment)
-            self.cms.append(cm_norm)
+        iq = self.all_IQ()
+        classified_states = self.classify_all_amplitudes(iq, states_sent)
 
-        self.iq0_tp = array_iq0_tp
-        self.iq0_fp = array_iq0_fp
-        self.iq1_tp = array_iq1_tp
-        self.iq1_fp = array_iq1_fp
-        self.optimal_index = np.argmax(self.fidelities)
-        self.optimal_amplitude = self.amplitudes.values[self.optimal_index]
+        self.iq0_tp, self.iq0_fp = self.classified_shots(
+            iq, states_sent, classified_states, 0
+        )
+        self.iq1_tp, self.iq1_fp = self.classified_shots(
+            iq, states_sent, classified_states, 1
+        )
         # self.optimal_inv_cm = inv(self.cms[self.optimal_index])
 
         return
@@ -339,25 +333,11 @@ class ROThreeStateAmplitudeQubitAnalysis(OptimalROAmplitudeQubitAnalysis):
         Classify all iq points for all amplitudes and store them in
         corresponding dataArrays.
         """
-        # TODO: replace the amplitude for loop with a dataset mask
-        self.fidelities = []
-        self.cms = []
-
         states_sent = self.qubit_states
 
         self.lda = LinearDiscriminantAnalysis(solver="svd")
 
-        for index, ro_amplitude in enumerate(self.amplitudes):
-            iq = self.IQ(index)
-            classified_states = self.lda.fit(iq, states_sent).predict(iq)
-
-            cm_norm = confusion_matrix(states_sent, classified_states, normalize="true")
-            assignment = np.trace(cm_norm) / len(self.unique_qubit_states)
-            self.fidelities.append(assignment)
-            self.cms.append(cm_norm)
-
-        self.optimal_index = np.argmax(self.fidelities)
-        self.optimal_amplitude = self.amplitudes.values[self.optimal_index]
+        self.classify_all_amplitudes(self.all_IQ(), states_sent)
         self.optimal_inv_cm = inv(self.cms[self.optimal_index])
         return
 
@@ -491,7 +471,7 @@ class OptimalROTwoStateAmplitudeNodeAnalysis(BaseAllQubitsAnalysis):
         self.plots_per_qubit = 3
 
     def _fill_plots(self):
-        for index, analysis in enumerate(self.qubit_analyses):
+        for index, analysis in self._indexed_qubit_analyses():
             primary_plot_row = self.plots_per_qubit * (index // self.column_grid)
             primary_axis = self.axs[primary_plot_row, index % self.column_grid]
 
@@ -513,7 +493,7 @@ class ROThreeStateAmplitudeNodeAnalysis(BaseAllQubitsAnalysis):
         self.plots_per_qubit = 3
 
     def _fill_plots(self):
-        for index, analysis in enumerate(self.qubit_analyses):
+        for index, analysis in self._indexed_qubit_analyses():
             primary_plot_row = self.plots_per_qubit * (index // self.column_grid)
             primary_axis = self.axs[primary_plot_row, index % self.column_grid]
 
@@ -536,42 +516,23 @@ class OptimalRO2not2AmplitudeQubitAnalysis(OptimalROAmplitudeQubitAnalysis):
         Classify all iq points for all amplitudes and store them in
         corresponding dataArrays.
         """
-        # TODO: replace the amplitude for loop with a dataset mask
-        self.fidelities = []
-        self.cms = []
-
         states_sent = self.qubit_states
         states_sent[states_sent == 0] = -2
         states_sent[states_sent == 1] = -2
 
         self.lda = LinearDiscriminantAnalysis(solver="svd", store_covariance=True)
 
-        array_iq_not2_tp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        array_iq_not2_fp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        array_iq2_tp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        array_iq2_fp = xr.DataArray().expand_dims({self.amplitude_coord: []})
-        for index, ro_amplitude in enumerate(self.amplitudes):
-            iq = self.IQ(index)
-            classified_states = self.lda.fit(iq, states_sent).predict(iq)
-
-            # IQ2_tp, IQ2_fp  = self.classify_iq(iq, states_sent, 2)
-            # IQ_not2_tp , IQ_not2_fp = self.classify_iq(iq, states_sent, -2)
-
-            cm_norm = confusion_matrix(states_sent, classified_states, normalize="true")
-            assignment = np.trace(cm_norm) / len(self.unique_qubit_states)
-            self.fidelities.append(assignment)
-            self.cms.append(cm_norm)
-        self.optimal_index = np.argmax(self.fidelities)
-        self.optimal_amplitude = self.amplitudes.values[self.optimal_index]
+        iq = self.all_IQ()
+        classified_states = self.classify_all_amplitudes(iq, states_sent)
 
-        self.iq2_tp = array_iq2_tp
-        self.iq2_fp = array_iq2_fp
-        self.iq_not2_tp = array_iq_not2_tp
-        self.iq_not2_fp = array_iq_not2_fp
+        self.iq2_tp, self.iq2_fp = self.classified_shots(
+            iq, states_sent, classified_states, 2
+        )
+        self.iq_not2_tp, self.iq_not2_fp = self.classified_shots(
+            iq, states_sent, classified_states, -2
+        )
 
         # TODO: select the maximum |2> assignement
-        # self.optimal_index = np.argmax(self.fidelities)
-        # self.optimal_amplitude = self.amplitudes.values[self.optimal_index]
         # self.optimal_inv_cm = inv(self.cms[self.optimal_index])
 
         return
@@ -728,7 +689,7 @@ class OptimalRO2Not2AmplitudeNodeAnalysis(BaseAllQubitsAnalysis):
         self.plots_per_qubit = 3
 
     def _fill_plots(self):
-        for index, analysis in enumerate(self.qubit_analyses):
+        for index, analysis in self._indexed_qubit_analyses():
             primary_plot_row = self.plots_per_qubit * (index // self.column_grid)
             primary_axis = self.axs[primary_plot_row, index % self.column_grid]
 
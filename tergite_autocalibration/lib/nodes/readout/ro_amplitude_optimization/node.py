@@ -14,7 +14,6 @@
 import numpy as np
 import xarray
 
-from tergite_autocalibration.config.globals import REDIS_CONNECTION
 from tergite_autocalibration.lib.base.node import QubitNode
 from tergite_autocalibration.lib.nodes.readout.ro_amplitude_optimization.analysis import (
     OptimalROTwoStateAmplitudeNodeAnalysis,
@@ -64,7 +63,9 @@ class ROAmplitudeTwoStateOptimizationNode(QubitNode):
         }
 
     def punchout_amplitude(self, qubit: str):
-        return float(REDIS_CONNECTION.hget(f"transmons:{qubit}", "measure:pulse_amp"))
+        return float(
+            self.redis_snapshot.hget(f"transmons:{qubit}", "measure:pulse_amp")
+        )
 
     def generate_dummy_dataset(self):
         dataset = xarray.Dataset()
@@ -136,7 +137,9 @@ class ROAmplitudeThreeStateOptimizationNode(QubitNode):
         }
 
     def punchout_amplitude(self, qubit: str):
-        return float(REDIS_CONNECTION.hget(f"transmons:{qubit}", "measure:pulse_amp"))
+        return float(
+            self.redis_snapshot.hget(f"transmons:{qubit}", "measure:pulse_amp")
+        )
 
     def generate_dummy_dataset(self):
         dataset = xarray.Dataset()
@@ -184,5 +187,7 @@ class ThreeStateDiscriminationNode(ROAmplitudeThreeStateOptimizationNode):
 
     def optimal_3state_amplitude(self, qubit: str):
         return float(
-            REDIS_CONNECTION.hget(f"transmons:{qubit}", "measure_3state_opt:pulse_amp")
+            self.redis_snapshot.hget(
+                f"transmons:{qubit}", "measure_3state_opt:pulse_amp"
+            )
         )
@@ -0,0 +1,118 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+import xarray as xr
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from sklearn.metrics import confusion_matrix
+
+from tergite_autocalibration.lib.nodes.readout.ro_amplitude_optimization.analysis import (
+    OptimalROTwoStateAmplitudeQubitAnalysis,
+)
+from tergite_autocalibration.lib.nodes.readout.ro_amplitude_optimization.utils import (
+    lda_classify_amplitudes,
+    normalized_confusion_matrices,
+    split_true_positives,
+)
+
+_CENTERS = np.array([[0.0, 0.0], [1.0, 0.5], [0.2, 1.2]])
+
+
+def _shots(separations, states_sent, seed=3) -> np.ndarray:
+    """
+    IQ shots with shape (amplitudes, shots, 2), the states separate more with the amplitude
+    """
+    random = np.random.default_rng(seed)
+    return np.array(
+        [
+            separation * _CENTERS[states_sent]
+            + random.normal(scale=0.5, size=(len(states_sent), 2))
+            for separation in separations
+        ]
+    )
+
+
+def test_lda_classification_matches_sklearn():
+    states_sent = np.repeat([0, 1, 2], [300, 250, 350])
+    iq = _shots([0.5, 1.0, 2.0, 4.0], states_sent)
+
+    classified_states = lda_classify_amplitudes(iq, states_sent)
+    confusion_matrices = normalized_confusion_matrices(states_sent, classified_states)
+
+    for amplitude_iq, classified, cm in zip(iq, classified_states, confusion_matrices):
+        lda = LinearDiscriminantAnalysis(solver="svd")
+        expected = lda.fit(amplitude_iq, states_sent).predict(amplitude_iq)
+        # shots on the boundary may flip with the rounding of the fit
+        assert np.mean(classified != expected) < 0.005
+        np.testing.assert_allclose(
+            cm,
+            confusion_matrix(states_sent, classified, normalize="true"),
+        )
+
+
+def test_split_true_positives_pads_every_amplitude():
+    iq = np.arange(12, dtype=float).reshape(2, 3, 2)
+    true_positives = np.array([[True, False, True], [False, False, True]])
+
+    tp, fp = split_true_positives(iq, true_positives)
+
+    assert tp.shape == (2, 2, 2)
+    assert fp.shape == (2, 2, 2)
+    np.testing.assert_array_equal(tp[0], [[0, 1], [4, 5]])
+    np.testing.assert_array_equal(tp[1], [[10, 11], [np.nan, np.nan]])
+    np.testing.assert_array_equal(fp[0], [[2, 3], [np.nan, np.nan]])
+    np.testing.assert_array_equal(fp[1], [[6, 7], [8, 9]])
+
+
+def test_two_state_analysis():
+    loops = 400
+    amplitudes = np.array([0.01, 0.02, 0.03])
+    states = np.array([0, 1])
+    # the shots are stacked over the loops and the states
+    states_sent = np.tile(states, loops)
+    iq = _shots([1.0, 4.0, 2.0], states_sent)
+    iq_complex = (iq[..., 0] + 1j * iq[..., 1]).reshape(len(amplitudes), loops, 2)
+
+    coords_attrs = {"qubit": "q00", "element": "q00"}
+    dataset = xr.Dataset(
+        {
+            "yq00": (
+                ("ro_amplitudesq00", "loopsq00", "qubit_statesq00"),
+                iq_complex,
+                {"qubit": "q00", "element": "q00"},
+            )
+        },
+        coords={
+            "ro_amplitudesq00": ("ro_amplitudesq00", amplitudes, coords_attrs),
+            "loopsq00": ("loopsq00", np.arange(loops), coords_attrs),
+            "qubit_statesq00": ("qubit_statesq00", states, coords_attrs),
+        },
+        attrs={"qubit": "q00"},
+    )
+
+    analysis = OptimalROTwoStateAmplitudeQubitAnalysis("ro_amplitude", [])
+    qoi = analysis.process_qubit(dataset)
+
+    assert qoi.analysis_result["measure_2state_opt:pulse_amp"]["value"] == 0.02
+    reference_fidelities = []
+    for amplitude_iq in iq:
+        lda = LinearDiscriminantAnalysis(solver="svd")
+        classified = lda.fit(amplitude_iq, states_sent).predict(amplitude_iq)
+        reference_fidelities.append(np.mean(classified == states_sent))
+    np.testing.assert_allclose(analysis.fidelities, reference_fidelities, atol=0.005)
+
+    # every shot sent in |0> is either a true or a false positive
+    shots_0 = (~np.isnan(analysis.iq0_tp[..., 0])).sum("shots") + (
+        ~np.isnan(analysis.iq0_fp[..., 0])
+    ).sum("shots")
+    assert shots_0.values.tolist() == [loops] * len(amplitudes)
+    assert analysis.iq0_tp["ro_amplitudesq00"].values.tolist() == amplitudes.tolist()
@@ -81,3 +81,93 @@ def align_on_y_axis(
         raise ValueError("threshold is at an imporoper value")
 
     return rotated_IQ, rotation_angle_rad, threshold
+
+
+def lda_classify_amplitudes(
+    iq_points: np.ndarray, states_sent: np.ndarray
+) -> np.ndarray:
+    """
+    Fit a linear discriminant analysis for every readout amplitude at once and classify the
+    IQ samples with it. This is the closed form of LinearDiscriminantAnalysis: class means,
+    a pooled covariance and priors from the number of shots per state.
+
+    Args:
+        iq_points: IQ samples with shape (amplitudes, shots, 2).
+        states_sent: The prepared state of every shot.
+
+    Returns:
+        The classified state of every shot, with shape (amplitudes, shots).
+    """
+    labels, label_indices = np.unique(states_sent, return_inverse=True)
+    one_hot = np.eye(len(labels))[label_indices]
+    shots_per_state = one_hot.sum(axis=0)
+
+    # (amplitudes, states, 2)
+    means = (one_hot.T @ iq_points) / shots_per_state[:, None]
+    residuals = iq_points - means[:, label_indices]
+    # (amplitudes, 2, 2)
+    covariances = (residuals.transpose(0, 2, 1) @ residuals) / (
+        len(states_sent) - len(labels)
+    )
+
+    # linear discriminant of every state: x.W_k - mean_k.W_k / 2 + log(prior_k)
+    weights = np.linalg.solve(covariances, means.transpose(0, 2, 1))
+    offsets = -0.5 * np.einsum("akd,adk->ak", means, weights) + np.log(
+        shots_per_state / len(states_sent)
+    )
+    scores = iq_points @ weights + offsets[:, None, :]
+    return labels[scores.argmax(axis=-1)]
+
+
+def normalized_confusion_matrices(
+    states_sent: np.ndarray, classified_states: np.ndarray
+) -> np.ndarray:
+    """
+    Confusion matrices normalized over the prepared states, for every readout amplitude.
+
+    Args:
+        states_sent: The prepared state of every shot.
+        classified_states: The classified states with shape (amplitudes, shots).
+
+    Returns:
+        The confusion matrices with shape (amplitudes, states, states).
+    """
+    labels, sent_indices = np.unique(states_sent, return_inverse=True)
+    number_of_labels = len(labels)
+    classified_indices = np.searchsorted(labels, classified_states)
+    amplitude_indices = np.arange(classified_states.shape[0])[:, None]
+    # count every (amplitude, sent, classified) combination in one pass
+    flat_indices = (
+        amplitude_indices * number_of_labels + sent_indices
+    ) * number_of_labels + classified_indices
+    counts = np.bincount(
+        flat_indices.ravel(),
+        minlength=classified_states.shape[0] * number_of_labels**2,
+    ).reshape(-1, number_of_labels, number_of_labels)
+    return counts / np.bincount(sent_indices)[:, None]
+
+
+def split_true_positives(
+    iq_points: np.ndarray, true_positives: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split the IQ samples of one prepared state into correctly and wrongly classified samples.
+    Each amplitude has its own number of samples, the buffers are padded with NaN.
+
+    Args:
+        iq_points: IQ samples with shape (amplitudes, shots, 2).
+        true_positives: Whether each shot was classified correctly, shape (amplitudes, shots).
+
+    Returns:
+        The true positive and false positive samples with shape (amplitudes, shots, 2).
+    """
+    buffers = []
+    for mask in (true_positives, ~true_positives):
+        buffer = np.full((*mask.shape[:1], mask.sum(axis=1).max(initial=0), 2), np.nan)
+        amplitude_indices, shot_indices = np.nonzero(mask)
+        positions = np.cumsum(mask, axis=1) - 1
+        buffer[amplitude_indices, positions[amplitude_indices, shot_indices]] = (
+            iq_points[amplitude_indices, shot_indices]
+        )
+        buffers.append(buffer)
+    return buffers[0], buffers[1]
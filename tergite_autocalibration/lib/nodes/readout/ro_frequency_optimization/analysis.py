@@ -166,7 +166,7 @@ class OptimalRO01FrequencyNodeAnalysis(BaseAllQubitsAnalysis):
         self.plots_per_qubit = 3
 
     def _fill_plots(self):
-        for index, analysis in enumerate(self.qubit_analyses):
+        for index, analysis in self._indexed_qubit_analyses():
             primary_plot_row = self.plots_per_qubit * (index // self.column_grid)
             primary_axis = self.axs[primary_plot_row, index % self.column_grid]
 
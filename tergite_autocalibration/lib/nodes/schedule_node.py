@@ -10,19 +10,43 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import math
-from itertools import product
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice, product
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import numpy
 import pandas
 from quantify_scheduler.instrument_coordinator.utility import xarray
 
+from tergite_autocalibration.config.globals import CONFIG
 from tergite_autocalibration.lib.base.measurement import MeasurementType
+from tergite_autocalibration.lib.utils.result_buffer import OuterResultBuffer
+from tergite_autocalibration.lib.utils.streaming_analysis import StreamingAnalysis
+from tergite_autocalibration.utils.io.artifact_writer import (
+    can_fork,
+    paused_artifact_writers,
+)
+from tergite_autocalibration.utils.logging import logger
 from tergite_autocalibration.utils.measurement_utils import (
     reduce_samplespace,
     samplespace_dimensions,
 )
 
+if TYPE_CHECKING:
+    from quantify_scheduler.instrument_coordinator.instrument_coordinator import (
+        CompiledSchedule,
+    )
+
+# The node whose outer points are compiled by the forked workers of the pipeline.
+# It is inherited by the workers on fork, so the node and its device do not have to be pickled.
+_pipelined_node = None
+
+
+def _precompile_outer_point(samplespace: dict) -> "CompiledSchedule":
+    return _pipelined_node.precompile(samplespace)
+
 
 class ScheduleNode(MeasurementType):
     def __init__(self, node) -> None:
@@ -50,16 +74,91 @@ class OuterScheduleNode(MeasurementType):
         exceed the memory limit of the QRM_RF.
         For example large single shots measurements.
         """
+        outer_iterations = self.outer_iterations()
+        all_iterations = len(outer_iterations)
         outer_dimensions = samplespace_dimensions(self.node.outer_schedule_samplespace)
 
+        result_buffer = OuterResultBuffer(self._outer_coordinates())
+
+        compiled_schedules = self._compiled_schedules(
+            [samplespace for _, samplespace in outer_iterations]
+        )
+        streaming_analysis = StreamingAnalysis.for_node(self.node)
+
+        try:
+            for this_interation_index, (reduced_outer_dict, _) in enumerate(
+                outer_iterations
+            ):
+                compiled_schedule = next(compiled_schedules)
+
+                ds = self.node.measure_compiled_schedule(
+                    compiled_schedule,
+                    measurement_mode=measurement_mode,
+                    measurement=(this_interation_index, all_iterations),
+                )
+
+                # The outer points are iterated in the order of itertools.product
+                this_iteration = numpy.unravel_index(
+                    this_interation_index, outer_dimensions
+                )
+                outer_indices = dict(zip(reduced_outer_dict, this_iteration))
+                result_buffer.add(outer_indices, ds)
+
+                if streaming_analysis is not None:
+                    streaming_analysis.submit(
+                        ds,
+                        reduced_outer_dict,
+                        (this_interation_index, all_iterations),
+                    )
+
+            if streaming_analysis is not None:
+                streaming_analysis.join()
+        finally:
+            # Stops the workers of the pipeline if the measurement fails
+            compiled_schedules.close()
+            if streaming_analysis is not None:
+                streaming_analysis.shutdown()
+
+        return result_buffer.to_dataset()
+
+    def _outer_coordinates(self) -> dict[str, pandas.Index]:
+        """
+        The coordinates of the outer dimensions of the result, in the order of its dimensions.
+        """
+        # WARNING: this assumes that the values for all elements are the same
+        outer_values = {
+            settable: list(element_values.values())[0]
+            for settable, element_values in self.node.outer_schedule_samplespace.items()
+        }
+        if self.node.name == "cz_calibration":
+            # This handles multiindex objects.
+            # Example is the cz_calibration node where the outer coordinate
+            # is a multiindex object cosisting of frequency and duartion pairs
+            outer_dim = list(outer_values.keys())[0]
+            # WARNING: for multiple settables these are the values of the last one
+            working_points = list(outer_values.values())[-1]
+            return {
+                outer_dim: pandas.MultiIndex.from_tuples(
+                    [tuple(point) for point in working_points], names=["l1", "l2"]
+                )
+            }
+        # Expanding the dimensions one by one puts the last settable first
+        return {settable: outer_values[settable] for settable in reversed(outer_values)}
+
+    def outer_iterations(self) -> list[tuple[dict, dict]]:
+        """
+        Split the outer samplespace into one schedule per outer point.
+
+        Returns:
+            For every outer point, a tuple of the current value of each outer settable
+            and the full samplespace of the schedule at that point.
+        """
+        outer_dimensions = samplespace_dimensions(self.node.outer_schedule_samplespace)
         iterations = product(*(range(n) for n in outer_dimensions))
-        all_iterations = math.prod(outer_dimensions)
-        outer_dim = list(self.node.outer_schedule_samplespace.keys())[0]
         outer_settables = self.node.outer_schedule_samplespace.keys()
 
-        result_dataset = xarray.Dataset()
-
-        for this_interation_index, this_iteration in enumerate(iterations):
+        outer_iterations = []
+        for this_iteration in iterations:
             reduced_outer_samplespace = reduce_samplespace(
                 this_iteration, self.node.outer_schedule_samplespace
             )
@@ -70,35 +169,61 @@ class OuterScheduleNode(MeasurementType):
                 reduced_outer_dict[settable] = current_value
 
             samplespace = self.node.schedule_samplespace | reduced_outer_samplespace
-            compiled_schedule = self.node.precompile(samplespace)
-
-            ds = self.node.measure_compiled_schedule(
-                compiled_schedule,
-                measurement_mode=measurement_mode,
-                measurement=(this_interation_index, all_iterations),
-            )
+            outer_iterations.append((reduced_outer_dict, samplespace))
+        return outer_iterations
 
-            if self.node.name == "cz_calibration":
-                # This handles multiindex objects.
-                # Example is the cz_calibration node where the outer coordinate
-                # is a multiindex object cosisting of frequency and duartion pairs
-                current_value_multi_index = pandas.MultiIndex.from_tuples(
-                    [current_value], names=["l1", "l2"]
-                )
-                # current_value = xarray.Coordinates.from_pandas_multiindex(
-                #     current_value_multi_index, outer_dim
-                # )
-                ds = ds.expand_dims({outer_dim: current_value_multi_index})
-                ds = ds.assign_coords(
-                    {outer_dim: (outer_dim, current_value_multi_index)}
-                )
-            else:
-                for outer_dim in reduced_outer_dict:
-                    outer_value = reduced_outer_dict[outer_dim]
-                    ds = ds.expand_dims({outer_dim: numpy.array([outer_value])})
+    def schedule_samplespaces(self) -> list[dict]:
+        return [samplespace for _, samplespace in self.outer_iterations()]
 
-            result_dataset = xarray.merge(
-                [ds, result_dataset], join="outer", compat="no_conflicts"
+    def _compiled_schedules(
+        self, samplespaces: list[dict]
+    ) -> Iterator["CompiledSchedule"]:
+        """
+        Yield the compiled schedule of every outer point in order.
+        With a prefetch depth in the run configuration, up to that many of the following
+        points are compiled in worker processes while the current point is measured.
+        """
+        prefetch_depth = CONFIG.run.outer_prefetch_depth
+        if prefetch_depth < 1 or len(samplespaces) < 2:
+            return (self.node.precompile(samplespace) for samplespace in samplespaces)
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Pipelined compilation is not supported on this platform.")
+            return (self.node.precompile(samplespace) for samplespace in samplespaces)
+        if not can_fork():
+            # Forking while other threads run can copy the locks they hold
+            logger.info(
+                "Outer points are compiled sequentially while other threads are running"
             )
-
-        return result_dataset
+            return (self.node.precompile(samplespace) for samplespace in samplespaces)
+        return self._pipelined_compiled_schedules(samplespaces, prefetch_depth)
+
+    def _pipelined_compiled_schedules(
+        self, samplespaces: list[dict], prefetch_depth: int
+    ) -> Iterator["CompiledSchedule"]:
+        global _pipelined_node
+
+        _pipelined_node = self.node
+        pool: Optional[ProcessPoolExecutor] = None
+        try:
+            pool = ProcessPoolExecutor(
+                max_workers=prefetch_depth,
+                mp_context=multiprocessing.get_context("fork"),
+            )
+            pending: deque[Future] = deque()
+            remaining = iter(samplespaces)
+
+            def _prefetch() -> None:
+                # Keep the current point and up to prefetch_depth following points in flight
+                for samplespace in islice(remaining, prefetch_depth + 1 - len(pending)):
+                    pending.append(pool.submit(_precompile_outer_point, samplespace))
+
+            # The workers are forked by the first submissions and inherit the node
+            with paused_artifact_writers():
+                _prefetch()
+            for _ in samplespaces:
+                _prefetch()
+                yield pending.popleft().result()
+        finally:
+            _pipelined_node = None
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
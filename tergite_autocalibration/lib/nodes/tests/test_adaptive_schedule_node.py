@@ -0,0 +1,208 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+import pytest
+import xarray
+
+from tergite_autocalibration.config.globals import CONFIG
+
+from tergite_autocalibration.lib.nodes.adaptive_schedule_node import (
+    AdaptiveScheduleNode,
+)
+from tergite_autocalibration.lib.nodes.qubit_control.spectroscopy.node import (
+    QubitSpectroscopyBase,
+)
+from tergite_autocalibration.lib.nodes.readout.resonator_spectroscopy.node import (
+    ResonatorSpectroscopyBase,
+)
+from tergite_autocalibration.lib.utils.samplespace import (
+    qubit_samples,
+    resonator_samples,
+)
+from tergite_autocalibration.utils.dto.enums import MeasurementMode
+
+_CENTERS = {"q00": 4.0137e9, "q01": 4.5021e9}
+
+
+class _PeakNode:
+    """
+    Minimal node measuring a noisy Lorentzian peak per qubit
+    """
+
+    name = "peak_node"
+    adaptive_settable = "spec_frequencies"
+    adaptive_coarse_points = 21
+    adaptive_refinement_points = 11
+    adaptive_zoom = 4
+    adaptive_max_refinements = 4
+    adaptive_tolerance = 5e3
+    refinement_center = staticmethod(QubitSpectroscopyBase.refinement_center)
+
+    def __init__(self, sweep_range=6e6):
+        self.schedule_samplespace = {
+            "spec_frequencies": {
+                qubit: np.linspace(
+                    center - sweep_range / 2, center + sweep_range / 2, 81
+                )
+                for qubit, center in _CENTERS.items()
+            }
+        }
+        self.compiled_samplespaces = []
+        self.random = np.random.default_rng(7)
+
+    def precompile(self, samplespace):
+        self.compiled_samplespaces.append(samplespace)
+        return samplespace
+
+    def measure_compiled_schedule(
+        self, compiled_schedule, measurement_mode, measurement=(1, 1)
+    ):
+        data_vars = {}
+        for qubit, center in _CENTERS.items():
+            coord = f"spec_frequencies{qubit}"
+            frequencies = compiled_schedule["spec_frequencies"][qubit]
+            peak = 1 / (1 + ((frequencies - center) / 0.2e6) ** 2)
+            noise = 0.01 * self.random.standard_normal(len(frequencies))
+            data_vars[f"y{qubit}"] = xarray.DataArray(
+                peak + noise,
+                dims=coord,
+                coords={
+                    coord: (
+                        coord,
+                        frequencies,
+                        {"element_type": "qubit", "qubit": qubit},
+                    )
+                },
+            )
+        return xarray.Dataset(data_vars)
+
+
+def test_adaptive_sweep_converges_on_the_peaks():
+    node = _PeakNode()
+    full_samplespace = node.schedule_samplespace
+    dataset = AdaptiveScheduleNode(node).measure_node(MeasurementMode.dummy)
+
+    # the samplespace of the node is restored
+    assert node.schedule_samplespace is full_samplespace
+    rounds = len(node.compiled_samplespaces)
+    assert 1 < rounds <= node.adaptive_max_refinements + 1
+    for qubit, center in _CENTERS.items():
+        frequencies = dataset[f"spec_frequencies{qubit}"].values
+        assert np.all(np.diff(frequencies) > 0)
+        # far fewer points than the dense sweep of the samplespace
+        assert len(frequencies) <= 21 + 11 * (rounds - 1) < 81
+        fitted_center, uncertainty = node.refinement_center(
+            dataset[f"y{qubit}"], f"spec_frequencies{qubit}"
+        )
+        assert abs(fitted_center - center) < 10e3
+        # the last sweep is centered close to the peak
+        last_sweep = node.compiled_samplespaces[-1]["spec_frequencies"][qubit]
+        assert abs(np.mean(last_sweep) - center) < 50e3
+
+
+def test_adaptive_sweep_replaces_close_points():
+    node = _PeakNode()
+    measurement_type = AdaptiveScheduleNode(node)
+    coarse = node.measure_compiled_schedule(
+        {"spec_frequencies": {q: np.array([0.0, 10.0, 20.0]) for q in _CENTERS}},
+        MeasurementMode.dummy,
+        (0, 2),
+    )
+    refined = node.measure_compiled_schedule(
+        {"spec_frequencies": {q: np.array([9.0, 13.0, 17.0]) for q in _CENTERS}},
+        MeasurementMode.dummy,
+        (1, 2),
+    )
+    combined = measurement_type._combine_sweeps([coarse, refined])
+
+    # the coarse point at 10 is closer than half a refined step to the refined point at 9
+    assert combined["spec_frequenciesq00"].values.tolist() == [0, 9, 13, 17, 20]
+    assert combined["yq00"].sel(spec_frequenciesq00=9.0) == refined["yq00"][0]
+
+
+@pytest.mark.parametrize(
+    "node_class, dense_samples",
+    [
+        (QubitSpectroscopyBase, qubit_samples),
+        (ResonatorSpectroscopyBase, resonator_samples),
+    ],
+)
+def test_adaptive_spectroscopy_measures_a_third_of_the_points(
+    node_class, dense_samples
+):
+    qubit = CONFIG.run.qubits[0]
+    most_points = (
+        node_class.adaptive_coarse_points
+        + node_class.adaptive_max_refinements * node_class.adaptive_refinement_points
+    )
+
+    assert 3 * most_points <= len(dense_samples(qubit))
+
+
+def test_adaptive_qubit_spectroscopy_settings_count_the_points():
+    node = _PeakNode(sweep_range=7e6)
+    for attribute in [
+        "adaptive_coarse_points",
+        "adaptive_refinement_points",
+        "adaptive_zoom",
+        "adaptive_max_refinements",
+        "adaptive_tolerance",
+    ]:
+        setattr(node, attribute, getattr(QubitSpectroscopyBase, attribute))
+    dataset = AdaptiveScheduleNode(node).measure_node(MeasurementMode.dummy)
+
+    for qubit, center in _CENTERS.items():
+        frequencies = dataset[f"spec_frequencies{qubit}"].values
+        assert len(frequencies) <= 27
+        fitted_center, _ = node.refinement_center(
+            dataset[f"y{qubit}"], f"spec_frequencies{qubit}"
+        )
+        assert abs(fitted_center - center) < 50e3
+
+
+def test_adaptive_sweep_does_not_refine_converged_elements():
+    node = _PeakNode()
+    measurement_type = AdaptiveScheduleNode(node)
+    sweeps = measurement_type._coarse_sweeps()
+    coarse = node.measure_compiled_schedule(
+        {"spec_frequencies": sweeps}, MeasurementMode.dummy
+    )
+    uncertainties = {"q00": 1e3, "q01": 1e6}
+
+    def _refinement_center(data_array, coord):
+        return (
+            _CENTERS[data_array[coord].attrs["qubit"]],
+            uncertainties[data_array[coord].attrs["qubit"]],
+        )
+
+    node.refinement_center = _refinement_center
+    refined_sweeps, converged = measurement_type._refined_sweeps(coarse, sweeps)
+
+    assert not converged
+    # the converged qubit repeats its sweep, so its points are replaced
+    assert refined_sweeps["q00"] is sweeps["q00"]
+    assert len(refined_sweeps["q01"]) == node.adaptive_refinement_points
+    # the refined center is on the grid of the refined step
+    step = np.diff(refined_sweeps["q01"])[0]
+    assert np.mean(refined_sweeps["q01"]) / step == pytest.approx(
+        round(np.mean(refined_sweeps["q01"]) / step)
+    )
+    combined = measurement_type._combine_sweeps(
+        [
+            coarse,
+            node.measure_compiled_schedule(
+                {"spec_frequencies": refined_sweeps}, MeasurementMode.dummy
+            ),
+        ]
+    )
+    assert len(combined["spec_frequenciesq00"]) == len(sweeps["q00"])
@@ -0,0 +1,137 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+import pytest
+import xarray
+
+from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.base.analysis import BaseNodeAnalysis
+from tergite_autocalibration.lib.nodes.external_parameter_node import (
+    ExternalParameterNode,
+)
+from tergite_autocalibration.lib.utils.result_buffer import OuterResultBuffer
+from tergite_autocalibration.utils.dto.enums import MeasurementMode
+
+
+class _ConvergingAnalysis(BaseNodeAnalysis):
+    """
+    Reports convergence as soon as three repetitions are measured,
+    the partial dataset is only built from the third repetition on
+    """
+
+    def __init__(self, name, redis_fields):
+        super().__init__()
+        self.checked_repetitions = []
+
+    def analyze_node(self, dataset):
+        return {}
+
+    def should_stop(self, dataset, outer_values, partial_dataset):
+        self.checked_repetitions.append(int(outer_values["repetitions"]))
+        if outer_values["repetitions"] < 2:
+            return False
+        return partial_dataset()["repetitions"].size >= 3
+
+
+class _RepeatedNode:
+    """
+    Minimal node that repeats the same schedule over an external samplespace
+    """
+
+    name = "repeated_node"
+    analysis_obj = _ConvergingAnalysis
+    redis_fields = []
+
+    def __init__(self):
+        self.schedule_samplespace = {"delays": {"q00": np.linspace(0, 1e-4, 4)}}
+        self.external_samplespace = {"repetitions": {"q00": np.arange(6)}}
+        self.reduced_external_samplespace = {}
+        self.measured_repetitions = []
+        self.node_analysis = None
+        self.finalized = False
+
+    def get_node_analysis(self):
+        if self.node_analysis is None:
+            self.node_analysis = self.analysis_obj(self.name, self.redis_fields)
+        return self.node_analysis
+
+    def should_stop(self, dataset, outer_values, partial_dataset):
+        return self.get_node_analysis().should_stop(
+            dataset, outer_values, partial_dataset
+        )
+
+    def precompile(self, samplespace):
+        return samplespace
+
+    def initial_operation(self):
+        pass
+
+    def pre_measurement_operation(self, reduced_ext_space):
+        self.measured_repetitions.append(int(reduced_ext_space["repetitions"]["q00"]))
+
+    def final_operation(self):
+        self.finalized = True
+
+    def measure_compiled_schedule(
+        self, compiled_schedule, measurement_mode, measurement
+    ):
+        delays = compiled_schedule["delays"]["q00"]
+        return xarray.Dataset(
+            {"yq00": ("delaysq00", np.exp(-delays / 5e-5))},
+            coords={"delaysq00": delays},
+        )
+
+
+def test_external_parameter_node_measures_all_points_by_default():
+    node = _RepeatedNode()
+    dataset = ExternalParameterNode(node).measure_node(MeasurementMode.dummy)
+
+    assert node.measured_repetitions == [0, 1, 2, 3, 4, 5]
+    assert node.node_analysis is None
+    assert dataset["yq00"].shape == (6, 4)
+
+
+def test_external_parameter_node_early_termination(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "early_termination", True)
+    built_datasets = []
+    to_dataset = OuterResultBuffer.to_dataset
+
+    def _counting_to_dataset(result_buffer):
+        built_datasets.append(result_buffer)
+        return to_dataset(result_buffer)
+
+    monkeypatch.setattr(OuterResultBuffer, "to_dataset", _counting_to_dataset)
+    node = _RepeatedNode()
+    dataset = ExternalParameterNode(node).measure_node(MeasurementMode.dummy)
+
+    assert node.measured_repetitions == [0, 1, 2]
+    assert node.node_analysis.checked_repetitions == [0, 1, 2]
+    # once for the convergence check of the third repetition and once for the result
+    assert len(built_datasets) == 2
+    # the dataset only contains the measured repetitions
+    assert dataset["repetitions"].values.tolist() == [0, 1, 2]
+    assert not dataset["yq00"].isnull().any()
+
+
+def test_external_parameter_node_final_operation_after_failure():
+    node = _RepeatedNode()
+
+    def _fail(reduced_ext_space):
+        raise RuntimeError("Cluster not reachable")
+
+    node.pre_measurement_operation = _fail
+
+    with pytest.raises(RuntimeError, match="Cluster not reachable"):
+        ExternalParameterNode(node).measure_node(MeasurementMode.dummy)
+    # e.g. the coupler current is still ramped back to 0
+    assert node.finalized
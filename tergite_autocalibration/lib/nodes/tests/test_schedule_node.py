@@ -0,0 +1,132 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import os
+import threading
+
+import numpy as np
+import pytest
+import xarray
+
+from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.base.analysis import BaseNodeAnalysis
+from tergite_autocalibration.lib.nodes.schedule_node import OuterScheduleNode
+from tergite_autocalibration.utils.dto.enums import MeasurementMode
+
+
+class _StreamingAnalysis(BaseNodeAnalysis):
+    """
+    Records the points it receives while the node is measuring
+    """
+
+    def __init__(self, name, redis_fields):
+        super().__init__()
+        self.name = name
+        self.iterations = []
+        self.threads = set()
+
+    def analyze_node(self, dataset):
+        return {}
+
+    def analyze_iteration(self, dataset, outer_values, iteration):
+        self.threads.add(threading.current_thread().name)
+        if float(dataset["yq00"].max()) > 4.25e9:
+            raise ValueError("Bad data")
+        self.iterations.append((outer_values["frequencies"], iteration))
+
+
+class _OuterNode:
+    """
+    Minimal node with an outer samplespace, the compiled schedule records
+    the process and the outer point it was compiled for.
+    """
+
+    name = "outer_node"
+    analysis_obj = _StreamingAnalysis
+    redis_fields = []
+
+    def __init__(self):
+        self.schedule_samplespace = {"amplitudes": {"q00": np.linspace(0, 1, 3)}}
+        self.outer_schedule_samplespace = {
+            "frequencies": {"q00": np.array([4.0e9, 4.1e9, 4.2e9, 4.3e9, 4.4e9])}
+        }
+        self.measured_schedules = []
+        self.node_analysis = None
+
+    def get_node_analysis(self):
+        if self.node_analysis is None:
+            self.node_analysis = self.analysis_obj(self.name, self.redis_fields)
+        return self.node_analysis
+
+    def precompile(self, samplespace):
+        return os.getpid(), float(samplespace["frequencies"]["q00"])
+
+    def measure_compiled_schedule(
+        self, compiled_schedule, measurement_mode, measurement
+    ):
+        self.measured_schedules.append(compiled_schedule)
+        _, frequency = compiled_schedule
+        amplitudes = self.schedule_samplespace["amplitudes"]["q00"]
+        return xarray.Dataset(
+            {"yq00": ("amplitudesq00", amplitudes * frequency)},
+            coords={"amplitudesq00": amplitudes},
+        )
+
+
+def test_outer_schedule_node_sequential():
+    node = _OuterNode()
+    dataset = OuterScheduleNode(node).measure_node(MeasurementMode.dummy)
+
+    assert [pid for pid, _ in node.measured_schedules] == [os.getpid()] * 5
+    assert dataset["yq00"].shape == (5, 3)
+
+
+def test_outer_schedule_node_pipelined(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "outer_prefetch_depth", 2)
+    node = _OuterNode()
+    dataset = OuterScheduleNode(node).measure_node(MeasurementMode.dummy)
+
+    # Every outer point is compiled in a worker and measured in order
+    assert all(pid != os.getpid() for pid, _ in node.measured_schedules)
+    assert [frequency for _, frequency in node.measured_schedules] == list(
+        node.outer_schedule_samplespace["frequencies"]["q00"]
+    )
+
+    sequential_dataset = OuterScheduleNode(_OuterNode()).measure_node(
+        MeasurementMode.dummy
+    )
+    xarray.testing.assert_identical(dataset, sequential_dataset)
+
+
+def test_outer_schedule_node_streaming_analysis(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "streaming_analysis", True)
+    node = _OuterNode()
+    node.outer_schedule_samplespace["frequencies"]["q00"] = np.array([4.0e9, 4.1e9])
+    OuterScheduleNode(node).measure_node(MeasurementMode.dummy)
+
+    assert node.node_analysis.iterations == [(4.0e9, (0, 2)), (4.1e9, (1, 2))]
+    assert node.node_analysis.threads == {"streaming_analysis_0"}
+
+
+def test_outer_schedule_node_streaming_analysis_aborts(monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "streaming_analysis", True)
+    node = _OuterNode()
+
+    with pytest.raises(ValueError, match="Bad data"):
+        OuterScheduleNode(node).measure_node(MeasurementMode.dummy)
+
+    # the analysis of the 4.3 GHz point fails and stops the measurement
+    assert [value for value, _ in node.node_analysis.iterations] == [
+        4.0e9,
+        4.1e9,
+        4.2e9,
+    ]
@@ -17,84 +17,115 @@ import xarray as xr
 from tergite_autocalibration.config.globals import REDIS_CONNECTION
 
 
+class ThreeStateDiscriminator:
+    """
+    Discriminator of the |0>, |1> and |2> states of a qubit.
+    The IQ plane is split in three sectors around the centroid, separated by the
+    boundary angles omega_01, omega_12 and omega_20.
+    """
+
+    states = np.array([0, 1, 2])
+    redis_fields = ["centroid_I", "centroid_Q", "omega_01", "omega_12", "omega_20"]
+
+    def __init__(
+        self,
+        centroid: complex,
+        omega_01: float,
+        omega_12: float,
+        omega_20: float,
+    ):
+        self.centroid = centroid
+        # the angles in radians within [-pi, pi), to compare them directly with np.angle
+        state_boundaries = {
+            boundary: np.deg2rad((omega + 180) % 360 - 180)
+            for boundary, omega in {
+                "01": omega_01,
+                "12": omega_12,
+                "20": omega_20,
+            }.items()
+        }
+        # the boundaries sorted by angle, eg ['20', '12', '01']
+        sorted_boundaries = sorted(state_boundaries, key=state_boundaries.get)
+        self.boundary_angles = np.array(
+            [state_boundaries[boundary] for boundary in sorted_boundaries]
+        )
+        # the state of every sector is the one shared by the boundaries of the sector,
+        # eg '01' & '12' -> 1. The last sector wraps around to the first one.
+        shared_states = [
+            int((set(sorted_boundaries[index - 1]) & set(boundary)).pop())
+            for index, boundary in enumerate(sorted_boundaries)
+        ]
+        self.sector_states = np.array(shared_states + shared_states[:1])
+
+    @classmethod
+    def from_redis(cls, qubit: str) -> "ThreeStateDiscriminator":
+        """
+        Load the discriminator of the qubit with a single redis request.
+
+        Args:
+            qubit: The qubit, e.g. q00
+
+        Returns:
+            The discriminator of the qubit
+        """
+        centroid_i, centroid_q, omega_01, omega_12, omega_20 = map(
+            float, REDIS_CONNECTION.hmget(f"transmons:{qubit}", cls.redis_fields)
+        )
+        return cls(centroid_i + 1j * centroid_q, omega_01, omega_12, omega_20)
+
+    def assign(self, iq_values: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            iq_values: Complex IQ values of any shape
+
+        Returns:
+            The assigned state of every IQ value
+        """
+        angles = np.angle(iq_values - self.centroid)
+        return self.sector_states[np.searchsorted(self.boundary_angles, angles)]
+
+
 def assign_state(iq_values: xr.DataArray) -> xr.DataArray:
-    qubit = iq_values.attrs["qubit"]
-    redis_key = f"transmons:{qubit}"
-    centroid_i = float(REDIS_CONNECTION.hget(f"{redis_key}", "centroid_I"))
-    centroid_q = float(REDIS_CONNECTION.hget(f"{redis_key}", "centroid_Q"))
-    omega_01 = float(REDIS_CONNECTION.hget(f"{redis_key}", "omega_01"))
-    omega_12 = float(REDIS_CONNECTION.hget(f"{redis_key}", "omega_12"))
-    omega_20 = float(REDIS_CONNECTION.hget(f"{redis_key}", "omega_20"))
-    state_boundaries = {"01": omega_01, "12": omega_12, "20": omega_20}
-    sorted_state_boundaries_dict = {
-        k: v for k, v in sorted(state_boundaries.items(), key=lambda item: item[1])
-    }
-    sorted_state_boundaries = list(sorted_state_boundaries_dict.keys())
-    iq_values = iq_values - (centroid_i + 1j * centroid_q)
-    iq_values = xr.apply_ufunc(lambda x: (np.angle(x, deg=True) + 360) % 360, iq_values)
-
-    def state_filter(angles_array) -> xr.DataArray:
-        boundary_1 = sorted_state_boundaries[0]  # eg '01'
-        boundary_2 = sorted_state_boundaries[1]  # eg '12'
-        boundary_3 = sorted_state_boundaries[2]  # eg '20'
-        angle_1 = state_boundaries[boundary_1]
-        angle_2 = state_boundaries[boundary_2]
-        angle_3 = state_boundaries[boundary_3]
-        # find the common state between the boundaries. eg: '01' & '12' -> 1
-        state_between_1_and_2 = int(list(set(boundary_1) & set(boundary_2))[0])
-        state_between_2_and_3 = int(list(set(boundary_2) & set(boundary_3))[0])
-        state_between_3_and_1 = int(list(set(boundary_3) & set(boundary_1))[0])
-        condition_1 = (
-            (angles_array > angle_1) & (angles_array < angle_2)
-        ) * state_between_1_and_2
-        condition_2 = (
-            (angles_array > angle_2) & (angles_array < angle_3)
-        ) * state_between_2_and_3
-        condition_3 = (
-            (angles_array < angle_1) | (angles_array > angle_3)
-        ) * state_between_3_and_1
-        return condition_1 + condition_2 + condition_3
-
-    assigned_states = xr.apply_ufunc(state_filter, iq_values)
-    return assigned_states
+    discriminator = ThreeStateDiscriminator.from_redis(iq_values.attrs["qubit"])
+    return xr.DataArray(
+        discriminator.assign(iq_values.values),
+        coords=iq_values.coords,
+        dims=iq_values.dims,
+    )
 
 
 def calculate_probabilities(iq_data_var: xr.DataArray):
     if "loops" not in iq_data_var.coords:
         raise ValueError("Dataarray does not contain loop coordinate")
-    states_array = assign_state(iq_data_var)
     qubit = iq_data_var.attrs["qubit"]
+    discriminator = ThreeStateDiscriminator.from_redis(qubit)
     loops_coord = iq_data_var.loops.name
     number_of_loops = iq_data_var.loops.size
 
-    zeros = xr.where(states_array == 0, x=1, y=0)  # keep only |0> states
-    ones = xr.where(states_array == 1, x=1, y=0)  # keep only |1> states
-    twos = xr.where(states_array == 2, x=1, y=0)  # keep only |2> states
-
-    ones = ones.reduce(func=np.sum, dim=loops_coord)
-    twos = twos.reduce(func=np.sum, dim=loops_coord)
-    zeros = zeros.reduce(func=np.sum, dim=loops_coord)
-
-    probabilities_state_0 = zeros / number_of_loops
-    probabilities_state_0 = probabilities_state_0.assign_coords(state=0)
-    probabilities_state_0 = probabilities_state_0.assign_coords(qubit=qubit)
-    probabilities_state_1 = ones / number_of_loops
-    probabilities_state_1 = probabilities_state_1.assign_coords(state=1)
-    probabilities_state_1 = probabilities_state_1.assign_coords(qubit=qubit)
-    probabilities_state_2 = twos / number_of_loops
-    probabilities_state_2 = probabilities_state_2.assign_coords(state=2)
-    probabilities_state_2 = probabilities_state_2.assign_coords(qubit=qubit)
-
-    state_probabilities = xr.concat(
-        [probabilities_state_0, probabilities_state_1, probabilities_state_2],
-        dim="state",
+    iq_values = iq_data_var.transpose(..., loops_coord)
+    assigned_states = discriminator.assign(iq_values.values)
+    pixel_shape = assigned_states.shape[:-1]
+    number_of_pixels = int(np.prod(pixel_shape))
+    number_of_states = len(discriminator.states)
+
+    # count the states of every pixel over the loops in one pass
+    pixel_indices = np.arange(number_of_pixels).reshape(*pixel_shape, 1)
+    counts = np.bincount(
+        (pixel_indices * number_of_states + assigned_states).ravel(),
+        minlength=number_of_pixels * number_of_states,
+    ).reshape(*pixel_shape, number_of_states)
+
+    pixel_dims = iq_values.dims[:-1]
+    state_probabilities = xr.DataArray(
+        np.moveaxis(counts, -1, 0) / number_of_loops,
+        dims=("state", *pixel_dims),
+        coords={
+            name: coord
+            for name, coord in iq_values.coords.items()
+            if loops_coord not in coord.dims
+        },
     )
-    return state_probabilities
-
-
-import matplotlib.pyplot as plt
-
-fig, ax = plt.subplots(1, 1)
+    return state_probabilities.assign_coords(state=discriminator.states, qubit=qubit)
 
 
 def generate_iq_shots(probabilities: np.ndarray, qubit: str, loops: int) -> np.ndarray:
@@ -106,11 +137,10 @@ def generate_iq_shots(probabilities: np.ndarray, qubit: str, loops: int) -> np.n
     Example of probabilities array: [0.2, 0.3, 0.5]
     """
     redis_key = f"transmons:{qubit}"
-    centroid_i = float(REDIS_CONNECTION.hget(f"{redis_key}", "centroid_I"))
-    centroid_q = float(REDIS_CONNECTION.hget(f"{redis_key}", "centroid_Q"))
-    omega_01 = float(REDIS_CONNECTION.hget(f"{redis_key}", "omega_01"))
-    omega_12 = float(REDIS_CONNECTION.hget(f"{redis_key}", "omega_12"))
-    omega_20 = float(REDIS_CONNECTION.hget(f"{redis_key}", "omega_20"))
+    centroid_i, centroid_q, omega_01, omega_12, omega_20 = map(
+        float,
+        REDIS_CONNECTION.hmget(redis_key, ThreeStateDiscriminator.redis_fields),
+    )
 
     state_boundaries = {"01": omega_01, "12": omega_12, "20": omega_20}
     sorted_state_boundaries_dict = {
@@ -0,0 +1,217 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import hashlib
+import os
+import pickle
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+from uuid import uuid4
+
+import numpy as np
+from filelock import FileLock
+
+from tergite_autocalibration.config.globals import CONFIG, DATA_DIR
+from tergite_autocalibration.utils.logging import logger
+
+if TYPE_CHECKING:
+    from quantify_scheduler.instrument_coordinator.instrument_coordinator import (
+        CompiledSchedule,
+    )
+
+
+def _update_hash(hasher: "hashlib._Hash", value: Any) -> None:
+    """
+    Feed a value into the hasher in a way that does not depend on the
+    object identity or the insertion order of dictionaries.
+    """
+    if isinstance(value, dict):
+        hasher.update(b"dict")
+        for key in sorted(value.keys(), key=str):
+            _update_hash(hasher, str(key))
+            _update_hash(hasher, value[key])
+    elif isinstance(value, (list, tuple, range)):
+        hasher.update(type(value).__name__.encode())
+        for item in value:
+            _update_hash(hasher, item)
+    elif isinstance(value, np.ndarray):
+        hasher.update(f"ndarray{value.dtype.str}{value.shape}".encode())
+        if value.dtype == object:
+            for item in value.ravel():
+                _update_hash(hasher, item)
+        else:
+            hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, Enum):
+        _update_hash(hasher, value.value)
+    else:
+        # Scalars and strings, the type is part of the hash to distinguish e.g. 1 and 1.0
+        hasher.update(f"{type(value).__name__}:{value!r}".encode())
+
+
+def compilation_key(
+    node_name: str,
+    schedule_samplespace: dict,
+    schedule_keywords: dict,
+    compilation_config: Any,
+    measurement_name: str = "",
+    device_elements: Optional[dict] = None,
+) -> str:
+    """
+    Stable hash of all inputs that determine a compiled schedule.
+
+    Args:
+        node_name: Name of the node.
+        schedule_samplespace: Samplespace passed to the schedule function.
+        schedule_keywords: Keywords passed to the schedule function.
+        compilation_config: The output of `QuantumDevice.generate_compilation_config()`.
+        measurement_name: Qualified name of the measurement class building the schedule.
+        device_elements: Serialized device elements, the measurement classes read some
+            parameters directly from the elements, which are not part of the compilation config.
+
+    Returns:
+        Hex digest identifying the compiled schedule.
+    """
+    import quantify_scheduler
+
+    if hasattr(compilation_config, "model_dump"):
+        # The config can contain numpy arrays, which are not JSON serializable
+        compilation_config = compilation_config.model_dump()
+
+    hasher = hashlib.sha256()
+    _update_hash(hasher, node_name)
+    _update_hash(hasher, measurement_name)
+    _update_hash(hasher, schedule_samplespace)
+    _update_hash(hasher, schedule_keywords)
+    _update_hash(hasher, compilation_config)
+    _update_hash(hasher, device_elements)
+    _update_hash(hasher, quantify_scheduler.__version__)
+    return hasher.hexdigest()
+
+
+class CompiledScheduleCache:
+    """
+    Persistent on-disk cache for compiled schedules.
+    Every entry is a pickled `CompiledSchedule` stored as `<key>.pkl`. The modification time
+    of the file is used as the last access time, so the least recently used entries are
+    evicted as soon as the total size of the cache exceeds the limit.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_size_mb: float = 2048):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock: Optional[FileLock] = None
+        self._lock_pid: Optional[int] = None
+
+    @property
+    def lock(self) -> FileLock:
+        # A file lock cannot be shared with a forked process, every process gets its own
+        if self._lock_pid != os.getpid():
+            self._lock = FileLock(str(self.cache_dir / ".lock"))
+            self._lock_pid = os.getpid()
+        return self._lock
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional["CompiledSchedule"]:
+        """
+        Load a compiled schedule from the cache.
+
+        Args:
+            key: Key as returned by `compilation_key`.
+
+        Returns:
+            The cached compiled schedule or None if there is no valid entry.
+        """
+        entry_path = self._entry_path(key)
+        with self.lock:
+            if not entry_path.exists():
+                return None
+            try:
+                with open(entry_path, "rb") as f:
+                    compiled_schedule = pickle.load(f)
+            except Exception as error:
+                logger.warning(f"Removing unreadable cache entry {entry_path}: {error}")
+                entry_path.unlink(missing_ok=True)
+                return None
+            # Mark the entry as recently used
+            os.utime(entry_path)
+        return compiled_schedule
+
+    def put(self, key: str, compiled_schedule: "CompiledSchedule") -> None:
+        """
+        Store a compiled schedule and evict the least recently used entries if needed.
+
+        Args:
+            key: Key as returned by `compilation_key`.
+            compiled_schedule: The compiled schedule to store.
+        """
+        entry_path = self._entry_path(key)
+        temporary_path = self.cache_dir / f".{key}.{uuid4().hex}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                pickle.dump(compiled_schedule, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            logger.warning(f"Cannot cache the compiled schedule: {error}")
+            temporary_path.unlink(missing_ok=True)
+            return
+
+        with self.lock:
+            os.replace(temporary_path, entry_path)
+            self._evict()
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        with self.lock:
+            for entry_path in self.cache_dir.glob("*.pkl"):
+                entry_path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for entry_path in self.cache_dir.glob("*.pkl"):
+            stat = entry_path.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total_size = sum(size for _, size, _ in entries)
+        # Oldest entries first
+        for _, size, entry_path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
+            logger.debug(f"Evicted compiled schedule {entry_path.stem}")
+
+
+_COMPILATION_CACHE: Optional[CompiledScheduleCache] = None
+
+
+def get_compilation_cache() -> Optional[CompiledScheduleCache]:
+    """
+    Get the compilation cache as configured in the run configuration.
+
+    Returns:
+        The compilation cache or None if the cache is disabled.
+    """
+    global _COMPILATION_CACHE
+
+    if not CONFIG.run.compilation_cache:
+        return None
+    if _COMPILATION_CACHE is None:
+        _COMPILATION_CACHE = CompiledScheduleCache(
+            Path(DATA_DIR) / "compilation_cache",
+            max_size_mb=CONFIG.run.compilation_cache_size,
+        )
+    return _COMPILATION_CACHE
@@ -0,0 +1,121 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+from typing import Any, Optional, Union
+
+from quantify_scheduler import Schedule
+from quantify_scheduler.backends import qblox_backend
+from quantify_scheduler.backends.graph_compilation import (
+    SerialCompilationConfig,
+    SimpleNodeConfig,
+)
+from quantify_scheduler.backends.qblox.operations.pulse_library import LatchReset
+from quantify_scheduler.operations.control_flow_library import (
+    ConditionalOperation,
+    ControlFlowOperation,
+)
+from quantify_scheduler.operations.operation import Operation
+from quantify_scheduler.schedules.schedule import ScheduleBase
+
+CONDITIONAL_PLAYBACK_PASS = "qblox_compile_conditional_playback"
+
+
+def contains_conditional_playback(
+    operation: Union[Operation, ScheduleBase], visited: Optional[set] = None
+) -> bool:
+    """
+    Whether a schedule contains operations handled by the conditional playback pass.
+    Every distinct operation is checked once, independent of how often it is referenced
+    in the schedule and of the repetitions of the loops around it.
+
+    Args:
+        operation: The schedule or operation to check.
+        visited: Ids of the schedules that were checked already.
+
+    Returns:
+        True if there is a conditional acquisition, a conditional control flow or a latch reset.
+    """
+    if visited is None:
+        visited = set()
+
+    if isinstance(operation, ScheduleBase):
+        if id(operation) in visited:
+            return False
+        visited.add(id(operation))
+        return any(
+            contains_conditional_playback(inner_operation, visited)
+            for inner_operation in operation.operations.values()
+        )
+    if isinstance(operation, (ConditionalOperation, LatchReset)):
+        return True
+    if isinstance(operation, ControlFlowOperation):
+        return contains_conditional_playback(operation.body, visited)
+    return operation.valid_acquisition and operation.is_conditional_acquisition
+
+
+def compile_conditional_playback(schedule: Schedule, **kwargs: Any) -> Schedule:
+    """
+    Conditional playback pass of the Qblox backend, skipped for schedules without
+    conditional playback.
+
+    The Qblox pass collects the conditional operations by walking the body of every loop
+    once per repetition, for the long loops of e.g. randomized benchmarking this takes
+    most of the compilation time. Without conditional operations the pass leaves the
+    schedule unchanged, so it is only run if the schedule contains any.
+
+    Args:
+        schedule: The schedule to compile.
+        **kwargs: Passed on to the Qblox pass.
+
+    Returns:
+        The schedule, updated by the Qblox pass if it contains conditional playback.
+    """
+    if not contains_conditional_playback(schedule):
+        return schedule
+    return qblox_backend.compile_conditional_playback(schedule, **kwargs)
+
+
+def with_conditional_playback_check(
+    compilation_config: SerialCompilationConfig,
+) -> SerialCompilationConfig:
+    """
+    Copy of the compilation config, where the conditional playback pass of the hardware
+    compilation is replaced by `compile_conditional_playback`.
+
+    Args:
+        compilation_config: The output of `QuantumDevice.generate_compilation_config()`.
+
+    Returns:
+        The compilation config with the replaced pass.
+    """
+    hardware_config = compilation_config.hardware_compilation_config
+    if hardware_config is None or not hasattr(hardware_config, "compilation_passes"):
+        return compilation_config
+
+    compilation_passes = [
+        (
+            SimpleNodeConfig(
+                name=CONDITIONAL_PLAYBACK_PASS,
+                compilation_func=compile_conditional_playback,
+            )
+            if compilation_pass.name == CONDITIONAL_PLAYBACK_PASS
+            else compilation_pass
+        )
+        for compilation_pass in hardware_config.compilation_passes
+    ]
+    return compilation_config.model_copy(
+        update={
+            "hardware_compilation_config": hardware_config.model_copy(
+                update={"compilation_passes": compilation_passes}
+            )
+        }
+    )
@@ -11,13 +11,19 @@
 # that they have been altered from the originals.
 
 import json
+import threading
 from pathlib import Path
+from typing import Optional
 
+from qcodes.instrument import Instrument
 from quantify_scheduler.device_under_test.quantum_device import QuantumDevice
 from quantify_scheduler.json_utils import SchedulerJSONEncoder
 
 from tergite_autocalibration.config.globals import CONFIG
 from tergite_autocalibration.lib.utils.redis import (
+    RedisDeviceSnapshot,
+    apply_redis_config,
+    apply_redis_config_coupler,
     load_redis_config,
     load_redis_config_coupler,
 )
@@ -28,19 +34,50 @@ from tergite_autocalibration.utils.dto.extended_transmon_element import Extended
 
 
 def configure_device(
-    name: str, qubits: list[str], couplers: list[str]
+    name: str,
+    qubits: list[str],
+    couplers: list[str],
+    redis_overrides: Optional[dict[str, dict]] = None,
+    snapshot: Optional[RedisDeviceSnapshot] = None,
 ) -> QuantumDevice:
+    """
+    Create the quantum device for a node from the values in redis.
+
+    Args:
+        name: Name of the device, usually the name of the node.
+        qubits: Qubits to add as elements.
+        couplers: Couplers to add as edges.
+        redis_overrides: Optional values that take precedence over redis, keyed by the redis
+            hash, e.g. {"transmons:q00": {"rxy:amp180": 0.1}}. Nothing is written to redis.
+        snapshot: Snapshot of the redis hashes of the qubits and couplers. If not given,
+            all hashes are fetched in one round trip.
+
+    Returns:
+        The configured quantum device.
+    """
+    redis_overrides = redis_overrides or {}
+    if snapshot is None:
+        snapshot = RedisDeviceSnapshot(qubits=qubits, couplers=couplers)
     device = QuantumDevice(name)
     for channel, qubit in enumerate(qubits):
         transmon = ExtendedTransmon(qubit)
-        transmon = load_redis_config(transmon, channel)
+        transmon = load_redis_config(
+            transmon,
+            channel,
+            overrides=redis_overrides.get(f"transmons:{qubit}"),
+            snapshot=snapshot,
+        )
         device.add_element(transmon)
 
     if couplers is not None:
         for coupler in couplers:
             control, target = coupler.split(sep="_")
             edge = ExtendedCompositeSquareEdge(control, target)
-            edge = load_redis_config_coupler(edge)
+            edge = load_redis_config_coupler(
+                edge,
+                overrides=redis_overrides.get(f"couplers:{coupler}"),
+                snapshot=snapshot,
+            )
             device.add_edge(edge)
 
     device.hardware_config(CONFIG.cluster)
@@ -65,12 +102,169 @@ def close_device_resources(device: QuantumDevice):
     device.close()
 
 
-def save_serial_device(device: QuantumDevice, data_path: Path) -> None:
+class DeviceRegistry:
+    """
+    Keeps the transmons and couplers alive for all nodes of a calibration chain.
+
+    Every node gets a quantum device of its own, but the elements are reused: only the
+    redis fields that changed since the previous node are applied to them. An element is
+    built again if a field it was configured with was removed from redis. The elements
+    must only be modified through redis, otherwise the changes leak to the next node.
+
+    The elements are lent to one node at a time, the device of the previous node has to
+    be released before the next node configures its device.
+    """
+
+    def __init__(self):
+        self._transmons: dict[str, ExtendedTransmon] = {}
+        self._edges: dict[str, ExtendedCompositeSquareEdge] = {}
+        # the redis hashes the elements are configured with
+        self._applied_configs: dict[str, dict] = {}
+        self._leased_device: Optional[QuantumDevice] = None
+        self._lock = threading.Lock()
+
+    def configure_device(
+        self,
+        name: str,
+        qubits: list[str],
+        couplers: list[str],
+        snapshot: Optional[RedisDeviceSnapshot] = None,
+    ) -> QuantumDevice:
+        """
+        Create the quantum device for a node from the elements of the registry.
+
+        Args:
+            name: Name of the device, usually the name of the node.
+            qubits: Qubits to add as elements.
+            couplers: Couplers to add as edges.
+            snapshot: Snapshot of the redis hashes of the qubits and couplers. If not given,
+                all hashes are fetched in one round trip.
+
+        Returns:
+            The configured quantum device, to be returned with `release_device`.
+
+        Raises:
+            RuntimeError: If the device of the previous node was not released.
+        """
+        if snapshot is None:
+            snapshot = RedisDeviceSnapshot(qubits=qubits, couplers=couplers)
+        with self._lock:
+            if self._leased_device is not None and not _is_open(self._leased_device):
+                # the device was closed without being released
+                self._leased_device = None
+            if self._leased_device is not None:
+                # the elements of the registry cannot be created twice under their names
+                raise RuntimeError(
+                    f"Cannot configure the device of {name}, the device of "
+                    f"{self._leased_device.name} was not released"
+                )
+
+            device = QuantumDevice(name)
+            for channel, qubit in enumerate(qubits):
+                device.add_element(self._configured_transmon(qubit, channel, snapshot))
+            for coupler in couplers or []:
+                device.add_edge(self._configured_edge(coupler, snapshot))
+            device.hardware_config(CONFIG.cluster)
+            self._leased_device = device
+            return device
+
+    def release_device(self, device: QuantumDevice):
+        """
+        Closes a device created by `configure_device`, the elements of the registry stay open.
+
+        Args:
+            device: The device of the node.
+        """
+        with self._lock:
+            if device is not self._leased_device:
+                close_device_resources(device)
+                return
+            device.close()
+            self._leased_device = None
+
+    def close(self):
+        """
+        Closes all elements of the registry.
+        """
+        with self._lock:
+            if self._leased_device is not None:
+                self._leased_device.close()
+                self._leased_device = None
+            for element in [*self._transmons.values(), *self._edges.values()]:
+                if _is_open(element):
+                    element.close()
+            self._transmons.clear()
+            self._edges.clear()
+            self._applied_configs.clear()
+
+    def _configured_transmon(
+        self, qubit: str, channel: int, snapshot: RedisDeviceSnapshot
+    ) -> ExtendedTransmon:
+        redis_key = f"transmons:{qubit}"
+        redis_config = snapshot.hgetall(redis_key)
+        transmon = self._transmons.get(qubit)
+        changed_config = self._changed_config(redis_key, redis_config, transmon)
+        if changed_config is None:
+            if transmon is not None and _is_open(transmon):
+                transmon.close()
+            transmon = ExtendedTransmon(qubit)
+            self._transmons[qubit] = transmon
+            changed_config = redis_config
+        # the channel depends on the position of the qubit in the node
+        apply_redis_config(transmon, channel, changed_config)
+        self._applied_configs[redis_key] = redis_config
+        return transmon
+
+    def _configured_edge(
+        self, coupler: str, snapshot: RedisDeviceSnapshot
+    ) -> ExtendedCompositeSquareEdge:
+        redis_key = f"couplers:{coupler}"
+        redis_config = snapshot.hgetall(redis_key)
+        edge = self._edges.get(coupler)
+        changed_config = self._changed_config(redis_key, redis_config, edge)
+        if changed_config is None:
+            if edge is not None and _is_open(edge):
+                edge.close()
+            control, target = coupler.split(sep="_")
+            edge = ExtendedCompositeSquareEdge(control, target)
+            self._edges[coupler] = edge
+        if changed_config != {}:
+            # the coupler parameters depend on each other, they are always set together
+            apply_redis_config_coupler(edge, redis_config)
+        self._applied_configs[redis_key] = redis_config
+        return edge
+
+    def _changed_config(
+        self, redis_key: str, redis_config: dict, element: Optional[Instrument]
+    ) -> Optional[dict]:
+        """
+        The fields of the redis hash that changed since the element was configured,
+        None if the element has to be built again.
+        """
+        applied_config = self._applied_configs.get(redis_key)
+        if element is None or applied_config is None or not _is_open(element):
+            return None
+        if not applied_config.keys() <= redis_config.keys():
+            return None
+        return {
+            field: value
+            for field, value in redis_config.items()
+            if applied_config.get(field) != value
+        }
+
+
+def _is_open(instrument: Instrument) -> bool:
+    return (
+        Instrument.exist(instrument.name)
+        and Instrument.find_instrument(instrument.name) is instrument
+    )
+
+
+def serialize_device_elements(device: QuantumDevice) -> dict:
     """
     decode the device object and then parse its data element by element
-    to populate the serial device dictionary which is saved as Json
+    to populate the serial device dictionary
     """
-    name = device.name
     serialized_device = json.dumps(device, cls=SchedulerJSONEncoder)
     decoded_device = json.loads(serialized_device)
     serial_device = {}
@@ -82,5 +276,24 @@ def save_serial_device(device: QuantumDevice, data_path: Path) -> None:
         serial_config = json.loads(element_config)
         serial_device[element] = serial_config
 
+    return serial_device
+
+
+def save_serial_device(device: QuantumDevice, data_path: Path) -> None:
+    """
+    serialize the device element by element and save it as Json
+    """
+    write_serial_device(device.name, serialize_device_elements(device), data_path)
+
+
+def write_serial_device(name: str, serial_device: dict, data_path: Path) -> None:
+    """
+    Save a device serialized with `serialize_device_elements` as Json.
+
+    Args:
+        name: Name of the device, the file is called `<name>.json`.
+        serial_device: The serialized elements of the device.
+        data_path: Folder of the measurement.
+    """
     with open(f"{data_path}/{name}.json", "w") as f:
         json.dump(serial_device, f, indent=4)
@@ -15,7 +15,7 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Set, Union
 
 import networkx as nx
 
@@ -182,6 +182,31 @@ def range_dependencies_in_topological_order(
     return list(filter(lambda node: node in back_range, topological_order))
 
 
+def get_dependency_map(graph: "nx.DiGraph", nodes: List[str]) -> Dict[str, Set[str]]:
+    """
+    Restrict the dependencies of the graph to a selection of nodes.
+    This is used to schedule independent branches of the calibration chain.
+
+    Args:
+        graph: Graph to get dependencies from.
+        nodes: Nodes that are going to be calibrated.
+
+    Returns:
+        Dict[str, Set[str]]: For each node the set of nodes in the selection it depends on.
+
+    """
+    selection = set(nodes)
+    dependency_map = {}
+    for node in nodes:
+        if node in graph:
+            dependency_map[node] = set(nx.ancestors(graph, node)).intersection(
+                selection
+            )
+        else:
+            dependency_map[node] = set()
+    return dependency_map
+
+
 def filtered_topological_order(
     target_node: str, from_nodes: Optional[Union[str, List[str]]] = None
 ) -> List[str]:
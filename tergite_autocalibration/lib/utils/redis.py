@@ -13,15 +13,15 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import functools
 import json
 import re
-from typing import List, Union
+from typing import List, Optional, Union
 
 import numpy as np
-from quantify_scheduler.json_utils import SchedulerJSONDecoder, SchedulerJSONEncoder
+from quantify_scheduler.json_utils import SchedulerJSONEncoder
 
 from tergite_autocalibration.config.globals import REDIS_CONNECTION
-from tergite_autocalibration.utils.dto import extended_transmon_element
 from tergite_autocalibration.utils.dto.extended_coupler_edge import (
     ExtendedCompositeSquareEdge,
 )
@@ -32,105 +32,199 @@ from tergite_autocalibration.utils.logging import logger
 np.set_printoptions(legacy="1.25")
 
 
-def load_redis_config(transmon: ExtendedTransmon, channel: int):
+class RedisDeviceSnapshot:
+    """
+    In-memory copy of the redis hashes of the qubits and couplers of a node.
+    The `transmons:*`, `couplers:*` and `cs:*` hashes of all elements are fetched in a single
+    pipelined round trip, later reads are served from memory.
+    Writes to redis after the snapshot was taken are not visible in the snapshot.
+    """
+
+    def __init__(
+        self,
+        qubits: Optional[List[str]] = None,
+        couplers: Optional[List[str]] = None,
+        connection=None,
+    ):
+        qubits = list(qubits or [])
+        couplers = list(couplers or [])
+        connection = connection if connection is not None else REDIS_CONNECTION
+
+        keys = (
+            [f"transmons:{qubit}" for qubit in qubits]
+            + [f"couplers:{coupler}" for coupler in couplers]
+            + [f"cs:{element}" for element in qubits + couplers]
+        )
+        pipeline = connection.pipeline(transaction=False)
+        for key in keys:
+            pipeline.hgetall(key)
+        self._hashes = dict(zip(keys, pipeline.execute()))
+
+    def hgetall(self, key: str) -> dict:
+        """
+        Args:
+            key: The redis key of the hash, e.g. "transmons:q00".
+
+        Returns:
+            A copy of the hash, empty if the hash does not exist.
+
+        Raises:
+            KeyError: if the hash is not part of the snapshot.
+        """
+        if key not in self._hashes:
+            raise KeyError(f"{key} is not part of the redis snapshot")
+        return dict(self._hashes[key])
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        """
+        Args:
+            key: The redis key of the hash, e.g. "couplers:q00_q01".
+            field: The field in the hash.
+
+        Returns:
+            The value of the field, None if the field does not exist.
+
+        Raises:
+            KeyError: if the hash is not part of the snapshot.
+        """
+        if key not in self._hashes:
+            raise KeyError(f"{key} is not part of the redis snapshot")
+        return self._hashes[key].get(field)
+
+
+@functools.lru_cache
+def _transmon_parameter_template(transmon_type: type) -> dict[str, frozenset]:
+    """
+    The parameters of every submodule of a transmon, as they appear in its serialized form.
+    The template is built once per transmon class from a default instance.
+
+    Args:
+        transmon_type: The transmon class, e.g. ExtendedTransmon
+
+    Returns:
+        The names of the serialized parameters, keyed by the submodule name.
+
+    """
+    template_transmon = transmon_type(f"{transmon_type.__name__}Template")
+    try:
+        serialized_transmon = json.dumps(template_transmon, cls=SchedulerJSONEncoder)
+    finally:
+        template_transmon.close()
+    return {
+        submodule: frozenset(content)
+        for submodule, content in json.loads(serialized_transmon)["data"].items()
+        if isinstance(content, dict)
+    }
+
+
+def load_redis_config(
+    transmon: ExtendedTransmon,
+    channel: int,
+    overrides: Optional[dict] = None,
+    snapshot: Optional[RedisDeviceSnapshot] = None,
+):
     qubit = transmon.name
-    redis_config = REDIS_CONNECTION.hgetall(f"transmons:{qubit}")
+    if snapshot is not None:
+        redis_config = snapshot.hgetall(f"transmons:{qubit}")
+    else:
+        redis_config = REDIS_CONNECTION.hgetall(f"transmons:{qubit}")
+    # values that take precedence over redis without being written to it
+    if overrides is not None:
+        redis_config = redis_config | overrides
 
-    # get the transmon template in dictionary form
-    serialized_transmon = json.dumps(transmon, cls=SchedulerJSONEncoder)
-    decoded_transmon = json.loads(serialized_transmon)
+    return apply_redis_config(transmon, channel, redis_config)
 
-    # the transmon modules are recognized by the ':' in the redis key
-    transmon_redis_config = {k: v for k, v in redis_config.items() if ":" in k}
-    device_redis_dict = {}
-    for redis_entry_key, redis_value in transmon_redis_config.items():
-        redis_value = float(redis_value)
-        # e.g. 'clock_freqs:f01' is split to clock_freqs, f01
-        submodule, field = redis_entry_key.split(":")
-        device_redis_dict[submodule] = device_redis_dict.get(submodule, {}) | {
-            field: redis_value
-        }
 
-    device_redis_dict["name"] = qubit
+def apply_redis_config(
+    transmon: ExtendedTransmon, channel: int, redis_config: dict
+) -> ExtendedTransmon:
+    """
+    Sets the parameters of a transmon from the fields of its redis hash.
+    Fields that do not belong to a parameter of the transmon are ignored.
 
-    for submodule in decoded_transmon["data"]:
-        sub_module_content = decoded_transmon["data"][submodule]
-        if isinstance(sub_module_content, dict) and submodule in device_redis_dict:
-            redis_module_config = device_redis_dict[submodule]
-            decoded_transmon["data"][submodule].update(redis_module_config)
-        if "measure" in submodule:
-            decoded_transmon["data"][submodule].update({"acq_channel": channel})
+    Args:
+        transmon: The transmon to configure
+        channel: The acquisition channel of the transmon
+        redis_config: The fields of the redis hash, or a subset of them
 
-    encoded_transmon = json.dumps(decoded_transmon)
+    Returns:
+        The configured transmon
 
-    # free the transmon
-    transmon.close()
+    """
+    template = _transmon_parameter_template(type(transmon))
 
-    # create a transmon with the same name but with updated config
-    transmon = json.loads(
-        encoded_transmon, cls=SchedulerJSONDecoder, modules=[extended_transmon_element]
-    )
+    # the transmon modules are recognized by the ':' in the redis key
+    # e.g. 'clock_freqs:f01' is split to clock_freqs, f01
+    for redis_entry_key, redis_value in redis_config.items():
+        submodule, _, field = redis_entry_key.partition(":")
+        if field in template.get(submodule, ()):
+            transmon.submodules[submodule].parameters[field](float(redis_value))
+
+    for submodule in template:
+        if "measure" in submodule:
+            transmon.submodules[submodule].acq_channel(channel)
 
     return transmon
 
 
-def load_redis_config_coupler(coupler: ExtendedCompositeSquareEdge):
+# The coupler parameters are set from these redis fields, in this order
+_COUPLER_REDIS_PARAMETERS = [
+    ("cz_pulse_frequency", lambda coupler: coupler.clock_freqs.cz_freq),
+    ("cz_pulse_amplitude", lambda coupler: coupler.cz.square_amp),
+    ("cz_pulse_duration", lambda coupler: coupler.cz.square_duration),
+    ("cz_half_duration", lambda coupler: coupler.cz.half_square_duration),
+    ("cz_pulse_width", lambda coupler: coupler.cz.cz_width),
+    ("parking_current", lambda coupler: coupler.coupler_parameters.parking_current),
+    (
+        "initial_parking_current",
+        lambda coupler: coupler.coupler_parameters.parking_current,
+    ),
+]
+
+
+def load_redis_config_coupler(
+    coupler: ExtendedCompositeSquareEdge,
+    overrides: Optional[dict] = None,
+    snapshot: Optional[RedisDeviceSnapshot] = None,
+):
     bus = coupler.name
-    bus_qubits = bus.split("_")
-    redis_config = REDIS_CONNECTION.hgetall(f"couplers:{bus}")
+    if snapshot is not None:
+        redis_config = snapshot.hgetall(f"couplers:{bus}")
+    else:
+        redis_config = REDIS_CONNECTION.hgetall(f"couplers:{bus}")
+    # values that take precedence over redis without being written to it
+    if overrides is not None:
+        redis_config = redis_config | overrides
+
+    return apply_redis_config_coupler(coupler, redis_config)
+
+
+def apply_redis_config_coupler(
+    coupler: ExtendedCompositeSquareEdge, redis_config: dict
+) -> ExtendedCompositeSquareEdge:
+    """
+    Sets the parameters of a coupler from the fields of its redis hash.
+
+    Args:
+        coupler: The coupler to configure
+        redis_config: The fields of the redis hash
+
+    Returns:
+        The configured coupler
+
+    """
+    bus_qubits = coupler.name.split("_")
 
     def redis_value(key: str):
         return float(redis_config[key])
 
-    key = "cz_pulse_frequency"
-    try:
-        coupler.clock_freqs.cz_freq(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
-    key = "cz_pulse_amplitude"
-    try:
-        coupler.cz.square_amp(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
-    key = "cz_pulse_duration"
-    try:
-        coupler.cz.square_duration(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
-    key = "cz_half_duration"
-    try:
-        coupler.cz.half_square_duration(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
-    key = "cz_pulse_width"
-    try:
-        coupler.cz.cz_width(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
-    key = "parking_current"
-    try:
-        coupler.coupler_parameters.parking_current(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
-    key = "initial_parking_current"
-    try:
-        coupler.coupler_parameters.parking_current(redis_value(key))
-    except:
-        logger.warning(
-            f"{key} is not present in redis. Ignore this for single qubit nodes"
-        )
+    for key, parameter in _COUPLER_REDIS_PARAMETERS:
+        try:
+            parameter(coupler)(redis_value(key))
+        except:
+            logger.warning(
+                f"{key} is not present in redis. Ignore this for single qubit nodes"
+            )
     try:
         if bus_qubits[0] == str(redis_config["target_qubit"]):
             logger.info(f"Reading Target Qubit from Redis: {bus_qubits[0]}")
@@ -160,6 +254,7 @@ def update_redis_trusted_values(
     this_element: str,
     qoi: QOI = None,
     redis_fields: Union[List[str], None] = None,
+    pipeline=None,
 ):
     """
     Update the redis trusted values for the qubit or coupler.
@@ -168,6 +263,8 @@ def update_redis_trusted_values(
         this_element: The element name (qubit or coupler)
         qoi: The quantity of interest as QOI wrapped object
         redis_fields: List of redis fields for additional verification
+        pipeline: Redis pipeline to queue the writes in, the caller executes it.
+            If not given, the writes of the element are executed in a transaction of their own.
     """
 
     if "_" in this_element:
@@ -175,22 +272,51 @@ def update_redis_trusted_values(
         _qoi_items = dict(qoi.analysis_result.items())
         if _are_two_qubit_in_qoi(_qoi_items):
             _save_parameters_in_qubits_in_coupler(
-                node, this_element, name, _qoi_items, redis_fields
+                node, this_element, name, _qoi_items, redis_fields, pipeline
             )
         else:
-            _save_parameters_in_coupler(node, this_element, name, qoi, redis_fields)
+            _save_parameters_in_coupler(
+                node, this_element, name, qoi, redis_fields, pipeline
+            )
 
     else:
         name = "transmons"
-        _save_parameters_in_transmon(node, this_element, name, qoi, redis_fields)
+        _save_parameters_in_transmon(
+            node, this_element, name, qoi, redis_fields, pipeline
+        )
 
 
 def _are_two_qubit_in_qoi(qoi: dict):
     return all(re.fullmatch(r"q\d{2}", key) for key in qoi)
 
 
+def _write_hashes(hashes: dict[str, dict], pipeline=None):
+    """
+    Writes every hash with a single hset.
+
+    Args:
+        hashes: The fields to write, keyed by the redis key of the hash
+        pipeline: Redis pipeline to queue the writes in, if not given the writes are
+            executed in a transaction of their own
+
+    """
+    execute = pipeline is None
+    if execute:
+        pipeline = REDIS_CONNECTION.pipeline(transaction=True)
+    for key, mapping in hashes.items():
+        if mapping:
+            pipeline.hset(key, mapping=mapping)
+    if execute:
+        pipeline.execute()
+
+
 def _save_parameters_in_transmon(
-    node: str, this_element: str, name, qoi: QOI, redis_fields: List[str]
+    node: str,
+    this_element: str,
+    name,
+    qoi: QOI,
+    redis_fields: List[str],
+    pipeline=None,
 ):
     """
     Saves the parameters for a single qubit in redis
@@ -201,6 +327,7 @@ def _save_parameters_in_transmon(
         name: Name of the property to update e.g. the qubit frequency
         qoi: The QOI object with the value to update
         redis_fields: redis fields from the node to be updated, this is for verification
+        pipeline: Redis pipeline to queue the writes in
 
     Raises:
         ValueError: if there are parameters in the qubit object that are not part of the node
@@ -208,25 +335,35 @@ def _save_parameters_in_transmon(
     """
     analysis_successful = qoi.analysis_successful
     if analysis_successful:
+        transmon_values = {}
         for qoi_name, qoi_result in qoi.analysis_result.items():
             if qoi_name not in redis_fields:
                 raise ValueError(
                     f"The qoi {qoi_name} is not in redis fields: {redis_fields} for {this_element}"
                 )
-            value = qoi_result["value"]
-            REDIS_CONNECTION.hset(f"{name}:{this_element}", qoi_name, value)
+            transmon_values[qoi_name] = qoi_result["value"]
             # Saving the error to the measured value
-            error = qoi_result["error"]
-            REDIS_CONNECTION.hset(f"{name}:{this_element}", qoi_name + "_error", error)
-
-        REDIS_CONNECTION.hset(f"cs:{this_element}", node, "calibrated")
+            transmon_values[qoi_name + "_error"] = qoi_result["error"]
+
+        _write_hashes(
+            {
+                f"{name}:{this_element}": transmon_values,
+                f"cs:{this_element}": {node: "calibrated"},
+            },
+            pipeline,
+        )
 
     else:
         logger.warning(f"Analysis failed for {this_element}")
 
 
 def _save_parameters_in_coupler(
-    node: str, this_element: str, name: str, qoi: QOI, redis_fields: List[str]
+    node: str,
+    this_element: str,
+    name: str,
+    qoi: QOI,
+    redis_fields: List[str],
+    pipeline=None,
 ):
     """
     Saves the parameters for a coupler in redis
@@ -237,12 +374,14 @@ def _save_parameters_in_coupler(
         name: Name of the property to update e.g. the dc current
         qoi: The QOI object with the value to update
         redis_fields: redis fields from the node to be updated, this is for verification
+        pipeline: Redis pipeline to queue the writes in
 
     Raises:
         ValueError: if there are parameters in the qubit object that are not part of the node
 
     """
 
+    coupler_values = {}
     analysis_successful = qoi.analysis_successful
     if analysis_successful:
         for qoi_name, qoi_result in qoi.analysis_result.items():
@@ -254,18 +393,29 @@ def _save_parameters_in_coupler(
             if isinstance(value, list):
                 value = str(value)
             logger.info(f"Updating redis for {this_element} with {qoi_name}: {value}")
-            REDIS_CONNECTION.hset(f"{name}:{this_element}", qoi_name, value)
+            coupler_values[qoi_name] = value
             error = qoi_result["error"]
             logger.info(
                 f"Updating redis for {this_element} with {qoi_name}_error: {error}"
             )
-            REDIS_CONNECTION.hset(f"{name}:{this_element}", qoi_name + "_error", error)
-
-    REDIS_CONNECTION.hset(f"cs:{this_element}", node, "calibrated")
+            coupler_values[qoi_name + "_error"] = error
+
+    _write_hashes(
+        {
+            f"{name}:{this_element}": coupler_values,
+            f"cs:{this_element}": {node: "calibrated"},
+        },
+        pipeline,
+    )
 
 
 def _save_parameters_in_qubits_in_coupler(
-    node: str, this_element: str, name: str, qoi: dict, redis_fields: List[str]
+    node: str,
+    this_element: str,
+    name: str,
+    qoi: dict,
+    redis_fields: List[str],
+    pipeline=None,
 ):
     """
     Saves the parameters for the qubits connected to a coupler, in redis
@@ -277,16 +427,17 @@ def _save_parameters_in_qubits_in_coupler(
         name: Name of the property to update e.g. the qubit frequency
         qoi: A dictionary that maps from qubit to the respective QOI
         redis_fields: redis fields from the node to be updated, this is for verification
+        pipeline: Redis pipeline to queue the writes in
 
     """
 
     qubits_in_coupler = [this_element[0:3], this_element[4:7]]
-    for qubit in qubits_in_coupler:
-        for transmon_parameter in redis_fields:
-            REDIS_CONNECTION.hset(
-                f"{name}:{this_element}:{qubit}",
-                transmon_parameter,
-                qoi[qubit][transmon_parameter],
-            )
-
-    REDIS_CONNECTION.hset(f"cs:{this_element}", node, "calibrated")
+    hashes = {
+        f"{name}:{this_element}:{qubit}": {
+            transmon_parameter: qoi[qubit][transmon_parameter]
+            for transmon_parameter in redis_fields
+        }
+        for qubit in qubits_in_coupler
+    }
+    hashes[f"cs:{this_element}"] = {node: "calibrated"}
+    _write_hashes(hashes, pipeline)
@@ -0,0 +1,174 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas
+import xarray
+
+
+class OuterResultBuffer:
+    """
+    Collects the datasets measured at every point of an outer or external samplespace.
+
+    The data variables are written into arrays preallocated for all outer points and the dataset
+    is built once at the end, instead of merging the growing result with every new point.
+    The result is the same as merging the expanded datasets with join="outer", so the outer
+    coordinates are sorted.
+    """
+
+    def __init__(self, outer_coordinates: Dict[str, pandas.Index]):
+        """
+        Args:
+            outer_coordinates: For every outer dimension, in the order of the dimensions of the
+                result, the coordinate values in the order of the iterations.
+                A `pandas.MultiIndex` results in a multi-index coordinate.
+        """
+        self._coordinates: Dict[str, pandas.Index] = {}
+        self._positions: Dict[str, np.ndarray] = {}
+        for dim, values in outer_coordinates.items():
+            index = values if isinstance(values, pandas.Index) else pandas.Index(values)
+            sorted_index = index.unique().sort_values()
+            self._coordinates[dim] = sorted_index
+            self._positions[dim] = sorted_index.get_indexer(index)
+        self._outer_shape = tuple(len(index) for index in self._coordinates.values())
+        self._measured = {
+            dim: np.zeros(len(index), dtype=bool)
+            for dim, index in self._coordinates.items()
+        }
+
+        self._template: Optional[xarray.Dataset] = None
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._variable_dims: Dict[str, tuple] = {}
+        self._attrs: dict = {}
+        self._variable_attrs: Dict[str, dict] = {}
+        # Only used if the datasets of the points do not share their coordinates
+        self._datasets: Optional[List[xarray.Dataset]] = None
+
+    def add(self, outer_indices: Dict[str, int], dataset: xarray.Dataset) -> None:
+        """
+        Store the dataset of one outer point.
+
+        Args:
+            outer_indices: The iteration index along every outer dimension.
+            dataset: The dataset measured at that point, without the outer dimensions.
+        """
+        for dim in self._coordinates:
+            self._measured[dim][self._positions[dim][outer_indices[dim]]] = True
+
+        if self._datasets is None and not self._matches_template(dataset):
+            # Fall back to merging, which pads differing coordinates with nan
+            self._datasets = [] if self._template is None else [self.to_dataset()]
+
+        if self._datasets is not None:
+            self._datasets.append(self._expand(outer_indices, dataset))
+            return
+
+        if self._template is None:
+            self._allocate(dataset)
+
+        position = tuple(
+            self._positions[dim][outer_indices[dim]] for dim in self._coordinates
+        )
+        for name, variable in dataset.data_vars.items():
+            self._buffers[name][position] = variable.values
+            self._variable_attrs[name] = variable.attrs
+        self._attrs = dataset.attrs
+
+    def to_dataset(self) -> xarray.Dataset:
+        """
+        Returns:
+            The dataset with the outer dimensions in front of the dimensions of every variable.
+            Outer coordinates without any measured point, e.g. after the measurement stopped
+            early, are left out.
+        """
+        if self._datasets is not None:
+            # The newest dataset goes first, so its attributes take precedence like in the merge loop
+            return xarray.merge(
+                self._datasets[::-1], join="outer", compat="no_conflicts"
+            )
+        if self._template is None:
+            return xarray.Dataset()
+
+        outer_dims = tuple(self._coordinates.keys())
+        data_vars = {
+            name: (
+                outer_dims + self._variable_dims[name],
+                buffer,
+                self._variable_attrs[name],
+            )
+            for name, buffer in self._buffers.items()
+        }
+        dataset = xarray.Dataset(
+            data_vars, coords=self._template.coords, attrs=self._attrs
+        )
+        for dim, index in self._coordinates.items():
+            if isinstance(index, pandas.MultiIndex):
+                dataset = dataset.assign_coords(
+                    xarray.Coordinates.from_pandas_multiindex(index, dim)
+                )
+            else:
+                dataset = dataset.assign_coords({dim: index.values})
+
+        measured_positions = {
+            dim: np.flatnonzero(measured)
+            for dim, measured in self._measured.items()
+            if not measured.all()
+        }
+        if measured_positions:
+            dataset = dataset.isel(measured_positions)
+        return dataset
+
+    def _allocate(self, dataset: xarray.Dataset) -> None:
+        # The coordinates of the first point are used for the whole result
+        self._template = dataset.drop_vars(list(dataset.data_vars))
+        for name, variable in dataset.data_vars.items():
+            self._variable_dims[name] = variable.dims
+            # Points that are never measured stay nan, like in an outer join
+            dtype = variable.dtype
+            if not np.issubdtype(dtype, np.inexact):
+                dtype = np.float64
+            self._buffers[name] = np.full(
+                self._outer_shape + variable.shape, np.nan, dtype=dtype
+            )
+
+    def _matches_template(self, dataset: xarray.Dataset) -> bool:
+        if self._template is None:
+            return True
+        if set(dataset.data_vars) != set(self._buffers):
+            return False
+        for name, variable in dataset.data_vars.items():
+            if variable.dims != self._variable_dims[name]:
+                return False
+            if variable.shape != self._buffers[name].shape[len(self._outer_shape) :]:
+                return False
+        for name, coordinate in dataset.coords.items():
+            if name not in self._template.coords:
+                return False
+            if not np.array_equal(
+                coordinate.values, self._template.coords[name].values
+            ):
+                return False
+        return len(dataset.coords) == len(self._template.coords)
+
+    def _expand(
+        self, outer_indices: Dict[str, int], dataset: xarray.Dataset
+    ) -> xarray.Dataset:
+        # Expanding prepends the dimension, so the first outer dimension is expanded last
+        for dim in reversed(list(self._coordinates.keys())):
+            position = self._positions[dim][outer_indices[dim]]
+            index = self._coordinates[dim][[position]]
+            dataset = dataset.expand_dims({dim: index})
+            if isinstance(index, pandas.MultiIndex):
+                dataset = dataset.assign_coords({dim: (dim, index)})
+        return dataset
@@ -0,0 +1,97 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import xarray
+
+from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.base.analysis import BaseNodeAnalysis
+
+if TYPE_CHECKING:
+    from tergite_autocalibration.lib.base.node import BaseNode
+
+
+class StreamingAnalysis:
+    """
+    Hands the dataset of every measured outer point to the `analyze_iteration` hook of the
+    node analysis. The hook runs in a background thread, so it overlaps with the measurement
+    of the following points.
+    """
+
+    def __init__(self, analysis: "BaseNodeAnalysis"):
+        self.analysis = analysis
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="streaming_analysis"
+        )
+        self._futures: List[Future] = []
+
+    @classmethod
+    def for_node(cls, node: "BaseNode") -> Optional["StreamingAnalysis"]:
+        """
+        Args:
+            node: The node that is measured.
+
+        Returns:
+            The streaming analysis of the node, or None if streaming analysis is disabled
+            or the analysis of the node does not implement `analyze_iteration`.
+        """
+        if not CONFIG.run.streaming_analysis:
+            return None
+        if node.analysis_obj.analyze_iteration is BaseNodeAnalysis.analyze_iteration:
+            return None
+        return cls(node.get_node_analysis())
+
+    def submit(
+        self,
+        dataset: xarray.Dataset,
+        outer_values: dict,
+        iteration: Tuple[int, int],
+    ) -> None:
+        """
+        Queue the analysis of a measured outer point.
+        If the analysis of an earlier point failed, its exception is raised here,
+        which aborts the measurement.
+
+        Args:
+            dataset: The configured dataset of the point.
+            outer_values: The value of every outer settable at the point.
+            iteration: Tuple of (current_iteration, total_iterations).
+        """
+        self._raise_for_finished()
+        self._futures.append(
+            self._executor.submit(
+                self.analysis.analyze_iteration, dataset, outer_values, iteration
+            )
+        )
+
+    def join(self) -> None:
+        """
+        Wait for the analysis of all submitted points and raise the first exception.
+        """
+        for future in self._futures:
+            future.result()
+        self._futures = []
+
+    def shutdown(self) -> None:
+        """
+        Stop the background thread, the analysis of queued points is cancelled.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _raise_for_finished(self) -> None:
+        # Does not block the measurement for points that are still being analysed
+        for future in self._futures:
+            if future.done():
+                future.result()
+        self._futures = [future for future in self._futures if not future.done()]
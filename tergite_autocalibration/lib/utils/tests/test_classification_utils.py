@@ -15,7 +15,11 @@ import xarray
 from numpy import exp, pi
 
 from tergite_autocalibration.config.globals import REDIS_CONNECTION
-from tergite_autocalibration.lib.utils.classification_functions import assign_state
+from tergite_autocalibration.lib.utils.classification_functions import (
+    ThreeStateDiscriminator,
+    assign_state,
+    calculate_probabilities,
+)
 
 
 def test_assign_state():
@@ -37,3 +41,43 @@ def test_assign_state():
     )
     iq_points_array = xarray.DataArray(iq_points).assign_attrs(qubit=qubit)
     assert xarray.DataArray([0, 1, 0, 2, 1]).equals(assign_state(iq_points_array))
+
+
+def test_discriminator_wraps_around_zero_degrees():
+    # the |0> sector spans from 330 over 0 to 90 degrees
+    discriminator = ThreeStateDiscriminator(1 + 0j, 330, 180, 90)
+    angles = np.deg2rad([0, 45, 100, 179, 181, 300, 329, 331, 359])
+    iq_points = 1 + 2 * exp(1j * angles)
+
+    assert discriminator.assign(iq_points).tolist() == [0, 0, 2, 2, 1, 1, 1, 0, 0]
+
+
+def test_calculate_probabilities():
+    qubit = "q06"
+    REDIS_CONNECTION.hset(f"transmons:{qubit}", "centroid_I", "1")
+    REDIS_CONNECTION.hset(f"transmons:{qubit}", "centroid_Q", "0")
+    REDIS_CONNECTION.hset(f"transmons:{qubit}", "omega_01", "330")
+    REDIS_CONNECTION.hset(f"transmons:{qubit}", "omega_12", "180")
+    REDIS_CONNECTION.hset(f"transmons:{qubit}", "omega_20", "90")
+
+    state_0, state_1, state_2 = 3, 1 - 2j, 1j
+    iq_points = np.array(
+        [
+            [state_0, state_0, state_1, state_2],
+            [state_2, state_2, state_2, state_1],
+        ]
+    )
+    iq_points_array = xarray.DataArray(
+        iq_points,
+        dims=("cliffordsq06", "loops"),
+        coords={"cliffordsq06": [1, 5], "loops": np.arange(4)},
+    ).assign_attrs(qubit=qubit)
+
+    probabilities = calculate_probabilities(iq_points_array)
+
+    assert probabilities.dims == ("state", "cliffordsq06")
+    assert probabilities["state"].values.tolist() == [0, 1, 2]
+    assert probabilities["qubit"] == qubit
+    np.testing.assert_allclose(
+        probabilities.values, [[0.5, 0], [0.25, 0.25], [0.25, 0.75]]
+    )
@@ -0,0 +1,92 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import os
+import time
+
+import numpy as np
+from quantify_scheduler import Schedule
+
+from tergite_autocalibration.lib.utils.compilation_cache import (
+    CompiledScheduleCache,
+    compilation_key,
+)
+
+
+def test_compilation_key_is_stable():
+    samplespace_a = {
+        "frequencies": {"q00": np.linspace(4e9, 5e9, 11), "q01": np.arange(3)},
+        "amplitudes": {"q00": range(4), "q01": range(4)},
+    }
+    samplespace_b = {
+        "amplitudes": {"q01": range(4), "q00": range(4)},
+        "frequencies": {"q01": np.arange(3), "q00": np.linspace(4e9, 5e9, 11)},
+    }
+    key_a = compilation_key("node", samplespace_a, {"loops": 2}, "{}")
+    key_b = compilation_key("node", samplespace_b, {"loops": 2}, "{}")
+    assert key_a == key_b
+
+
+def test_compilation_key_changes_with_inputs():
+    samplespace = {"frequencies": {"q00": np.linspace(4e9, 5e9, 11)}}
+    shifted_samplespace = {"frequencies": {"q00": np.linspace(4e9, 5e9, 11) + 1}}
+
+    key = compilation_key("node", samplespace, {}, "{}")
+    assert key != compilation_key("node", shifted_samplespace, {}, "{}")
+    assert key != compilation_key("other_node", samplespace, {}, "{}")
+    assert key != compilation_key("node", samplespace, {"loops": 1}, "{}")
+    assert key != compilation_key("node", samplespace, {}, '{"clock": 1}')
+    assert key != compilation_key(
+        "node", samplespace, {}, "{}", device_elements={"q00": {"amp": 0.1}}
+    )
+
+
+def test_cache_round_trip(tmp_path):
+    cache = CompiledScheduleCache(tmp_path)
+    schedule = Schedule("cached_schedule", repetitions=3)
+
+    assert cache.get("missing") is None
+
+    cache.put("key", schedule)
+    cached_schedule = cache.get("key")
+
+    assert cached_schedule.name == "cached_schedule"
+    assert cached_schedule.repetitions == 3
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = CompiledScheduleCache(tmp_path)
+    for index in range(3):
+        cache.put(f"key_{index}", Schedule(f"schedule_{index}"))
+        # Make sure the access times are distinguishable
+        entry_path = tmp_path / f"key_{index}.pkl"
+        os.utime(entry_path, (time.time() - 10 + index, time.time() - 10 + index))
+
+    # Reading key_0 marks it as recently used
+    assert cache.get("key_0") is not None
+
+    entry_size = (tmp_path / "key_0.pkl").stat().st_size
+    cache.max_size_bytes = 2 * entry_size
+    cache.put("key_3", Schedule("schedule_3"))
+
+    assert cache.get("key_1") is None
+    assert cache.get("key_2") is None
+    assert cache.get("key_0") is not None
+    assert cache.get("key_3") is not None
+
+
+def test_cache_ignores_unreadable_entries(tmp_path):
+    cache = CompiledScheduleCache(tmp_path)
+    (tmp_path / "broken.pkl").write_bytes(b"not a pickle")
+
+    assert cache.get("broken") is None
+    assert not (tmp_path / "broken.pkl").exists()
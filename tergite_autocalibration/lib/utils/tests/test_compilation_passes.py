@@ -0,0 +1,74 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+from quantify_scheduler import Schedule
+from quantify_scheduler.backends import qblox_backend
+from quantify_scheduler.backends.graph_compilation import SerialCompilationConfig
+from quantify_scheduler.operations.control_flow_library import Conditional, Loop
+from quantify_scheduler.operations.gate_library import X, Measure, Reset, Rxy
+
+from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.lib.utils.compilation_passes import (
+    CONDITIONAL_PLAYBACK_PASS,
+    compile_conditional_playback,
+    contains_conditional_playback,
+    with_conditional_playback_check,
+)
+
+
+def _looped_schedule(body: Schedule, repetitions: int = 1000) -> Schedule:
+    schedule = Schedule("looped_schedule")
+    schedule.add(body, control_flow=Loop(repetitions))
+    return schedule
+
+
+def test_schedule_without_conditional_playback():
+    shot = Schedule("shot")
+    shot.add(Reset("q00"))
+    for theta in [90, 180, -90]:
+        shot.add(Rxy(theta=theta, phi=0, qubit="q00"))
+    shot.add(Measure("q00", acq_index=0))
+    schedule = _looped_schedule(shot)
+
+    assert not contains_conditional_playback(schedule)
+    assert compile_conditional_playback(schedule) is schedule
+
+
+def test_schedule_with_conditional_playback():
+    shot = Schedule("shot")
+    shot.add(Measure("q00", acq_index=0, feedback_trigger_label="q00"))
+    shot.add(X("q00"), control_flow=Conditional("q00"))
+
+    assert contains_conditional_playback(_looped_schedule(shot))
+
+
+def test_with_conditional_playback_check_replaces_the_pass():
+    compilation_config = SerialCompilationConfig(
+        name="test", hardware_compilation_config=CONFIG.cluster
+    )
+
+    checked_config = with_conditional_playback_check(compilation_config)
+
+    passes = {
+        compilation_pass.name: compilation_pass.compilation_func
+        for compilation_pass in checked_config.hardware_compilation_config.compilation_passes
+    }
+    assert passes[CONDITIONAL_PLAYBACK_PASS] is compile_conditional_playback
+    # The shared hardware configuration is not modified
+    original_passes = {
+        compilation_pass.name: compilation_pass.compilation_func
+        for compilation_pass in CONFIG.cluster.compilation_passes
+    }
+    assert (
+        original_passes[CONDITIONAL_PLAYBACK_PASS]
+        is qblox_backend.compile_conditional_playback
+    )
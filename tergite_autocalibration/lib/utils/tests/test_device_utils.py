@@ -17,11 +17,13 @@ import os
 import numpy
 import pytest
 
-from tergite_autocalibration.config.globals import CONFIG
+from tergite_autocalibration.config.globals import CONFIG, REDIS_CONNECTION
 from tergite_autocalibration.lib.utils.device import (
+    DeviceRegistry,
     close_device_resources,
     configure_device,
     save_serial_device,
+    serialize_device_elements,
 )
 from tergite_autocalibration.lib.utils.validators import (
     get_batched_dimensions,
@@ -61,6 +63,88 @@ def test_create_serial_device():
     close_device_resources(test_device)
 
 
+@with_redis(redis_mock)
+def test_configure_device_with_redis_overrides():
+    ExtendedTransmon.close_all()
+    redis_overrides = {
+        "transmons:q00": {"rxy:amp180": 0.25},
+        "couplers:q00_q01": {"cz_phase_path": "via_02"},
+    }
+    test_device = configure_device(
+        "test_device",
+        qubits=CONFIG.run.qubits,
+        couplers=CONFIG.run.couplers,
+        redis_overrides=redis_overrides,
+    )
+
+    assert math.isclose(test_device.get_element("q00").rxy.amp180(), 0.25)
+    assert test_device.get_edge("q00_q01").coupler_parameters.phase_path() == "via_02"
+    # the other elements and redis itself are untouched
+    assert math.isclose(
+        float(REDIS_CONNECTION.hget("transmons:q00", "rxy:amp180")),
+        0.7308488204080522,
+    )
+
+    close_device_resources(test_device)
+
+
+@with_redis(redis_mock)
+def test_device_registry_reuses_the_elements():
+    ExtendedTransmon.close_all()
+    qubits, couplers = CONFIG.run.qubits, CONFIG.run.couplers
+    reference_device = configure_device("reference", qubits, couplers)
+    reference_elements = serialize_device_elements(reference_device)
+    close_device_resources(reference_device)
+
+    registry = DeviceRegistry()
+    try:
+        first_device = registry.configure_device("first_node", qubits, couplers)
+        assert serialize_device_elements(first_device) == reference_elements
+        q00 = first_device.get_element("q00")
+        q01 = first_device.get_element("q01")
+        q00_q01 = first_device.get_edge("q00_q01")
+        registry.release_device(first_device)
+
+        # only the changed fields are applied to the elements of the next node
+        REDIS_CONNECTION.hset("transmons:q00", "rxy:amp180", 0.25)
+        REDIS_CONNECTION.hdel("transmons:q01", "rxy:motzoi")
+        second_device = registry.configure_device("second_node", qubits, couplers)
+        assert second_device.name == "second_node"
+        assert second_device.get_element("q00") is q00
+        assert math.isclose(q00.rxy.amp180(), 0.25)
+        assert second_device.get_edge("q00_q01") is q00_q01
+
+        # an element is built again if one of its fields is removed from redis
+        new_q01 = second_device.get_element("q01")
+        assert new_q01 is not q01
+        assert new_q01.rxy.motzoi() == 0
+        registry.release_device(second_device)
+    finally:
+        registry.close()
+
+    assert len(ExtendedTransmon.instances()) == 0
+
+
+@with_redis(redis_mock)
+def test_device_registry_requires_released_device():
+    ExtendedTransmon.close_all()
+    qubits, couplers = CONFIG.run.qubits, CONFIG.run.couplers
+
+    registry = DeviceRegistry()
+    try:
+        first_device = registry.configure_device("first_node", qubits, couplers)
+        with pytest.raises(RuntimeError, match="first_node was not released"):
+            registry.configure_device("second_node", qubits, couplers)
+        registry.release_device(first_device)
+
+        second_device = registry.configure_device("second_node", qubits, couplers)
+        registry.release_device(second_device)
+    finally:
+        registry.close()
+
+    assert len(ExtendedTransmon.instances()) == 0
+
+
 def test_save_serial_device(tmp_path):
     # ensure no other transmon objects are instantiated
     # this is because some other test doesn't close the device properly
@@ -17,6 +17,7 @@ import pytest
 
 from tergite_autocalibration.lib.utils.graph import (
     get_dependencies_in_topological_order,
+    get_dependency_map,
     range_dependencies_in_topological_order,
 )
 
@@ -137,3 +138,17 @@ def test_range_dependencies_complex_graph_multi_node(complex_graph):
     assert "H" in topological_order
     assert "C" in topological_order
     assert "E" in topological_order
+
+
+def test_dependency_map_complex_graph(complex_graph):
+    """
+    Dependencies are restricted to the selected nodes
+    """
+    dependency_map = get_dependency_map(complex_graph, ["B", "D", "E", "F", "X"])
+
+    assert dependency_map["B"] == set()
+    assert dependency_map["D"] == {"B"}
+    assert dependency_map["E"] == {"B"}
+    assert dependency_map["F"] == {"B"}
+    # Nodes that are not part of the graph do not have dependencies
+    assert dependency_map["X"] == set()
@@ -10,10 +10,22 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import pytest
+
 from tergite_autocalibration.config.globals import REDIS_CONNECTION
-from tergite_autocalibration.lib.utils.redis import _save_parameters_in_transmon
+from tergite_autocalibration.lib.utils.redis import (
+    RedisDeviceSnapshot,
+    _save_parameters_in_transmon,
+    load_redis_config,
+    update_redis_trusted_values,
+)
+from tergite_autocalibration.tests.utils.decorators import with_redis
+from tergite_autocalibration.tests.utils.fixtures import get_fixture_path
+from tergite_autocalibration.utils.dto.extended_transmon_element import ExtendedTransmon
 from tergite_autocalibration.utils.dto.qoi import QOI
 
+redis_mock = get_fixture_path("redis", "standard_redis_mock.json")
+
 
 def test_save_parameters_in_transmon():
     """
@@ -43,3 +55,119 @@ def test_save_parameters_in_transmon():
         REDIS_CONNECTION.hget(f"{name}:{this_element}", "resonator_minimum_error")
     )
     assert resonator_minimum_value == 0.01
+
+
+class _CountingConnection:
+    """
+    Forwards to the redis connection and counts the round trips
+    """
+
+    def __init__(self):
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        connection = self
+        pipeline = REDIS_CONNECTION.pipeline(transaction=transaction)
+        execute = pipeline.execute
+
+        def counted_execute(*args, **kwargs):
+            connection.round_trips += 1
+            return execute(*args, **kwargs)
+
+        pipeline.execute = counted_execute
+        return pipeline
+
+
+@with_redis(redis_mock)
+def test_redis_device_snapshot():
+    connection = _CountingConnection()
+    snapshot = RedisDeviceSnapshot(
+        qubits=["q00", "q01"], couplers=["q00_q01"], connection=connection
+    )
+    assert connection.round_trips == 1
+
+    assert snapshot.hgetall("transmons:q00") == REDIS_CONNECTION.hgetall(
+        "transmons:q00"
+    )
+    assert snapshot.hget("couplers:q00_q01", "cz_phase_path") == "via_20"
+    assert snapshot.hget("couplers:q00_q01", "missing_field") is None
+    assert snapshot.hgetall("cs:q00_q01") == REDIS_CONNECTION.hgetall("cs:q00_q01")
+
+    # later writes are not visible in the snapshot
+    REDIS_CONNECTION.hset("couplers:q00_q01", "cz_phase_path", "via_02")
+    assert snapshot.hget("couplers:q00_q01", "cz_phase_path") == "via_20"
+
+    with pytest.raises(KeyError):
+        snapshot.hgetall("transmons:q02")
+
+
+@with_redis(redis_mock)
+def test_update_redis_trusted_values_in_one_transaction():
+    node = "resonator_spectroscopy"
+    redis_fields = ["resonator_minimum"]
+    qois = {
+        "q00": QOI({"resonator_minimum": {"value": 6.9e9, "error": 0.1}}, True),
+        "q01": QOI({"resonator_minimum": {"value": 7.1e9, "error": 0.2}}, True),
+    }
+
+    with REDIS_CONNECTION.pipeline(transaction=True) as pipeline:
+        for element, qoi in qois.items():
+            update_redis_trusted_values(
+                node, element, qoi=qoi, redis_fields=redis_fields, pipeline=pipeline
+            )
+        # nothing is written before the transaction is executed
+        assert REDIS_CONNECTION.hget("transmons:q00", "resonator_minimum") != str(6.9e9)
+        pipeline.execute()
+
+    assert float(REDIS_CONNECTION.hget("transmons:q00", "resonator_minimum")) == 6.9e9
+    assert float(REDIS_CONNECTION.hget("transmons:q01", "resonator_minimum")) == 7.1e9
+    assert (
+        float(REDIS_CONNECTION.hget("transmons:q01", "resonator_minimum_error")) == 0.2
+    )
+    assert REDIS_CONNECTION.hget("cs:q01", node) == "calibrated"
+
+
+@with_redis(redis_mock)
+def test_update_redis_trusted_values_invalid_qoi_writes_nothing():
+    node = "resonator_spectroscopy"
+    qubit_frequency = REDIS_CONNECTION.hget("transmons:q00", "clock_freqs:f01")
+    qois = {
+        "q00": QOI({"clock_freqs:f01": {"value": 4.2e9, "error": 0.1}}, True),
+        "q01": QOI({"unknown_qoi": {"value": 1.0, "error": 0.1}}, True),
+    }
+
+    with pytest.raises(ValueError):
+        with REDIS_CONNECTION.pipeline(transaction=True) as pipeline:
+            for element, qoi in qois.items():
+                update_redis_trusted_values(
+                    node,
+                    element,
+                    qoi=qoi,
+                    redis_fields=["clock_freqs:f01"],
+                    pipeline=pipeline,
+                )
+            pipeline.execute()
+
+    assert REDIS_CONNECTION.hget("transmons:q00", "clock_freqs:f01") == qubit_frequency
+
+
+@with_redis(redis_mock)
+def test_load_redis_config():
+    transmon = ExtendedTransmon("q01")
+    try:
+        loaded_transmon = load_redis_config(
+            transmon, 3, overrides={"rxy:amp180": "0.1"}
+        )
+
+        assert loaded_transmon is transmon
+        assert transmon.clock_freqs.f01() == float(
+            REDIS_CONNECTION.hget("transmons:q01", "clock_freqs:f01")
+        )
+        assert transmon.spec.spec_ampl_12_optimal() == float(
+            REDIS_CONNECTION.hget("transmons:q01", "spec:spec_ampl_12_optimal")
+        )
+        assert transmon.rxy.amp180() == 0.1
+        assert transmon.measure.acq_channel() == 3
+        assert transmon.measure_3state_opt.acq_channel() == 3
+    finally:
+        transmon.close()
@@ -0,0 +1,152 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+from itertools import product
+
+import numpy as np
+import pandas
+import xarray
+
+from tergite_autocalibration.lib.utils.result_buffer import OuterResultBuffer
+
+
+def _point_dataset(value: float, shots=np.arange(4)) -> xarray.Dataset:
+    return xarray.Dataset(
+        {
+            "yq00": ("shotsq00", value * (shots + 1j)),
+            "yq01": ("shotsq01", -value * shots.astype(float)),
+        },
+        coords={"shotsq00": shots, "shotsq01": shots},
+        attrs={"qubit": "q00"},
+    )
+
+
+def _merged(points) -> xarray.Dataset:
+    """
+    The accumulation the result buffer replaces
+    """
+    result_dataset = xarray.Dataset()
+    for outer_values, dataset in points:
+        for dim, value in outer_values.items():
+            dataset = dataset.expand_dims({dim: np.array([value])})
+        result_dataset = xarray.merge(
+            [dataset, result_dataset], join="outer", compat="no_conflicts"
+        )
+    return result_dataset
+
+
+def test_result_buffer_matches_merge_for_unsorted_values():
+    values = np.array([3.0, 1.0, 2.0])
+    buffer = OuterResultBuffer({"currents": values})
+    points = []
+    for index, value in enumerate(values):
+        dataset = _point_dataset(value)
+        buffer.add({"currents": index}, dataset)
+        points.append(({"currents": value}, dataset))
+
+    result = buffer.to_dataset()
+    xarray.testing.assert_identical(result, _merged(points))
+    assert list(result["currents"].values) == [1.0, 2.0, 3.0]
+
+
+def test_result_buffer_matches_merge_for_two_settables():
+    outer_samplespace = {"amplitudes": np.array([0.2, 0.1]), "seeds": np.arange(3)}
+    # expanding the settables in order puts the last one first
+    buffer = OuterResultBuffer(
+        {
+            "seeds": outer_samplespace["seeds"],
+            "amplitudes": outer_samplespace["amplitudes"],
+        }
+    )
+    points = []
+    for indices in product(range(2), range(3)):
+        outer_values = {
+            settable: outer_samplespace[settable][index]
+            for settable, index in zip(outer_samplespace, indices)
+        }
+        dataset = _point_dataset(sum(outer_values.values()))
+        buffer.add(dict(zip(outer_samplespace, indices)), dataset)
+        points.append((outer_values, dataset))
+
+    result = buffer.to_dataset()
+    xarray.testing.assert_identical(result, _merged(points))
+    assert result["yq00"].dims == ("seeds", "amplitudes", "shotsq00")
+
+
+def test_result_buffer_with_multi_index():
+    working_points = [(4.1e9, 2e-7), (4.0e9, 3e-7)]
+    buffer = OuterResultBuffer(
+        {
+            "working_points": pandas.MultiIndex.from_tuples(
+                working_points, names=["l1", "l2"]
+            )
+        }
+    )
+    merged = xarray.Dataset()
+    for index, working_point in enumerate(working_points):
+        dataset = _point_dataset(float(index + 1))
+        buffer.add({"working_points": index}, dataset)
+
+        multi_index = pandas.MultiIndex.from_tuples([working_point], names=["l1", "l2"])
+        dataset = dataset.expand_dims({"working_points": multi_index})
+        dataset = dataset.assign_coords(
+            {"working_points": ("working_points", multi_index)}
+        )
+        merged = xarray.merge([dataset, merged], join="outer", compat="no_conflicts")
+
+    result = buffer.to_dataset()
+    xarray.testing.assert_identical(result, merged)
+    assert result.sel(l1=4.0e9)["yq01"].values.tolist() == [[0.0, -2.0, -4.0, -6.0]]
+
+
+def test_result_buffer_falls_back_to_merge_for_differing_coordinates():
+    values = np.array([1.0, 2.0, 3.0])
+    buffer = OuterResultBuffer({"currents": values})
+    points = []
+    for index, value in enumerate(values):
+        # the last point is measured at different shots
+        dataset = _point_dataset(value, shots=np.arange(index // 2, 4 + index // 2))
+        buffer.add({"currents": index}, dataset)
+        points.append(({"currents": value}, dataset))
+
+    xarray.testing.assert_identical(buffer.to_dataset(), _merged(points))
+
+
+def test_result_buffer_leaves_missing_points_nan():
+    buffer = OuterResultBuffer(
+        {"seeds": np.arange(2), "currents": np.array([1.0, 2.0])}
+    )
+    buffer.add({"seeds": 0, "currents": 0}, _point_dataset(1.0))
+    buffer.add({"seeds": 1, "currents": 1}, _point_dataset(2.0))
+
+    result = buffer.to_dataset()
+    assert np.isnan(result["yq01"].sel(seeds=0, currents=2.0)).all()
+    assert result["yq01"].sel(seeds=1, currents=2.0).values.tolist() == [
+        -0.0,
+        -2.0,
+        -4.0,
+        -6.0,
+    ]
+
+
+def test_result_buffer_leaves_out_unmeasured_coordinates():
+    values = np.array([3.0, 1.0, 2.0])
+    buffer = OuterResultBuffer({"currents": values})
+    points = []
+    for index, value in enumerate(values[:2]):
+        dataset = _point_dataset(value)
+        buffer.add({"currents": index}, dataset)
+        points.append(({"currents": value}, dataset))
+
+    result = buffer.to_dataset()
+    xarray.testing.assert_identical(result, _merged(points))
+    assert list(result["currents"].values) == [1.0, 3.0]
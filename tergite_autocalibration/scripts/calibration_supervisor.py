@@ -17,17 +17,22 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import multiprocessing
 import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from ipaddress import IPv4Address
+from multiprocessing.connection import Connection
 from pathlib import Path
 from types import MappingProxyType
-from typing import FrozenSet, List, Union
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Union
 
 from colorama import Fore, Style
 from colorama import init as colorama_init
 from qblox_instruments import Cluster
 from qblox_instruments.types import ClusterType
+from qcodes.instrument import Instrument
 from quantify_scheduler.instrument_coordinator import InstrumentCoordinator
 from quantify_scheduler.instrument_coordinator.components.qblox import ClusterComponent
 
@@ -39,9 +44,21 @@ from tergite_autocalibration.config.globals import (
 )
 from tergite_autocalibration.config.package import ConfigurationPackage
 from tergite_autocalibration.lib.base.node import BaseNode, CouplerNode
-from tergite_autocalibration.lib.utils.graph import filtered_topological_order
+from tergite_autocalibration.lib.utils.compilation_cache import get_compilation_cache
+from tergite_autocalibration.lib.utils.device import (
+    DeviceRegistry,
+    close_device_resources,
+    configure_device,
+)
+from tergite_autocalibration.lib.utils.graph import (
+    CALIBRATION_GRAPH,
+    filtered_topological_order,
+    get_dependency_map,
+)
 from tergite_autocalibration.lib.utils.node_factory import NodeFactory
+from tergite_autocalibration.lib.utils.redis import RedisDeviceSnapshot
 from tergite_autocalibration.utils.backend.redis_utils import (
+    node_parameter_overrides,
     populate_initial_parameters,
     populate_node_parameters,
     populate_quantities_of_interest,
@@ -49,6 +66,11 @@ from tergite_autocalibration.utils.backend.redis_utils import (
 )
 from tergite_autocalibration.utils.dto.enums import DataStatus, MeasurementMode
 from tergite_autocalibration.utils.hardware.spi import SpiDAC
+from tergite_autocalibration.utils.io.artifact_writer import (
+    ArtifactWriter,
+    can_fork,
+    paused_artifact_writers,
+)
 from tergite_autocalibration.utils.io.dataset import create_node_data_path, open_dataset
 from tergite_autocalibration.utils.logging import logger
 from tergite_autocalibration.utils.logging.visuals import draw_arrow_chart
@@ -69,6 +91,12 @@ class CalibrationConfig:
     couplers: List[str] = field(default_factory=lambda: CONFIG.run.couplers)
     target_node_name: str = CONFIG.run.target_node
     user_samplespace: dict = field(default_factory=lambda: CONFIG.samplespace())
+    parallel_execution: bool = field(
+        default_factory=lambda: CONFIG.run.parallel_execution
+    )
+    speculative_compilation: bool = field(
+        default_factory=lambda: CONFIG.run.speculative_compilation
+    )
 
 
 class HardwareManager:
@@ -260,6 +288,12 @@ class NodeManager:
         self.node_factory = NodeFactory()
         self.lab_ic = lab_ic
         self.spi_manager: SpiDAC = None
+        # The transmons and couplers are reused by all nodes of the chain
+        self.device_registry = DeviceRegistry()
+        # The artifacts of a node are saved while the next node runs
+        self.artifact_writer = ArtifactWriter(CONFIG.run.artifact_queue_size)
+        self._speculative_compilation = False
+        self._background_compilations: Dict[str, _BackgroundCompilation] = {}
 
         populate_initial_parameters(
             self.config.qubits,
@@ -267,11 +301,53 @@ class NodeManager:
             REDIS_CONNECTION,
         )
 
+        if self.config.speculative_compilation:
+            self._speculative_compilation = self._supports_speculative_compilation()
+
+    def _supports_speculative_compilation(self) -> bool:
+        if self.config.cluster_mode == MeasurementMode.re_analyse:
+            return False
+        if get_compilation_cache() is None:
+            logger.warning(
+                "Speculative compilation requires the compilation cache, "
+                "set compilation_cache = true in the run configuration."
+            )
+            return False
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Speculative compilation is not supported on this platform.")
+            return False
+        return True
+
     @staticmethod
     def topo_order(target_node: str):
         return filtered_topological_order(target_node)
 
     def inspect_node(self, node_name: str, *, ignore_spec: bool = False):
+        node = self.prepare_node(node_name, ignore_spec=ignore_spec)
+
+        try:
+            if node is None:
+                return
+            result_dataset = node.run_measurement(self.config.cluster_mode)
+        finally:
+            # The node specific parameters are only used by the measurement
+            revert_node_parameters(node_name, self.config.qubits, REDIS_CONNECTION)
+
+        node.run_analysis(result_dataset)
+
+    def prepare_node(
+        self, node_name: str, *, ignore_spec: bool = False
+    ) -> Optional[BaseNode]:
+        """
+        Populates redis for the node and initializes it if it requires calibration.
+
+        Args:
+            node_name: Name of the node to inspect.
+            ignore_spec: Whether to recalibrate the node even if it is in spec.
+
+        Returns:
+            The initialized node or None if the node is in spec.
+        """
         logger.info(f"Inspecting node {node_name}")
 
         populate_quantities_of_interest(
@@ -302,29 +378,127 @@ class NodeManager:
             logger.info(
                 f" \u2714  {Fore.GREEN}{Style.BRIGHT}Node {node_name} in spec{Style.RESET_ALL}"
             )
-        else:
-            logger.warning(
-                f"\u2691\u2691\u2691 {Fore.RED}{Style.BRIGHT}Calibration required for Node {node_name}{Style.RESET_ALL}"
-            )
+            return None
+
+        logger.warning(
+            f"\u2691\u2691\u2691 {Fore.RED}{Style.BRIGHT}Calibration required for Node {node_name}{Style.RESET_ALL}"
+        )
+        self._collect_background_compilation(node_name)
+
+        # Determine the data path for calibration
+        data_path = (
+            CONFIG.run.log_dir
+            if self.config.cluster_mode == MeasurementMode.re_analyse
+            else create_node_data_path(node_name)
+        )
 
-            # Determine the data path for calibration
-            data_path = (
-                CONFIG.run.log_dir
-                if self.config.cluster_mode == MeasurementMode.re_analyse
-                else create_node_data_path(node_name)
+        # Initialize node and update samplespace
+        node = self._initialize_node(node_name)
+
+        node.update_data_path(data_path)
+
+        logger.info(f"Calibrating node {node.name}")
+        return node
+
+    def precompile_in_background(
+        self, node_name: str, *, ignore_spec: bool = False
+    ) -> None:
+        """
+        Starts compiling the schedules of a node in a worker process, so the compilation
+        overlaps with the measurement of the current node. Does nothing if speculative
+        compilation is disabled or the node is in spec.
+
+        The worker builds the device from a snapshot of redis taken now, together with the
+        node specific parameters of the node. The compiled schedules are handed over through
+        the compilation cache. If the current node changes any redis field that the device of
+        the next node reads, the cache key changes and the node compiles again when it runs.
+
+        Args:
+            node_name: Name of the node to compile, usually the next one in the topological order.
+            ignore_spec: Whether the node will be recalibrated even if it is in spec.
+        """
+        if not self._speculative_compilation:
+            return
+
+        populate_quantities_of_interest(
+            node_name,
+            self.node_factory,
+            self.config.qubits,
+            self.config.couplers,
+            REDIS_CONNECTION,
+        )
+        if (
+            not ignore_spec
+            and self._check_calibration_status_redis(node_name) == DataStatus.in_spec
+        ):
+            return
+
+        # All hashes are read in one round trip, so no other node writes redis in between
+        device_snapshot = RedisDeviceSnapshot(self.config.qubits, self.config.couplers)
+        redis_snapshot = {
+            redis_key: device_snapshot.hgetall(redis_key)
+            for redis_key in [f"transmons:{qubit}" for qubit in self.config.qubits]
+            + [f"couplers:{coupler}" for coupler in self.config.couplers]
+        }
+        overrides = node_parameter_overrides(
+            node_name, self.config.qubits, self.config.couplers
+        )
+        for redis_key, fields in overrides.items():
+            redis_snapshot[redis_key] = redis_snapshot.get(redis_key, {}) | fields
+
+        if not can_fork():
+            # Forking while other threads run can copy the locks they hold
+            logger.info(
+                f"{node_name} is compiled when it runs, other threads are running"
             )
+            return
 
-            # Initialize node and update samplespace
-            node = self._initialize_node(node_name)
+        logger.info(f"Compiling {node_name} in the background")
+        self._background_compilations[node_name] = _BackgroundCompilation(
+            node_name,
+            self.config.qubits,
+            self.config.couplers,
+            self.config.user_samplespace,
+            redis_snapshot,
+        )
 
-            node.update_data_path(data_path)
+    def _collect_background_compilation(self, node_name: str) -> None:
+        compilation = self._background_compilations.get(node_name)
+        if compilation is None:
+            return
+        if not compilation.done():
+            # The node compiles on its own; the result of the worker still lands in the cache
+            logger.info(f"Background compilation of {node_name} is still running")
+            return
+        del self._background_compilations[node_name]
+        try:
+            number_of_schedules = compilation.result()
+        except RuntimeError as error:
+            logger.info(f"Background compilation of {node_name} failed: {error}")
+        else:
+            logger.info(
+                f"Compiled {number_of_schedules} schedule(s) of {node_name} in the background"
+            )
 
-            logger.info(f"Calibrating node {node.name}")
+    def shutdown_background_compilation(self) -> None:
+        """
+        Waits for the worker processes of the speculative compilation.
+        """
+        for compilation in self._background_compilations.values():
+            compilation.join()
+        self._background_compilations.clear()
 
-            # Perform calibration
-            node.calibrate(self.config.cluster_mode)
+    def close_devices(self) -> None:
+        """
+        Closes the transmons and couplers kept alive by the device registry.
+        """
+        self.device_registry.close()
 
-        revert_node_parameters(node_name, self.config.qubits, REDIS_CONNECTION)
+    def flush_artifacts(self) -> None:
+        """
+        Waits until the datasets, QOIs, devices and figures of all nodes are saved.
+        """
+        self.artifact_writer.close()
 
     def _initialize_node(self, node_name: str) -> BaseNode:
         """Initializes a node and updates it with user-defined samplespace if available."""
@@ -333,7 +507,9 @@ class NodeManager:
             node_name,
             self.config.qubits,
             couplers=self.config.couplers,
+            device_registry=self.device_registry,
         )
+        node.artifact_writer = self.artifact_writer
 
         # Update node samplespace
         if node.name in self.config.user_samplespace:
@@ -384,6 +560,221 @@ class NodeManager:
         return
 
 
+def _precompile_node(
+    node_name: str,
+    qubits: List[str],
+    couplers: List[str],
+    user_samplespace: dict,
+    redis_overrides: Dict[str, dict],
+) -> int:
+    """
+    Compiles all schedules of a node into the compilation cache.
+    This runs in the worker process of the speculative compilation.
+
+    Args:
+        node_name: Name of the node.
+        qubits: Qubits to calibrate.
+        couplers: Couplers to calibrate.
+        user_samplespace: The user defined samplespaces.
+        redis_overrides: Values used instead of the ones in redis, keyed by the redis hash.
+
+    Returns:
+        The number of compiled schedules.
+    """
+    # Free the names in case a previous compilation in this worker failed half-way
+    for instrument_name in [node_name] + qubits + couplers:
+        if Instrument.exist(instrument_name):
+            Instrument.find_instrument(instrument_name).close()
+
+    node = NodeFactory().create_node(node_name, qubits, couplers=couplers)
+    try:
+        # The device of the node reads redis, which may already be modified by the current node
+        close_device_resources(node.device)
+        node.device = configure_device(
+            node.name, node.all_qubits, node.couplers, redis_overrides=redis_overrides
+        )
+        if node.name in user_samplespace:
+            NodeManager.update_to_user_samplespace(node, user_samplespace)
+
+        samplespaces = node.measurement_type(node).schedule_samplespaces()
+        for samplespace in samplespaces:
+            node.precompile(samplespace)
+    finally:
+        close_device_resources(node.device)
+    return len(samplespaces)
+
+
+def _precompile_node_in_process(connection: Connection, *args) -> None:
+    try:
+        connection.send((_precompile_node(*args), None))
+    except Exception as error:
+        connection.send((None, f"{type(error).__name__}: {error}"))
+    finally:
+        connection.close()
+
+
+class _BackgroundCompilation:
+    """
+    Compiles the schedules of a node with `_precompile_node` in a forked process, so it shares
+    the configuration and the redis connection settings.
+    Unlike a process pool, it leaves no thread running in the calibration process, so the
+    workers of the analysis, of the figures and of the outer points can still be forked.
+    """
+
+    def __init__(self, *args):
+        context = multiprocessing.get_context("fork")
+        self._connection, child_connection = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_precompile_node_in_process,
+            args=(child_connection, *args),
+            daemon=True,
+        )
+        with paused_artifact_writers():
+            self._process.start()
+        child_connection.close()
+        self._outcome: Optional[tuple] = None
+
+    def done(self) -> bool:
+        # the connection is also readable once the process exited without a result
+        return self._outcome is not None or self._connection.poll()
+
+    def result(self, timeout: Optional[float] = None) -> int:
+        """
+        Args:
+            timeout: Seconds to wait for the compilation, None waits until it is finished.
+
+        Returns:
+            The number of compiled schedules.
+
+        Raises:
+            TimeoutError: If the compilation is not finished within the timeout.
+            RuntimeError: If the compilation failed.
+        """
+        if self._outcome is None:
+            if not self._connection.poll(timeout):
+                raise TimeoutError("The background compilation is still running")
+            try:
+                self._outcome = self._connection.recv()
+            except EOFError:
+                self._process.join()
+                self._outcome = (
+                    None,
+                    f"the worker exited with code {self._process.exitcode}",
+                )
+            self._connection.close()
+            self._process.join()
+        number_of_schedules, error = self._outcome
+        if error is not None:
+            raise RuntimeError(error)
+        return number_of_schedules
+
+    def join(self) -> None:
+        """
+        Wait until the worker process exited.
+        """
+        self._process.join()
+
+
+class ParallelNodeExecutor:
+    """
+    Executes the calibration nodes as soon as all their dependencies are calibrated.
+
+    Each node runs in two phases:
+    - The measurement phase initializes the node, measures it, frees the device resources and
+      reverts the node specific parameters. It holds the hardware, so only one node measures at once.
+    - The analysis phase analyses the dataset, saves the figures and writes the quantities of interest
+      to redis. Analyses run one after the other, because pyplot is not thread-safe, but they overlap
+      with the measurement phase of the other ready nodes.
+    """
+
+    def __init__(self, node_manager: "NodeManager"):
+        self.node_manager = node_manager
+        # All nodes share the cluster, the instrument coordinator and the instrument names
+        # of the device elements, so exactly one node holds the hardware at a time
+        self._hardware_lock = threading.Lock()
+        # Populating and reverting the node parameters must not interleave between nodes
+        self._redis_lock = threading.Lock()
+        self._analysis_lock = threading.Lock()
+
+    def run(
+        self,
+        calibration_nodes: List[str],
+        dependencies: Dict[str, Set[str]],
+        ignore_spec_nodes: Iterable[str] = (),
+    ) -> None:
+        """
+        Calibrates the nodes respecting their dependencies.
+
+        Args:
+            calibration_nodes: Nodes to calibrate in topological order.
+            dependencies: For each node, the nodes that have to be calibrated before.
+            ignore_spec_nodes: Nodes to recalibrate even if they are in spec.
+
+        Raises:
+            RuntimeError: If the dependencies cannot be resolved.
+        """
+        ignore_spec_nodes = set(ignore_spec_nodes)
+        pending = list(calibration_nodes)
+        completed = set()
+        running = {}
+        first_error = None
+
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1)) as pool:
+            while pending or running:
+                if first_error is None:
+                    # The pending list is in topological order, so ties keep the serial order
+                    ready = [n for n in pending if dependencies[n].issubset(completed)]
+                    for node_name in ready:
+                        pending.remove(node_name)
+                        future = pool.submit(
+                            self._run_node, node_name, node_name in ignore_spec_nodes
+                        )
+                        running[future] = node_name
+                else:
+                    pending.clear()
+
+                if len(running) == 0:
+                    if len(pending) > 0:
+                        raise RuntimeError(
+                            f"Cannot resolve the dependencies for nodes: {pending}"
+                        )
+                    break
+
+                finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node_name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"{node_name} node failed: {error}")
+                        first_error = first_error or error
+                    else:
+                        completed.add(node_name)
+                        logger.info(f"{node_name} node is completed")
+
+        if first_error is not None:
+            raise first_error
+
+    def _run_node(self, node_name: str, ignore_spec: bool) -> None:
+        cluster_mode = self.node_manager.config.cluster_mode
+        qubits = self.node_manager.config.qubits
+
+        with self._hardware_lock:
+            with self._redis_lock:
+                node = self.node_manager.prepare_node(
+                    node_name, ignore_spec=ignore_spec
+                )
+            try:
+                if node is None:
+                    return
+                result_dataset = node.run_measurement(cluster_mode)
+            finally:
+                with self._redis_lock:
+                    revert_node_parameters(node_name, qubits, REDIS_CONNECTION)
+
+        with self._analysis_lock:
+            node.run_analysis(result_dataset)
+
+
 class CalibrationSupervisor:
     def __init__(self, config: CalibrationConfig) -> None:
         self.config = config
@@ -426,13 +817,48 @@ class CalibrationSupervisor:
             os.path.join(ENV.config_dir, "configuration.meta.toml")
         ).copy(str(CONFIG.run.log_dir))
 
-        for calibration_node in calibration_nodes:
-            if calibration_node == "three_state_discrimination":
-                ignore_spec = True
-            else:
-                ignore_spec = False
-            self.node_manager.inspect_node(calibration_node, ignore_spec=ignore_spec)
-            logger.info(f"{calibration_node} node is completed")
+        if self.config.parallel_execution and node_name is None:
+            dependencies = get_dependency_map(CALIBRATION_GRAPH, calibration_nodes)
+            if is_cz_calibration and "three_state_discrimination" in dependencies:
+                # The discrimination is not a dependency in the graph, but the cz chain needs it
+                for calibration_node in cz_chain:
+                    if calibration_node in dependencies:
+                        dependencies[calibration_node].add("three_state_discrimination")
+            executor = ParallelNodeExecutor(self.node_manager)
+            try:
+                executor.run(
+                    calibration_nodes,
+                    dependencies,
+                    ignore_spec_nodes=["three_state_discrimination"],
+                )
+            finally:
+                self.node_manager.close_devices()
+                self.node_manager.flush_artifacts()
+            return
+
+        try:
+            for index, calibration_node in enumerate(calibration_nodes):
+                if calibration_node == "three_state_discrimination":
+                    ignore_spec = True
+                else:
+                    ignore_spec = False
+
+                # Compile the next node while this one is measuring
+                if index + 1 < len(calibration_nodes):
+                    next_node = calibration_nodes[index + 1]
+                    self.node_manager.precompile_in_background(
+                        next_node,
+                        ignore_spec=next_node == "three_state_discrimination",
+                    )
+
+                self.node_manager.inspect_node(
+                    calibration_node, ignore_spec=ignore_spec
+                )
+                logger.info(f"{calibration_node} node is completed")
+        finally:
+            self.node_manager.shutdown_background_compilation()
+            self.node_manager.close_devices()
+            self.node_manager.flush_artifacts()
 
     def rerun_analysis(self):
         """
@@ -450,6 +876,10 @@ class CalibrationSupervisor:
         logger.status(
             f"Analysing '{self.config.target_node_name}' with {node.analysis_obj.__name__}"
         )
-        result_dataset = open_dataset(target_node, rerun_path)
-        node.post_process(result_dataset)
+        result_dataset = open_dataset(target_node, rerun_path, lazy=True)
+        try:
+            node.post_process(result_dataset)
+        finally:
+            result_dataset.close()
+            self.node_manager.flush_artifacts()
         logger.status("Analysis completed.")
@@ -10,16 +10,31 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
 from qblox_instruments import Cluster
 from quantify_scheduler.instrument_coordinator import InstrumentCoordinator
 
+from tergite_autocalibration.config.globals import REDIS_CONNECTION
+from tergite_autocalibration.lib.base import node as base_node
+from tergite_autocalibration.lib.utils.compilation_cache import CompiledScheduleCache
+from tergite_autocalibration.lib.utils.device import close_device_resources
+from tergite_autocalibration.scripts import calibration_supervisor
 from tergite_autocalibration.scripts.calibration_supervisor import (
     CalibrationConfig,
     CalibrationSupervisor,
     HardwareManager,
     NodeManager,
+    ParallelNodeExecutor,
 )
+from tergite_autocalibration.tests.utils.decorators import with_redis
+from tergite_autocalibration.tests.utils.fixtures import get_fixture_path
 from tergite_autocalibration.utils.dto.enums import DataStatus, MeasurementMode
+from tergite_autocalibration.utils.dto.extended_transmon_element import ExtendedTransmon
+from tergite_autocalibration.utils.io.artifact_writer import can_fork
 
 
 def test_instantiate_calibration_config():
@@ -111,3 +126,197 @@ def test_output_attenuation_is_set_to_value_in_device_config(caplog):
     assert hw_manager.cluster.module2.out1_att() == 8  # q01:mw
     assert hw_manager.cluster.module3.out0_att() == 12  # q00_q01:fl
     assert hw_manager.cluster.module16.out0_att() == 18  # q00:res, q01:res
+
+
+class _RecordingNode:
+    def __init__(self, name: str, events: list, lock: threading.Lock):
+        self.name = name
+        self._events = events
+        self._lock = lock
+
+    def _record(self, event: str):
+        with self._lock:
+            self._events.append((event, self.name))
+
+    def run_measurement(self, measurement_mode):
+        self._record("measure_start")
+        time.sleep(0.02)
+        self._record("measure_end")
+        return self.name
+
+    def run_analysis(self, result_dataset):
+        self._record("analysis_start")
+        time.sleep(0.05)
+        self._record("analysis_end")
+
+
+def _recording_node_manager(events: list, failing_node: str = None):
+    lock = threading.Lock()
+
+    def prepare_node(node_name, *, ignore_spec=False):
+        if node_name == failing_node:
+            raise RuntimeError(f"{node_name} failed")
+        return _RecordingNode(node_name, events, lock)
+
+    config = SimpleNamespace(cluster_mode=MeasurementMode.dummy, qubits=["q00"])
+    return SimpleNamespace(config=config, prepare_node=prepare_node)
+
+
+def test_parallel_executor_respects_dependencies(monkeypatch):
+    monkeypatch.setattr(
+        calibration_supervisor, "revert_node_parameters", lambda *args: None
+    )
+    events = []
+    executor = ParallelNodeExecutor(_recording_node_manager(events))
+    dependencies = {"A": set(), "B": {"A"}, "C": {"A"}, "D": {"B", "C"}}
+
+    executor.run(["A", "B", "C", "D"], dependencies)
+
+    position = {event: index for index, event in enumerate(events)}
+    for node, node_dependencies in dependencies.items():
+        for dependency in node_dependencies:
+            assert (
+                position[("analysis_end", dependency)]
+                < position[("measure_start", node)]
+            )
+
+    # The analysis of B overlaps with the measurement of the independent branch C
+    assert position[("measure_start", "C")] < position[("analysis_end", "B")] or (
+        position[("measure_start", "B")] < position[("analysis_end", "C")]
+    )
+
+
+def test_parallel_executor_raises_node_errors(monkeypatch):
+    monkeypatch.setattr(
+        calibration_supervisor, "revert_node_parameters", lambda *args: None
+    )
+    events = []
+    executor = ParallelNodeExecutor(_recording_node_manager(events, failing_node="B"))
+    dependencies = {"A": set(), "B": {"A"}, "C": {"B"}}
+
+    with pytest.raises(RuntimeError, match="B failed"):
+        executor.run(["A", "B", "C"], dependencies)
+
+    # Nodes depending on a failed node are never started
+    assert ("measure_start", "C") not in events
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_node_parameters_are_reverted_before_the_analysis(monkeypatch, parallel):
+    events = []
+    monkeypatch.setattr(
+        calibration_supervisor,
+        "revert_node_parameters",
+        lambda node_name, *args: events.append(("revert", node_name)),
+    )
+    node_manager = _recording_node_manager(events)
+
+    if parallel:
+        ParallelNodeExecutor(node_manager).run(["A"], {"A": set()})
+    else:
+        NodeManager.inspect_node(node_manager, "A")
+
+    assert events == [
+        ("measure_start", "A"),
+        ("measure_end", "A"),
+        ("revert", "A"),
+        ("analysis_start", "A"),
+        ("analysis_end", "A"),
+    ]
+
+
+@with_redis(get_fixture_path("redis", "standard_redis_mock.json"))
+def test_speculative_compilation_fills_the_cache(tmp_path, monkeypatch):
+    cache = CompiledScheduleCache(tmp_path)
+    monkeypatch.setattr(base_node, "get_compilation_cache", lambda: cache)
+    monkeypatch.setattr(calibration_supervisor, "get_compilation_cache", lambda: cache)
+    ExtendedTransmon.close_all()
+
+    cfg = CalibrationConfig(
+        cluster_mode=MeasurementMode.dummy,
+        cluster_ip=None,
+        speculative_compilation=True,
+    )
+    node_manager = NodeManager(None, config=cfg)
+    try:
+        node_manager.precompile_in_background("qubit_01_spectroscopy", ignore_spec=True)
+        compilation = node_manager._background_compilations["qubit_01_spectroscopy"]
+        assert compilation.result(timeout=600) == 1
+        # the compilation leaves no thread behind that prevents forking the analysis workers
+        assert can_fork()
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+        # The node specific parameters are only written to redis when the node runs
+        node = node_manager.prepare_node("qubit_01_spectroscopy", ignore_spec=True)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("The schedule should not be compiled again")
+
+        get_compiler = base_node.get_compiler
+        monkeypatch.setattr(base_node, "get_compiler", _fail)
+        node.precompile(node.schedule_samplespace)
+        close_device_resources(node.device)
+
+        # A parameter updated by the previous node invalidates the compiled schedule,
+        # every background compilation is forked and inherits the patched compiler
+        monkeypatch.setattr(base_node, "get_compiler", get_compiler)
+        node_manager.precompile_in_background("rabi_oscillations", ignore_spec=True)
+        node_manager._background_compilations["rabi_oscillations"].result(timeout=600)
+        monkeypatch.setattr(base_node, "get_compiler", _fail)
+        REDIS_CONNECTION.hset("transmons:q00", "clock_freqs:f01", 4.5e9)
+        node = node_manager.prepare_node("rabi_oscillations", ignore_spec=True)
+        with pytest.raises(AssertionError):
+            node.precompile(node.schedule_samplespace)
+        close_device_resources(node.device)
+    finally:
+        node_manager.shutdown_background_compilation()
+
+
+@with_redis(get_fixture_path("redis", "standard_redis_mock.json"))
+def test_speculative_compilation_reads_redis_in_one_round_trip(tmp_path, monkeypatch):
+    cache = CompiledScheduleCache(tmp_path)
+    monkeypatch.setattr(calibration_supervisor, "get_compilation_cache", lambda: cache)
+    compilations = []
+    monkeypatch.setattr(
+        calibration_supervisor,
+        "_BackgroundCompilation",
+        lambda *args: compilations.append(args),
+    )
+
+    cfg = CalibrationConfig(
+        cluster_mode=MeasurementMode.dummy,
+        cluster_ip=None,
+        speculative_compilation=True,
+    )
+    node_manager = NodeManager(None, config=cfg)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("The hashes should be read in one pipeline")
+
+    monkeypatch.setattr(REDIS_CONNECTION, "hgetall", _fail)
+    node_manager.precompile_in_background("qubit_01_spectroscopy", ignore_spec=True)
+
+    ((node_name, qubits, couplers, _, redis_snapshot),) = compilations
+    assert node_name == "qubit_01_spectroscopy"
+    assert set(redis_snapshot) >= {f"transmons:{qubit}" for qubit in qubits}
+    assert redis_snapshot[f"transmons:{qubits[0]}"]
+
+
+@with_redis(get_fixture_path("redis", "standard_redis_mock.json"))
+def test_nodes_share_the_device_elements():
+    ExtendedTransmon.close_all()
+    cfg = CalibrationConfig(cluster_mode=MeasurementMode.dummy, cluster_ip=None)
+    node_manager = NodeManager(None, config=cfg)
+    try:
+        node = node_manager.prepare_node("rabi_oscillations", ignore_spec=True)
+        q00 = node.device.get_element("q00")
+        node.release_device()
+
+        node = node_manager.prepare_node("ramsey_correction", ignore_spec=True)
+        assert node.device.name == "ramsey_correction"
+        assert node.device.get_element("q00") is q00
+        node.release_device()
+    finally:
+        node_manager.close_devices()
+
+    assert len(ExtendedTransmon.instances()) == 0
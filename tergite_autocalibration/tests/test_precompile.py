@@ -53,3 +53,36 @@ def test_precompile_all_nodes_without_error(node_name):
 
     else:
         node.precompile(node.schedule_samplespace)
+
+
+@with_redis(_redis_values)
+def test_precompile_uses_compilation_cache(tmp_path, monkeypatch):
+    from tergite_autocalibration.lib.base import node as base_node
+    from tergite_autocalibration.lib.utils.compilation_cache import (
+        CompiledScheduleCache,
+    )
+
+    cache = CompiledScheduleCache(tmp_path)
+    monkeypatch.setattr(base_node, "get_compilation_cache", lambda: cache)
+
+    ExtendedTransmon.close_all()
+    node = _node_factory.create_node("rabi_oscillations", ["q00", "q01"], ["q00_q01"])
+    compiled_schedule = node.precompile(node.schedule_samplespace)
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+    # A cache hit does not need a compiler
+    def _fail(*args, **kwargs):
+        raise AssertionError("The schedule should not be compiled again")
+
+    monkeypatch.setattr(base_node, "get_compiler", _fail)
+    cached_schedule = node.precompile(node.schedule_samplespace)
+    assert cached_schedule.name == compiled_schedule.name
+    assert (
+        cached_schedule.get_schedule_duration()
+        == compiled_schedule.get_schedule_duration()
+    )
+
+    # Changing a parameter of the device invalidates the entry
+    node.device.get_element("q00").rxy.amp180(0.1234)
+    with pytest.raises(AssertionError):
+        node.precompile(node.schedule_samplespace)
@@ -0,0 +1,118 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import threading
+
+import pytest
+
+from tergite_autocalibration.utils.io import artifact_writer
+from tergite_autocalibration.utils.io.artifact_writer import (
+    ArtifactWriter,
+    can_fork,
+    paused_artifact_writers,
+)
+
+
+def test_artifacts_are_written_in_the_background():
+    writer = ArtifactWriter(queue_size=2)
+    release = threading.Event()
+    written = []
+
+    def _write(name):
+        release.wait(timeout=10)
+        written.append((name, threading.current_thread().name))
+
+    writer.submit(_write, "dataset")
+    writer.submit(_write, "qoi")
+    assert written == []
+
+    release.set()
+    writer.close()
+    assert written == [("dataset", "artifact-writer"), ("qoi", "artifact-writer")]
+
+
+def test_artifacts_are_written_immediately_without_queue():
+    writer = ArtifactWriter(queue_size=0)
+    written = []
+
+    writer.submit(written.append, "dataset")
+
+    assert written == ["dataset"]
+    writer.close()
+
+
+def test_flush_raises_write_errors():
+    writer = ArtifactWriter(queue_size=1)
+    written = []
+
+    def _fail(name):
+        raise OSError(f"cannot write {name}")
+
+    writer.submit(_fail, "dataset")
+    writer.submit(written.append, "qoi")
+
+    with pytest.raises(OSError, match="cannot write dataset"):
+        writer.flush()
+    # the artifacts after a failure are still written
+    assert written == ["qoi"]
+    writer.close()
+
+
+def test_close_does_not_replace_a_propagating_exception(monkeypatch):
+    errors = []
+    monkeypatch.setattr(artifact_writer.logger, "error", errors.append)
+    writer = ArtifactWriter(queue_size=1)
+
+    def _fail(name):
+        raise OSError(f"cannot write {name}")
+
+    with pytest.raises(RuntimeError, match="measurement failed"):
+        try:
+            writer.submit(_fail, "dataset")
+            raise RuntimeError("measurement failed")
+        finally:
+            writer.close()
+    assert any("cannot write dataset" in error for error in errors)
+
+
+def test_paused_artifact_writer_keeps_its_queue():
+    writer = ArtifactWriter(queue_size=2)
+    writing = threading.Event()
+    written = []
+
+    def _write(name):
+        writing.set()
+        threading.Event().wait(timeout=0.2)
+        written.append(name)
+
+    writer.submit(_write, "dataset")
+    writer.submit(_write, "figure")
+    writing.wait(timeout=10)
+    # the writer thread does not prevent forking, and the queue is not drained
+    assert can_fork()
+    with paused_artifact_writers():
+        # the artifact that was being written is finished
+        assert written == ["dataset"]
+    writer.close()
+    assert written == ["dataset", "figure"]
+
+
+def test_can_fork_not_while_other_threads_run():
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait, kwargs={"timeout": 10})
+    thread.start()
+    try:
+        assert not can_fork()
+    finally:
+        release.set()
+        thread.join()
+    assert can_fork()
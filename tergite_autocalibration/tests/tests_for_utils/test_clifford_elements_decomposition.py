@@ -0,0 +1,59 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+
+from tergite_autocalibration.utils.clifford_elements_decomposition import (
+    XY_decompositions,
+    clifford_inverse_table,
+    clifford_product_table,
+    from_physical_decomp_to_PTM,
+    is_sequence_identity,
+    recovery_clifford_indices,
+    reversing_XY_matrix,
+)
+
+
+def test_product_table_matches_PTMs():
+    ptms = [from_physical_decomp_to_PTM(decomp) for decomp in XY_decompositions]
+    for second in range(24):
+        for first in range(24):
+            product = ptms[second] @ ptms[first]
+            assert np.array_equal(ptms[clifford_product_table[second, first]], product)
+
+
+def test_inverse_table():
+    for index in range(24):
+        inverse = clifford_inverse_table[index]
+        assert clifford_product_table[inverse, index] == 0
+        assert clifford_product_table[index, inverse] == 0
+
+
+def test_reversing_XY_matrix_returns_identity():
+    rng = np.random.default_rng(7)
+    for length in [0, 1, 2, 17, 100]:
+        sequence = rng.integers(24, size=length)
+        reversing_index, reversing_decomposition = reversing_XY_matrix(sequence)
+        assert reversing_decomposition is XY_decompositions[reversing_index]
+        assert is_sequence_identity(np.append(sequence, reversing_index))
+
+
+def test_recovery_clifford_indices_of_sequences_with_different_lengths():
+    rng = np.random.default_rng(3)
+    sequences = [rng.integers(24, size=length) for length in [0, 3, 50, 1, 12]]
+
+    recovery_indices = recovery_clifford_indices(sequences)
+
+    assert recovery_indices.shape == (5,)
+    for sequence, recovery_index in zip(sequences, recovery_indices):
+        assert recovery_index == reversing_XY_matrix(sequence)[0]
+        assert is_sequence_identity(np.append(sequence, recovery_index))
@@ -15,10 +15,14 @@ import os.path
 import shutil
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 
+import matplotlib.pyplot as plt
+import numpy as np
 import pandas
 import pytest
 import xarray as xr
+from PIL import Image
 
 import tergite_autocalibration.utils.reanalysis_utils as ra_utils
 from tergite_autocalibration.config.globals import CONFIG
@@ -32,9 +36,17 @@ from tergite_autocalibration.tests.utils.decorators import with_redis
 from tergite_autocalibration.tests.utils.fixtures import get_fixture_path
 from tergite_autocalibration.utils.dto.extended_transmon_element import ExtendedTransmon
 from tergite_autocalibration.utils.dto.qoi import QOI
+from tergite_autocalibration.utils.io import dataset as dataset_io
+from tergite_autocalibration.utils.io.artifact_writer import ArtifactWriter
 from tergite_autocalibration.utils.io.dataset import (
+    archive_measurement,
+    archive_qoi,
+    archived_measurements,
+    open_archived_dataset,
     open_dataset,
+    run_archive_path,
     save_dataset,
+    save_figures,
     save_qoi,
     scrape_and_copy_hdf5_files,
 )
@@ -234,6 +246,178 @@ def test_save_dataset(tmp_path):
     assert os.path.exists(os.path.join(tmp_path, "dataset_resonator_spectroscopy.hdf5"))
 
 
+def _figures(number_of_figures: int) -> list:
+    figures = []
+    for index in range(number_of_figures):
+        fig, axes = plt.subplots(2, 2, figsize=(4, 3))
+        for ax in axes.flat:
+            ax.plot(np.arange(10) * index, "o-")
+            ax.set_title(f"q{index:02d}")
+        figures.append(fig)
+    return figures
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_save_figures(tmp_path, monkeypatch, workers):
+    monkeypatch.setitem(CONFIG.run._dict, "figure_workers", workers)
+    figures = _figures(3)
+
+    save_figures(figures, "cz_chevron", tmp_path)
+
+    for index in range(3):
+        with Image.open(tmp_path / f"cz_chevron_{index}_preview.png") as preview:
+            preview_size = preview.size
+        with Image.open(tmp_path / f"cz_chevron_{index}.png") as full:
+            full_size = full.size
+        assert full_size[0] == pytest.approx(4 * preview_size[0], abs=4)
+        assert full_size[1] == pytest.approx(4 * preview_size[1], abs=4)
+    for fig in figures:
+        plt.close(fig)
+
+
+def test_save_figures_without_full_resolution(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "full_resolution_figures", False)
+    figures = _figures(1)
+
+    save_figures(figures, "rabi_oscillations", tmp_path)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "rabi_oscillations_preview.png"
+    ]
+    plt.close(figures[0])
+
+
+def test_save_figures_in_workers_with_artifact_writer(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "figure_workers", 2)
+    saved_in = tmp_path / "saved_in"
+    saved_in.mkdir()
+    save_figure = dataset_io._save_figure
+
+    def _save_figure_and_process(fig, preview_path, full_path):
+        save_figure(fig, preview_path, full_path)
+        (saved_in / f"{preview_path.stem}-{os.getpid()}").touch()
+
+    monkeypatch.setattr(dataset_io, "_save_figure", _save_figure_and_process)
+    figures = _figures(3)
+    analysis = SimpleNamespace(analyze_node=lambda dataset: {}, figures=figures)
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    node = ResonatorSpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    node.release_device()
+    monkeypatch.setattr(node, "get_node_analysis", lambda: analysis)
+    node.update_data_path(tmp_path)
+    node.artifact_writer = ArtifactWriter(queue_size=2)
+
+    node.post_process(xr.Dataset())
+    node.artifact_writer.close()
+
+    # the figures are saved by forked workers, not by the artifact writer thread
+    processes = {int(path.name.split("-")[-1]) for path in saved_in.iterdir()}
+    assert len(list(saved_in.iterdir())) == 3
+    assert os.getpid() not in processes
+    for fig in figures:
+        plt.close(fig)
+
+
+@pytest.mark.parametrize("storage", ["netcdf", "compressed"])
+def test_save_and_open_dataset(tmp_path, monkeypatch, storage):
+    monkeypatch.setitem(CONFIG.run._dict, "dataset_storage", storage)
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    node = ResonatorSpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    result_dataset = node.configure_dataset(node.generate_dummy_dataset())
+    node.release_device()
+    data_path = tmp_path / "20250728-165136-525-9c2f16-resonator_spectroscopy"
+    data_path.mkdir()
+
+    save_dataset(result_dataset, "resonator_spectroscopy", data_path)
+    loaded_dataset = open_dataset("resonator_spectroscopy", data_path)
+
+    assert loaded_dataset.attrs["name"] == "resonator_spectroscopy"
+    assert loaded_dataset.attrs["tuid"] == "20250728-165136-525"
+    for var in result_dataset.data_vars:
+        xr.testing.assert_identical(loaded_dataset[var], result_dataset[var])
+
+
+@pytest.mark.parametrize("storage", ["netcdf", "compressed"])
+def test_open_dataset_lazy(tmp_path, monkeypatch, storage):
+    monkeypatch.setitem(CONFIG.run._dict, "dataset_storage", storage)
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    node = ResonatorSpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    result_dataset = node.configure_dataset(node.generate_dummy_dataset())
+    node.release_device()
+    save_dataset(result_dataset, "resonator_spectroscopy", tmp_path)
+
+    lazy_dataset = open_dataset("resonator_spectroscopy", tmp_path, lazy=True)
+
+    for var in result_dataset.data_vars:
+        assert lazy_dataset[var].chunks is not None
+        # read like the analysis, the dask thread pool would prevent forking in later tests
+        xr.testing.assert_identical(
+            lazy_dataset[var].load(scheduler="synchronous"), result_dataset[var]
+        )
+    assert lazy_dataset.attrs["name"] == "resonator_spectroscopy"
+
+    # closing the lazy dataset releases the file, so it can be written again
+    lazy_dataset.close()
+    save_dataset(result_dataset, "resonator_spectroscopy", tmp_path)
+
+
+@pytest.mark.parametrize("storage", ["netcdf", "compressed"])
+def test_run_archive(tmp_path, monkeypatch, storage):
+    monkeypatch.setitem(CONFIG.run._dict, "dataset_storage", storage)
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    node = ResonatorSpectroscopyNode(CONFIG.run.qubits, CONFIG.run.couplers)
+    result_dataset = node.configure_dataset(node.generate_dummy_dataset())
+    node.release_device()
+    measurements = [
+        "20250728-165136-525-9c2f16-resonator_spectroscopy",
+        "20250728-165458-851-fa4816-resonator_spectroscopy_1",
+    ]
+    qoi = QOI(
+        analysis_result={"clock_freqs:readout": {"value": 7180795854, "error": 0}},
+        analysis_successful=True,
+    )
+
+    for measurement in measurements:
+        data_path = tmp_path / measurement
+        archive_measurement(
+            result_dataset, "resonator_spectroscopy", data_path, {"q00": {}}
+        )
+        archive_qoi({"q00": qoi}, data_path)
+
+    archive_path = run_archive_path(tmp_path / measurements[0])
+    assert archive_path == tmp_path / "run_archive.hdf5"
+    assert archived_measurements(archive_path) == measurements
+    archived_dataset = open_archived_dataset(archive_path, measurements[1])
+    assert archived_dataset.attrs["tuid"] == "20250728-165458-851"
+    assert json.loads(archived_dataset.attrs["device"]) == {"q00": {}}
+    qois = json.loads(archived_dataset.attrs["qoi"])
+    assert qois["q00"]["analysis_result"]["clock_freqs:readout"]["value"] == 7180795854
+    for var in result_dataset.data_vars:
+        xr.testing.assert_identical(archived_dataset[var], result_dataset[var])
+
+
+def test_compressed_dataset_storage_is_chunked(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "dataset_storage", "compressed")
+    dataset = xr.Dataset(
+        {"yq00": (("shot", "state"), np.ones((200000, 3), dtype=complex))},
+        coords={"shot": np.arange(200000), "state": [0, 1, 2]},
+    )
+
+    save_dataset(dataset, "ro_amplitude_three_state_optimization", tmp_path)
+
+    save_path = tmp_path / "dataset_ro_amplitude_three_state_optimization.hdf5"
+    encoding = xr.open_dataset(save_path, auto_complex=True)["yq00"].encoding
+    assert encoding["zlib"]
+    assert np.prod(encoding["chunksizes"]) * 16 <= 1 << 20
+    assert save_path.stat().st_size < dataset["yq00"].nbytes / 10
+
+
+def test_save_dataset_unknown_storage(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "dataset_storage", "parquet")
+    with pytest.raises(ValueError):
+        save_dataset(xr.Dataset(), "resonator_spectroscopy", tmp_path)
+
+
 _test_data_dir = os.path.join(
     Path(__file__).parent.parent.parent, "lib/nodes/coupler/cz_calibration/tests/data"
 )
@@ -278,3 +462,28 @@ def test_save_dataset_with_working_points(tmp_path):
     assert "working_points" in loaded_dataset
     assert "l1" in loaded_dataset
     assert "l2" in loaded_dataset
+
+
+@with_redis(_redis_values_path)
+def test_open_compressed_dataset_with_working_points(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG.run._dict, "dataset_storage", "compressed")
+    ExtendedTransmon.close_all()  # ensure no other transmon objects are instantiated
+    node = CZCalibrationNode(all_qubits=["q13", "q14"], couplers=["q13_q14"])
+    result_dataset = node.configure_dataset(node.generate_dummy_dataset())
+    node.release_device()
+    multi_index = pandas.MultiIndex.from_tuples(
+        [(7e8, 200e-9), (8e8, 250e-9)], names=["l1", "l2"]
+    )
+    result_dataset = result_dataset.expand_dims({"working_points": 2})
+    result_dataset = result_dataset.assign_coords(
+        {"working_points": ("working_points", multi_index)}
+    )
+
+    save_dataset(result_dataset, "cz_calibration", tmp_path)
+    loaded_dataset = open_dataset("cz_calibration", tmp_path)
+
+    assert loaded_dataset.coords["working_points"].values[1] == pytest.approx(
+        (8e8, 250e-9)
+    )
+    for var in result_dataset.data_vars:
+        np.testing.assert_array_equal(loaded_dataset[var], result_dataset[var])
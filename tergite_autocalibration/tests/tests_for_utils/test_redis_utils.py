@@ -23,6 +23,7 @@ from tergite_autocalibration.lib.base.node import QubitNode
 from tergite_autocalibration.lib.utils.node_factory import NodeFactory
 from tergite_autocalibration.utils.backend.redis_utils import (
     populate_initial_parameters,
+    node_parameter_overrides,
     populate_node_parameters,
     revert_node_parameters,
     populate_quantities_of_interest,
@@ -81,6 +82,26 @@ def test_populate_node_parameters():
     assert reset_duration_config == reset_duration_redis
 
 
+def test_node_parameter_overrides():
+
+    REDIS_CONNECTION.flushall()
+    assert not REDIS_CONNECTION.keys()
+
+    device = CONFIG.device
+    qubits = device.qubits.keys()
+    couplers = device.couplers.keys()
+    overrides = node_parameter_overrides("resonator_spectroscopy", qubits, couplers)
+
+    transmon_configuration = toml.load(CONFIG.node)
+    node_config = transmon_configuration["resonator_spectroscopy"]["all"]
+    reset_duration_config = node_config["reset"]["duration"]
+    assert overrides["transmons:q00"]["reset:duration"] == reset_duration_config
+
+    # the overrides are not written to redis
+    assert not REDIS_CONNECTION.keys()
+    assert node_parameter_overrides("not_a_node", qubits, couplers) == {}
+
+
 def test_revert_node_parameters():
 
     REDIS_CONNECTION.flushall()
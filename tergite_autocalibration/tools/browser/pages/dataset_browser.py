@@ -27,6 +27,7 @@ from tergite_autocalibration.config.globals import DATA_DIR
 from tergite_autocalibration.tools.browser import styles
 from tergite_autocalibration.tools.browser.layout import generate_selection_layout
 from tergite_autocalibration.tools.browser.utils import scan_folders
+from tergite_autocalibration.utils.io.dataset import to_real_dataset
 
 folder_structure = scan_folders(DATA_DIR)
 
@@ -501,6 +502,21 @@ def update_qoi_display(outer: str, inter: str, inner: str):
     return "No JSON file found."
 
 
+def _open_lazy_dataset(hdf5_path: str) -> xr.Dataset:
+    """
+    Open a measurement dataset without reading its values, they are read from the
+    file when a plot of the variable is created.
+    """
+    ds = xr.open_dataset(hdf5_path, auto_complex=True, chunks={})
+    if any(var.dtype.kind == "c" for var in ds.data_vars.values()):
+        # the compressed dataset storage keeps the complex numbers,
+        # the conversion to the ReIm layout is lazy as well
+        real_ds = to_real_dataset(ds)
+        real_ds.set_close(ds.close)
+        return real_ds
+    return ds
+
+
 @callback(
     [
         Output({"type": "full-dataset", "index": MATCH}, "data"),
@@ -523,8 +539,8 @@ def display_element_selector(
         if hdf5_files:
             hdf5_path = os.path.join(inner_path, hdf5_files[0])
             try:
-                ds = xr.open_dataset(hdf5_path)
-                elements_attr = ds.attrs.get("elements", [])
+                with _open_lazy_dataset(hdf5_path) as ds:
+                    elements_attr = ds.attrs.get("elements", [])
                 if isinstance(elements_attr, str):
                     elements_attr = [elements_attr]
                 element_options = (
@@ -532,13 +548,11 @@ def display_element_selector(
                     if isinstance(elements_attr, list)
                     else []
                 )
-                ds_dict = ds.to_dict()
-                ds_json = json.dumps(ds_dict)
-
-                return [ds_json, element_options]
+                # the plots read the variables of the selected elements from the file
+                return [hdf5_path, element_options]
 
             except Exception as e:
-                return [json.dumps({"error": str(e)}), []]
+                return [{"error": str(e)}, []]
         return [{}, []]
     return [{}, []]
 
@@ -549,13 +563,14 @@ def display_element_selector(
     Input({"type": "element-selector", "index": MATCH}, "value"),
     State({"type": "full-dataset", "index": MATCH}, "data"),
 )
-def filter_dataset_by_element(selected_elements: list, dataset_json: str):
-    if not selected_elements or not dataset_json:
+def filter_dataset_by_element(selected_elements: list, dataset_path: str | dict):
+    if not selected_elements or not dataset_path:
         return ["", []]
+    if isinstance(dataset_path, dict):
+        return [[f"Error loading dataset: {dataset_path.get('error')}"], []]
     try:
         if isinstance(selected_elements, str):
             selected_elements = [selected_elements]
-        ds = xr.Dataset.from_dict(json.loads(dataset_json))
         displays = []
         y_dim_options = set()
         styles = dict(
@@ -565,44 +580,47 @@ def filter_dataset_by_element(selected_elements: list, dataset_json: str):
             linecolor="black",
             gridcolor="lightgrey",
         )
-        for el in selected_elements:
-            filtered_ds = ds.filter_by_attrs(element=el)
-            if "ReIm" in filtered_ds.dims:
-                attrs = filtered_ds.attrs
-                filtered_ds = filtered_ds.isel(ReIm=0) + 1j * filtered_ds.isel(ReIm=1)
-                filtered_ds.attrs = attrs
-
-            for var in filtered_ds.data_vars:
-                da = filtered_ds[var]
-                if da.ndim == 1:
-                    fig = px.line(
-                        x=da.coords[da.dims[0]], y=abs(da), title=var, markers=True
+        with _open_lazy_dataset(dataset_path) as ds:
+            for el in selected_elements:
+                filtered_ds = ds.filter_by_attrs(element=el)
+                if "ReIm" in filtered_ds.dims:
+                    attrs = filtered_ds.attrs
+                    filtered_ds = filtered_ds.isel(ReIm=0) + 1j * filtered_ds.isel(
+                        ReIm=1
                     )
-                    fig.update_layout(plot_bgcolor="white")
-                    fig.update_xaxes(styles)
-                    fig.update_yaxes(styles)
-                    displays.append(
-                        dcc.Graph(
-                            figure=fig,
-                            style={"border": "1px solid #ccc", "padding": "10px"},
+                    filtered_ds.attrs = attrs
+
+                for var in filtered_ds.data_vars:
+                    da = filtered_ds[var].load()
+                    if da.ndim == 1:
+                        fig = px.line(
+                            x=da.coords[da.dims[0]], y=abs(da), title=var, markers=True
                         )
-                    )
-                elif da.ndim == 2:
-                    if any(["freq" in str(coord) for coord in da.coords]):
-                        data = abs(da)
-                    else:
-                        data = abs(da.T)
-                    fig = px.imshow(
-                        data, color_continuous_scale="RdBu_r", origin="lower"
-                    )
-                    displays.append(
-                        dcc.Graph(
-                            figure=fig,
-                            style={"border": "1px solid #ccc", "padding": "10px"},
+                        fig.update_layout(plot_bgcolor="white")
+                        fig.update_xaxes(styles)
+                        fig.update_yaxes(styles)
+                        displays.append(
+                            dcc.Graph(
+                                figure=fig,
+                                style={"border": "1px solid #ccc", "padding": "10px"},
+                            )
                         )
-                    )
-                    for dim in da.dims:
-                        y_dim_options.add(dim)
+                    elif da.ndim == 2:
+                        if any(["freq" in str(coord) for coord in da.coords]):
+                            data = abs(da)
+                        else:
+                            data = abs(da.T)
+                        fig = px.imshow(
+                            data, color_continuous_scale="RdBu_r", origin="lower"
+                        )
+                        displays.append(
+                            dcc.Graph(
+                                figure=fig,
+                                style={"border": "1px solid #ccc", "padding": "10px"},
+                            )
+                        )
+                        for dim in da.dims:
+                            y_dim_options.add(dim)
         return [displays, [{"label": d, "value": d} for d in y_dim_options]]
     except Exception as e:
         return [[f"Error filtering dataset: {e}"], []]
@@ -660,53 +678,61 @@ def reset_intermediate_on_outer_change(inter_value: str, n_clicks):
     State({"type": "full-dataset", "index": MATCH}, "data"),
     prevent_initial_call=True,
 )
-def plot_y_slice(y_dim_value: str, selected_elements: str, dataset_json: str):
-    if not selected_elements or not dataset_json or not y_dim_value:
+def plot_y_slice(y_dim_value: str, selected_elements: str, dataset_path: str | dict):
+    if not selected_elements or not dataset_path or not y_dim_value:
         return ""
+    if isinstance(dataset_path, dict):
+        return [f"Error loading dataset: {dataset_path.get('error')}"]
     try:
         if isinstance(selected_elements, str):
             selected_elements = [selected_elements]
-        ds = xr.Dataset.from_dict(json.loads(dataset_json))
         displays = []
-        for el in selected_elements:
-            filtered_ds = ds.filter_by_attrs(element=el)
-            if "ReIm" in filtered_ds.dims:
-                attrs = filtered_ds.attrs
-                filtered_ds = filtered_ds.isel(ReIm=0) + 1j * filtered_ds.isel(ReIm=1)
-                filtered_ds.attrs = attrs
-
-            for var in filtered_ds.data_vars:
-                da = filtered_ds[var]
-                if da.ndim == 2 and y_dim_value in da.dims:
-                    for val in da[y_dim_value].values:
-                        line = da.sel({y_dim_value: val})
-                        fig = px.line(
-                            x=line.coords[line.dims[0]],
-                            y=abs(line),
-                            title=f"{var} @ {y_dim_value}={val}",
-                            markers=True,
-                        )
-                        fig.update_layout(plot_bgcolor="white")
-                        fig.update_xaxes(
-                            mirror=True,
-                            ticks="outside",
-                            showline=True,
-                            linecolor="black",
-                            gridcolor="lightgrey",
-                        )
-                        fig.update_yaxes(
-                            mirror=True,
-                            ticks="outside",
-                            showline=True,
-                            linecolor="black",
-                            gridcolor="lightgrey",
-                        )
-                        displays.append(
-                            dcc.Graph(
-                                figure=fig,
-                                style={"border": "1px solid #ccc", "padding": "10px"},
+        with _open_lazy_dataset(dataset_path) as ds:
+            for el in selected_elements:
+                filtered_ds = ds.filter_by_attrs(element=el)
+                if "ReIm" in filtered_ds.dims:
+                    attrs = filtered_ds.attrs
+                    filtered_ds = filtered_ds.isel(ReIm=0) + 1j * filtered_ds.isel(
+                        ReIm=1
+                    )
+                    filtered_ds.attrs = attrs
+
+                for var in filtered_ds.data_vars:
+                    da = filtered_ds[var]
+                    if da.ndim == 2 and y_dim_value in da.dims:
+                        da = da.load()
+                        for val in da[y_dim_value].values:
+                            line = da.sel({y_dim_value: val})
+                            fig = px.line(
+                                x=line.coords[line.dims[0]],
+                                y=abs(line),
+                                title=f"{var} @ {y_dim_value}={val}",
+                                markers=True,
+                            )
+                            fig.update_layout(plot_bgcolor="white")
+                            fig.update_xaxes(
+                                mirror=True,
+                                ticks="outside",
+                                showline=True,
+                                linecolor="black",
+                                gridcolor="lightgrey",
+                            )
+                            fig.update_yaxes(
+                                mirror=True,
+                                ticks="outside",
+                                showline=True,
+                                linecolor="black",
+                                gridcolor="lightgrey",
+                            )
+                            displays.append(
+                                dcc.Graph(
+                                    figure=fig,
+                                    style={
+                                        "border": "1px solid #ccc",
+                                        "padding": "10px",
+                                    },
+                                )
                             )
-                        )
         return displays
     except Exception as e:
         return [f"Error plotting y slice: {e}"]
@@ -72,16 +72,46 @@ def populate_parking_currents(couplers: list, redis_connection):
                 redis_connection.hset(f"couplers:{coupler}", module_key, module_value)
 
 
-def _qubit_fields_to_redis(qubits: list[str], key: str, value: str, redis_connection):
-    for qubit in qubits:
-        redis_connection.hset(f"transmons:{qubit}", key, value)
+def node_parameter_overrides(
+    node_name: str, qubits: list, couplers: list
+) -> dict[str, dict]:
+    """
+    Collect the node specific parameter values from the node config.
+
+    Args:
+        node_name: Name of the node.
+        qubits: Qubits the node operates on.
+        couplers: Couplers the node operates on.
+
+    Returns:
+        The parameter values keyed by the redis hash they belong to,
+        e.g. {"transmons:q00": {"rxy:amp180": 0.1}}. Empty if the node has no specific config.
+    """
+    transmon_configuration = toml.load(CONFIG.node)
+    if not node_name in transmon_configuration:
+        return {}
+    node_specific_dict = transmon_configuration[node_name].get("all", {})
+
+    node_fields = {}
+    for field_key, field_value in node_specific_dict.items():
+        if isinstance(field_value, dict):
+            for sub_field_key, sub_field_value in field_value.items():
+                node_fields[field_key + ":" + sub_field_key] = sub_field_value
+        else:
+            node_fields[field_key] = field_value
 
+    overrides = {}
+    if len(node_fields) > 0:
+        for element in list(qubits) + list(couplers):
+            overrides[f"transmons:{element}"] = dict(node_fields)
 
-def _coupler_fields_to_redis(
-    couplers: list[str], key: str, value: str, redis_connection
-):
+    # node config for specific couplers:
     for coupler in couplers:
-        redis_connection.hset(f"transmons:{coupler}", key, value)
+        if coupler in transmon_configuration[node_name]:
+            coupler_specific_config = transmon_configuration[node_name][coupler]
+            overrides[f"couplers:{coupler}"] = dict(coupler_specific_config)
+
+    return overrides
 
 
 def populate_node_parameters(
@@ -99,28 +129,11 @@ def populate_node_parameters(
     if is_node_calibrated:
         logger.status(f"{node_name} is already calibrated")
         return
-    node_specific_dict = transmon_configuration[node_name].get("all", {})
-
-    for field_key, field_value in node_specific_dict.items():
-        if isinstance(field_value, dict):
-            for sub_field_key, sub_field_value in field_value.items():
-                sub_field_key = field_key + ":" + sub_field_key
-                _qubit_fields_to_redis(
-                    qubits, sub_field_key, sub_field_value, redis_connection
-                )
-                _coupler_fields_to_redis(
-                    couplers, sub_field_key, sub_field_value, redis_connection
-                )
-        else:
-            _qubit_fields_to_redis(qubits, field_key, field_value, redis_connection)
-            _coupler_fields_to_redis(couplers, field_key, field_value, redis_connection)
 
-    # node config for specific couplers:
-    for coupler in couplers:
-        if coupler in transmon_configuration[node_name]:
-            coupler_specific_config = transmon_configuration[node_name][coupler]
-            for field_key, field_value in coupler_specific_config.items():
-                redis_connection.hset(f"couplers:{coupler}", field_key, field_value)
+    overrides = node_parameter_overrides(node_name, qubits, couplers)
+    for redis_key, fields in overrides.items():
+        for field_key, field_value in fields.items():
+            redis_connection.hset(redis_key, field_key, field_value)
 
 
 def revert_node_parameters(node_name: str, qubits: list, redis_connection):
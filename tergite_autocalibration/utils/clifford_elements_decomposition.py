@@ -215,24 +215,69 @@ def is_sequence_identity(rng_sequence: np.ndarray) -> bool:
     return np.allclose(matrix, np.identity(2)) or np.allclose(matrix, -np.identity(2))
 
 
-def reversing_XY_matrix(rng_sequence) -> tuple[int, dict]:
-    product_matrix = np.identity(4, dtype=np.int64)
-    for rng in rng_sequence:
-        physical_decomp = XY_decompositions[rng]
-        ptm = from_physical_decomp_to_PTM(physical_decomp)
-        product_matrix = np.matmul(ptm, product_matrix, dtype=np.int64)
+def _clifford_index_of_PTM(ptm: np.ndarray) -> int:
+    for index, clifford_ptm in enumerate(_clifford_PTMs):
+        if np.array_equal(ptm, clifford_ptm):
+            return index
+    raise ValueError("The PTM is not a single qubit Clifford")
+
+
+_clifford_PTMs = np.array(
+    [from_physical_decomp_to_PTM(decomp) for decomp in XY_decompositions]
+)
+
+# clifford_product_table[second, first] is the index of the Clifford
+# applying first and then second, i.e. PTM(second) @ PTM(first)
+clifford_product_table = np.array(
+    [
+        [
+            _clifford_index_of_PTM(np.matmul(second_ptm, first_ptm, dtype=np.int64))
+            for first_ptm in _clifford_PTMs
+        ]
+        for second_ptm in _clifford_PTMs
+    ],
+    dtype=np.intp,
+)
+
+# clifford_inverse_table[index] is the index of the inverse Clifford,
+# the one whose product with the Clifford is the identity
+clifford_inverse_table = np.argmax(clifford_product_table == 0, axis=0).astype(np.intp)
+
 
-    for decomp in XY_decompositions:
-        ptm = from_physical_decomp_to_PTM(decomp)
-        if np.array_equal(product_matrix, ptm):
-            equivalent_ptm = ptm
-            reversing_matrix = np.linalg.inv(equivalent_ptm).astype(np.int64)
+def recovery_clifford_indices(clifford_sequences: list[np.ndarray]) -> np.ndarray:
+    """
+    Indices of the Cliffords reversing each of the given sequences.
 
-    for i, decomp in enumerate(XY_decompositions):
-        ptm = from_physical_decomp_to_PTM(decomp)
-        if np.array_equal(reversing_matrix, ptm):
-            reversing_index = i
+    The sequences are padded with the identity to the length of the longest one
+    and walked through the product table together, one Clifford position at a time.
+
+    Args:
+        clifford_sequences: Sequences of Clifford indices, of any length.
+
+    Returns:
+        Array with the index of the recovery Clifford of every sequence.
+    """
+    longest_sequence = max(
+        (len(sequence) for sequence in clifford_sequences), default=0
+    )
+    padded_sequences = np.zeros(
+        (len(clifford_sequences), longest_sequence), dtype=np.intp
+    )
+    for row, sequence in enumerate(clifford_sequences):
+        padded_sequences[row, : len(sequence)] = sequence
+
+    products = np.zeros(len(clifford_sequences), dtype=np.intp)
+    for position in range(longest_sequence):
+        products = clifford_product_table[padded_sequences[:, position], products]
+    return clifford_inverse_table[products]
+
+
+def reversing_XY_matrix(rng_sequence) -> tuple[int, dict]:
+    product_index = 0
+    for rng in rng_sequence:
+        product_index = clifford_product_table[rng, product_index]
 
+    reversing_index = int(clifford_inverse_table[product_index])
     reversing_decomposition = XY_decompositions[reversing_index]
     return reversing_index, reversing_decomposition
 
@@ -131,7 +131,7 @@ class Spec(InstrumentChannel):
             name="spec_ampl_12_optimal",
             instrument=self,
             label=r"optimal spectroscopy amplitude to be used in coupler anticrossing",
-            initial_value=kwargs.get("spec_amp", math.nan),
+            initial_value=kwargs.get("spec_ampl_12_optimal", math.nan),
             unit="",
             vals=Numbers(min_value=-1, max_value=1, allow_nan=True),
         )
@@ -0,0 +1,182 @@
+# This code is part of Tergite
+#
+# (C) Copyright Chalmers Next Labs 2026
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import queue
+import sys
+import threading
+import traceback
+import weakref
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+from tergite_autocalibration.utils.logging import logger
+
+# The writers that are paused while a worker process is forked
+_artifact_writers: "weakref.WeakSet[ArtifactWriter]" = weakref.WeakSet()
+
+
+def can_fork() -> bool:
+    """
+    Whether worker processes can be forked from the calling thread.
+
+    A forked process inherits the locks held by the other threads, e.g. the logging or HDF5
+    locks of a thread saving an artifact, and waits forever if it needs one of them.
+    So processes are only forked from the main thread while no other thread is running,
+    apart from the artifact writers, which are paused with `paused_artifact_writers`
+    while the processes are forked.
+
+    Returns:
+        True if all threads apart from the main thread are artifact writers.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    allowed_threads = {threading.main_thread()}
+    allowed_threads.update(writer._thread for writer in list(_artifact_writers))
+    return all(thread in allowed_threads for thread in threading.enumerate())
+
+
+@contextmanager
+def paused_artifact_writers() -> Iterator[None]:
+    """
+    Pause the artifact writers, e.g. while worker processes are forked.
+    An artifact that is being written is finished first, the queued artifacts are written
+    once the writers are resumed.
+    """
+    with ExitStack() as stack:
+        for writer in list(_artifact_writers):
+            stack.enter_context(writer._paused())
+        yield
+
+
+class ArtifactWriter:
+    """
+    Saves the artifacts of the nodes, i.e. datasets, QOIs, devices and figures, in a
+    background thread, so the next node does not wait for the files to be written.
+    """
+
+    def __init__(self, queue_size: int):
+        """
+        Args:
+            queue_size: Number of artifacts that can wait to be written, a node submitting
+                more artifacts waits for the writer. With 0 the artifacts are written
+                immediately by the caller.
+        """
+        self.queue_size = queue_size
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(
+            maxsize=max(queue_size, 1)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        # the writer waits between two artifacts while it is paused
+        self._pause_condition = threading.Condition()
+        self._pause_count = 0
+        self._writing = False
+        self._errors: List[BaseException] = []
+        _artifact_writers.add(self)
+
+    def submit(self, write: Callable, *args: Any) -> None:
+        """
+        Write an artifact in the background.
+        The arguments must not be modified by the caller afterwards.
+
+        Args:
+            write: The save function, e.g. `save_dataset`.
+            *args: The arguments of the save function.
+        """
+        if self.queue_size < 1:
+            write(*args)
+            return
+        self._start()
+        self._queue.put((write, args))
+
+    def flush(self) -> None:
+        """
+        Wait until all submitted artifacts are written.
+
+        Raises:
+            The first exception raised while writing the artifacts since the last flush.
+        """
+        if self._thread is not None:
+            self._queue.join()
+        if self._errors:
+            error = self._errors[0]
+            self._errors.clear()
+            raise error
+
+    def close(self) -> None:
+        """
+        Write the remaining artifacts and stop the background thread.
+        If it is called while an exception propagates, e.g. in a finally block, a failed
+        write is only logged, so the original exception is not replaced.
+        """
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if sys.exc_info()[1] is None:
+            self.flush()
+            return
+        try:
+            self.flush()
+        except Exception as error:
+            logger.error(f"Artifacts could not be saved: {error}")
+
+    @contextmanager
+    def _paused(self) -> Iterator[None]:
+        """
+        Pause the writer after the artifact that is being written, see `paused_artifact_writers`.
+        """
+        with self._pause_condition:
+            self._pause_count += 1
+            while self._writing:
+                self._pause_condition.wait()
+        try:
+            yield
+        finally:
+            with self._pause_condition:
+                self._pause_count -= 1
+                self._pause_condition.notify_all()
+
+    def _start(self) -> None:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._write_artifacts, name="artifact-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _write_artifacts(self) -> None:
+        while True:
+            artifact = self._queue.get()
+            try:
+                if artifact is None:
+                    return
+                write, args = artifact
+                with self._pause_condition:
+                    while self._pause_count > 0:
+                        self._pause_condition.wait()
+                    self._writing = True
+                try:
+                    write(*args)
+                except Exception as error:
+                    logger.error(
+                        f"Saving an artifact with {write.__name__} failed:\n"
+                        f"{traceback.format_exc()}"
+                    )
+                    self._errors.append(error)
+                finally:
+                    with self._pause_condition:
+                        self._writing = False
+                        self._pause_condition.notify_all()
+            finally:
+                self._queue.task_done()
@@ -14,20 +14,47 @@
 # that they have been altered from the originals.
 
 import json
+import multiprocessing
 import os.path
 import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Union
+from typing import Callable, Optional, Union
 from uuid import uuid4
 
 import cf_xarray as cf
+import matplotlib
+import netCDF4
+import numpy as np
 import xarray
 
 from tergite_autocalibration.config.globals import CONFIG
 from tergite_autocalibration.utils.dto.qoi import QOI
+from tergite_autocalibration.utils.io.artifact_writer import (
+    can_fork,
+    paused_artifact_writers,
+)
 from tergite_autocalibration.utils.logging import logger
 
+# Upper bound for the size of a chunk of the compressed dataset storage
+_CHUNK_BYTES = 1 << 20
+
+# Resolution of the figures and of their previews shown by the dataset browser
+_FULL_DPI = 400
+_PREVIEW_DPI = 100
+# Encoding the large full resolution images is faster with a low zlib level
+_FULL_COMPRESS_LEVEL = 3
+
+# The figures saved by the forked workers, inherited on fork so they are not pickled
+_figures_to_save: list = []
+
+# File in the run folder with the datasets, devices and QOIs of all nodes of the run
+RUN_ARCHIVE_NAME = "run_archive.hdf5"
+# The nodes of parallel branches write to the same archive
+_run_archive_lock = threading.Lock()
+
 
 def to_real_dataset(iq_dataset: xarray.Dataset) -> xarray.Dataset:
     ds = iq_dataset.expand_dims("ReIm", axis=-1)  # Add ReIm axis at the end
@@ -35,6 +62,64 @@ def to_real_dataset(iq_dataset: xarray.Dataset) -> xarray.Dataset:
     return ds
 
 
+def _chunk_shape(shape: tuple[int, ...], itemsize: int) -> tuple[int, ...]:
+    """
+    Chunk shape for a variable, the longest dimension is halved until a chunk
+    is smaller than `_CHUNK_BYTES`.
+    """
+    chunks = [max(size, 1) for size in shape]
+    while np.prod(chunks) * itemsize > _CHUNK_BYTES and max(chunks) > 1:
+        longest = int(np.argmax(chunks))
+        chunks[longest] = (chunks[longest] + 1) // 2
+    return tuple(chunks)
+
+
+def _write_netcdf(dataset: xarray.Dataset, file_path: Path, **kwargs) -> None:
+    # to_netcdf doesn't like complex numbers, convert to real&imag to save:
+    real_dataset = to_real_dataset(dataset)
+    if "working_points" in real_dataset.coords:
+        real_dataset = cf.encode_multi_index_as_compress(real_dataset, "working_points")
+    real_dataset.to_netcdf(file_path, **kwargs)
+
+
+def _write_compressed(dataset: xarray.Dataset, file_path: Path, **kwargs) -> None:
+    # complex numbers are stored as they are, in a compound type of the netCDF4 file
+    if "working_points" in dataset.coords:
+        dataset = cf.encode_multi_index_as_compress(dataset, "working_points")
+    encoding = {
+        name: {
+            "zlib": True,
+            "complevel": 1,
+            "shuffle": True,
+            "chunksizes": _chunk_shape(variable.shape, variable.dtype.itemsize),
+        }
+        for name, variable in dataset.variables.items()
+        if variable.ndim > 0 and variable.dtype.kind in "biufc"
+    }
+    dataset.to_netcdf(file_path, auto_complex=True, encoding=encoding, **kwargs)
+
+
+# The dataset storage formats that can be selected in the run configuration
+_DATASET_WRITERS = {
+    "netcdf": _write_netcdf,
+    "compressed": _write_compressed,
+}
+
+
+def _dataset_writer() -> Callable[..., None]:
+    """
+    Returns:
+        The writer of the dataset storage selected in the run configuration.
+    """
+    storage = CONFIG.run.dataset_storage
+    if storage not in _DATASET_WRITERS:
+        raise ValueError(
+            f"Unknown dataset storage '{storage}', "
+            f"should be one of {list(_DATASET_WRITERS)}"
+        )
+    return _DATASET_WRITERS[storage]
+
+
 def create_node_data_path(node_name: str) -> Path:
     """
     Create the folder where measurement results, plots and logs specific to the node are stored.
@@ -67,7 +152,9 @@ def scrape_and_copy_hdf5_files(
 
     # Find all data files
     directory = Path(scrape_directory)
-    hdf5_files = list(directory.rglob("*.h5")) + list(directory.rglob("*.hdf5"))
+    hdf5_files = list(directory.rglob("*.h5")) + [
+        file for file in directory.rglob("*.hdf5") if file.name != RUN_ARCHIVE_NAME
+    ]
 
     # Ensure the target directory exists
     os.makedirs(target_directory, exist_ok=True)
@@ -81,10 +168,18 @@ def scrape_and_copy_hdf5_files(
     logger.info(f"Copied {len(hdf5_files)} files to {target_directory}.")
 
 
-def open_dataset(name: str, containing_folder_path: Path) -> xarray.Dataset:
+def open_dataset(
+    name: str, containing_folder_path: Path, lazy: bool = False
+) -> xarray.Dataset:
     """
     Open the dataset for the analysis.
 
+    Args:
+        name: Name of the node, the file is called `dataset_<name>.hdf5`.
+        containing_folder_path: Folder of the measurement.
+        lazy: Return a dask backed dataset that reads the values from the file
+            only when they are computed, e.g. the variables of a single element.
+
     Returns:
         the complex xarray.Dataset with measurement results
 
@@ -95,15 +190,34 @@ def open_dataset(name: str, containing_folder_path: Path) -> xarray.Dataset:
         raise FileNotFoundError(f"Dataset file not found: {dataset_path}")
 
     logger.info("Open dataset " + str(dataset_path))
-    real_ds = xarray.open_dataset(dataset_path)
+    real_ds = xarray.open_dataset(
+        dataset_path, auto_complex=True, chunks={} if lazy else None
+    )
+    return _to_complex_dataset(real_ds, lazy)
+
+
+def _to_complex_dataset(real_ds: xarray.Dataset, lazy: bool) -> xarray.Dataset:
+    """
+    The complex dataset of a dataset read from a file, stored in either format of `save_dataset`.
+    """
+    file_ds = real_ds
     if "working_points" in real_ds.coords:
         real_ds = cf.decode_compress_to_multi_index(real_ds, "working_points")
-    complex_ds = real_ds.isel(ReIm=0) + 1j * real_ds.isel(ReIm=1)
-    for var in real_ds.data_vars:
-        attrs = real_ds.data_vars[var].attrs
-        complex_ds[var].attrs.update(**attrs)
-    ds_attrs = real_ds.attrs
-    complex_ds.attrs.update(**ds_attrs)
+    if "ReIm" not in real_ds.dims:
+        # stored with complex numbers, see `save_dataset`
+        complex_ds = real_ds.astype(complex, keep_attrs=True)
+        if not lazy:
+            return complex_ds.load()
+    else:
+        complex_ds = real_ds.isel(ReIm=0) + 1j * real_ds.isel(ReIm=1)
+        for var in real_ds.data_vars:
+            attrs = real_ds.data_vars[var].attrs
+            complex_ds[var].attrs.update(**attrs)
+        ds_attrs = real_ds.attrs
+        complex_ds.attrs.update(**ds_attrs)
+    if lazy:
+        # closing the lazy dataset closes the file its values are read from
+        complex_ds.set_close(file_ds.close)
     return complex_ds
 
 
@@ -124,15 +238,8 @@ def save_dataset(
         {"name": node_name, "tuid": measurement_id}
     )
 
-    # to_netcdf doesn't like complex numbers, convert to real&imag to save:
-    result_dataset_real = to_real_dataset(result_dataset)
-
     dataset_name = f"dataset_{node_name}.hdf5"
-    if "working_points" in result_dataset_real.coords:
-        result_dataset_real = cf.encode_multi_index_as_compress(
-            result_dataset_real, "working_points"
-        )
-    result_dataset_real.to_netcdf(data_path / dataset_name)
+    _dataset_writer()(result_dataset, data_path / dataset_name)
 
 
 def save_qoi(QOI_dict: dict[str, QOI], node_name: str, data_path: Path) -> None:
@@ -153,16 +260,205 @@ def save_qoi(QOI_dict: dict[str, QOI], node_name: str, data_path: Path) -> None:
         json.dump(serialized_QOI_dict, file, indent=2)
 
 
+def run_archive_path(data_path: Path) -> Path:
+    """
+    Args:
+        data_path: Folder of a node measurement in the run folder.
+
+    Returns:
+        Path to the archive of the run the measurement belongs to.
+    """
+    return data_path.parent / RUN_ARCHIVE_NAME
+
+
+def archive_measurement(
+    result_dataset: xarray.Dataset,
+    node_name: str,
+    data_path: Path,
+    serial_device: dict,
+) -> None:
+    """
+    Append the dataset of a node measurement to the archive of the run.
+    The dataset is stored as in `save_dataset`, in a group named after the measurement
+    folder, with the serialized device as the Json attribute `device`.
+
+    Args:
+        result_dataset: The dataset to archive.
+        node_name: Name of the node being measured.
+        data_path: Folder of the measurement.
+        serial_device: The device of the node, serialized with `serialize_device_elements`.
+    """
+    result_dataset = result_dataset.assign_attrs(
+        {
+            "name": node_name,
+            "tuid": data_path.stem[0:19],
+            "device": json.dumps(serial_device),
+        }
+    )
+    write = _dataset_writer()
+    archive_path = run_archive_path(data_path)
+    with _run_archive_lock:
+        write(
+            result_dataset,
+            archive_path,
+            mode="a" if archive_path.exists() else "w",
+            group=data_path.name,
+        )
+
+
+def archive_qoi(QOI_dict: dict[str, QOI], data_path: Path) -> None:
+    """
+    Add the QOIs of a node to its group in the archive of the run, as the Json attribute `qoi`.
+
+    Args:
+        QOI_dict: The QOI of each element.
+        data_path: Folder of the measurement.
+    """
+    serialized_QOI_dict = {
+        element: qoi.serialize() for element, qoi in QOI_dict.items()
+    }
+    archive_path = run_archive_path(data_path)
+    with _run_archive_lock:
+        with netCDF4.Dataset(
+            archive_path, "a" if archive_path.exists() else "w"
+        ) as archive:
+            group = archive.groups.get(data_path.name)
+            if group is None:
+                group = archive.createGroup(data_path.name)
+            group.setncattr("qoi", json.dumps(serialized_QOI_dict))
+
+
+def archived_measurements(archive_path: Path) -> list[str]:
+    """
+    Args:
+        archive_path: Path to the archive of a run.
+
+    Returns:
+        The measurement folders of the archived nodes, in the order they were archived.
+    """
+    with netCDF4.Dataset(archive_path, "r") as archive:
+        return list(archive.groups)
+
+
+def open_archived_dataset(
+    archive_path: Path, measurement: str, lazy: bool = False
+) -> xarray.Dataset:
+    """
+    Open the dataset of a node from the archive of a run.
+
+    Args:
+        archive_path: Path to the archive of a run.
+        measurement: Measurement folder of the node, see `archived_measurements`.
+        lazy: Return a dask backed dataset, see `open_dataset`.
+
+    Returns:
+        The complex dataset, the `device` and `qoi` attributes hold the Json of the
+        device and of the QOIs.
+    """
+    real_ds = xarray.open_dataset(
+        archive_path,
+        group=measurement,
+        auto_complex=True,
+        chunks={} if lazy else None,
+    )
+    return _to_complex_dataset(real_ds, lazy)
+
+
+def _save_figure(fig, preview_path: Path, full_path: Optional[Path]) -> None:
+    """
+    Save the preview and optionally the full resolution image of a figure.
+    The layout and the tight bounding box are computed once for both images.
+    """
+    fig.draw_without_rendering()
+    bbox = fig.get_tightbbox().padded(matplotlib.rcParams["savefig.pad_inches"])
+    fig.savefig(preview_path, bbox_inches=bbox, dpi=_PREVIEW_DPI)
+    if full_path is not None:
+        fig.savefig(
+            full_path,
+            bbox_inches=bbox,
+            dpi=_FULL_DPI,
+            pil_kwargs={"compress_level": _FULL_COMPRESS_LEVEL},
+        )
+
+
+def _save_figure_in_worker(
+    fig_index: int, preview_path: Path, full_path: Optional[Path]
+) -> None:
+    _save_figure(_figures_to_save[fig_index], preview_path, full_path)
+
+
+def _figure_workers(number_of_figures: int) -> int:
+    """
+    Returns:
+        Number of worker processes saving the figures, 0 saves them in the calling process.
+    """
+    workers = min(CONFIG.run.figure_workers, number_of_figures)
+    if workers < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        return 0
+    if not can_fork():
+        # Forking while other threads run can copy the locks they hold
+        logger.info("Figures are saved sequentially while other threads are running")
+        return 0
+    return workers
+
+
+def _save_figures_in_parallel(figures_list: list, paths: list, workers: int) -> None:
+    global _figures_to_save
+
+    _figures_to_save = figures_list
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            # the workers are forked by the submissions
+            with paused_artifact_writers():
+                futures = [
+                    pool.submit(_save_figure_in_worker, fig_index, *figure_paths)
+                    for fig_index, figure_paths in enumerate(paths)
+                ]
+            for future in futures:
+                future.result()
+    finally:
+        _figures_to_save = []
+
+
 def save_figures(figures_list: list, node_name: str, data_path: Path):
+    """
+    Save the figures of a node analysis as png images.
+
+    Every figure is saved as a preview, shown by the dataset browser, and unless
+    `full_resolution_figures` is disabled in the run configuration, at full resolution.
+
+    Args:
+        figures_list: The matplotlib figures of the node analysis.
+        node_name: Name of the node, used for the file names.
+        data_path: Folder of the measurement.
+    """
     # TODO: as is, it doesn't support multiple couplers
     # TODO: pass the figures dict instead
     logger.info("Saving Plots")
+    paths = []
     for fig_index, fig in enumerate(figures_list):
         node_name_stem = (
             f"{node_name}" if len(figures_list) == 1 else f"{node_name}_{fig_index}"
         )
         preview_path = data_path / f"{node_name_stem}_preview.png"
-        full_path = data_path / f"{node_name_stem}.png"
-        fig.savefig(preview_path, bbox_inches="tight", dpi=100)
-        fig.savefig(full_path, bbox_inches="tight", dpi=400)
-        logger.info(f"Plots saved to {preview_path} and {full_path}")
+        full_path = (
+            data_path / f"{node_name_stem}.png"
+            if CONFIG.run.full_resolution_figures
+            else None
+        )
+        paths.append((preview_path, full_path))
+
+    workers = _figure_workers(len(figures_list))
+    if workers:
+        _save_figures_in_parallel(figures_list, paths, workers)
+    else:
+        for fig, (preview_path, full_path) in zip(figures_list, paths):
+            _save_figure(fig, preview_path, full_path)
+
+    for preview_path, full_path in paths:
+        if full_path is None:
+            logger.info(f"Plot saved to {preview_path}")
+        else:
+            logger.info(f"Plots saved to {preview_path} and {full_path}")